@@ -0,0 +1 @@
+# Offline performance benchmarks; run from the project root, e.g. python -m benchmarks.bench_nlp_cold_start
@@ -0,0 +1,70 @@
+"""
+Post relevance ranking: legacy substring scoring + full sort vs a reusable BM25 index.
+
+    python -m benchmarks.bench_bm25 [--posts 5000] [--queries 50]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_sentiment import make_corpus
+from utils.bm25_index import BM25Index
+
+PROMPTS = ["ai tools for customer support", "pricing problem for startups", "launch a product fast",
+           "frustrated with slow growth", "market for easy tool"]
+
+
+def make_posts(size: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    return [
+        {'id': str(i), 'title': text[:40], 'text': text, 'score': rng.randint(0, 900), 'num_comments': rng.randint(0, 300)}
+        for i, text in enumerate(make_corpus(size, seed))
+    ]
+
+
+def legacy_top(posts: list, prompt: str, k: int = 100) -> list:
+    """The original IdeaRanker._score_posts followed by a full sort"""
+    for post in posts:
+        score = 0
+        text = f"{post.get('title', '')} {post.get('text', '')}".lower()
+        for word in prompt.lower().split():
+            if word in text:
+                score += 1
+        score += min(post.get('score', 0) / 100, 5)
+        score += min(post.get('num_comments', 0) / 50, 3)
+        post['relevance_score'] = score
+    return sorted(posts, key=lambda x: x.get('relevance_score', 0), reverse=True)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts)
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.queries)]
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        legacy_top(posts, prompt)
+    legacy_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    index = BM25Index()
+    start = time.perf_counter()
+    index.fit(posts)
+    fit_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        index.top_k(prompt, 100)
+    query_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    print(f"{args.posts} posts")
+    print(f"legacy scoring + sort   {legacy_ms:8.2f} ms/query")
+    print(f"bm25 index build        {fit_ms:8.2f} ms (once per corpus)")
+    print(f"bm25 top-100 query      {query_ms:8.2f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
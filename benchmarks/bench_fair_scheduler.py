@@ -0,0 +1,68 @@
+"""
+Pipeline admission: first come first served vs FairScheduler when one user floods the app.
+
+One heavy user fires --heavy pipelines at once; --light other users each send one shortly after.
+Pipelines are simulated with a sleep of --service seconds.
+
+    python -m benchmarks.bench_fair_scheduler [--heavy 40] [--light 8] [--capacity 4] [--service 0.05]
+"""
+import argparse
+import threading
+import time
+
+from utils.fair_scheduler import FairScheduler
+
+
+def simulate(acquire, args) -> dict:
+    """Queue wait per user class; acquire(user) is a context manager holding a pipeline slot"""
+    waits = {'heavy': [], 'light': []}
+    lock = threading.Lock()
+
+    def pipeline(user, kind):
+        start = time.perf_counter()
+        with acquire(user):
+            waited = time.perf_counter() - start
+            time.sleep(args.service)
+        with lock:
+            waits[kind].append(waited)
+
+    threads = [threading.Thread(target=pipeline, args=('heavy@example.com', 'heavy')) for _ in range(args.heavy)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.service)
+    light = [threading.Thread(target=pipeline, args=(f'light{i}@example.com', 'light')) for i in range(args.light)]
+    for thread in light:
+        thread.start()
+    for thread in threads + light:
+        thread.join()
+    return waits
+
+
+def summary(values):
+    values = sorted(values)
+    return f"mean {sum(values) / len(values):6.3f} s   p95 {values[int(0.95 * (len(values) - 1))]:6.3f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--heavy', type=int, default=40)
+    parser.add_argument('--light', type=int, default=8)
+    parser.add_argument('--capacity', type=int, default=4)
+    parser.add_argument('--service', type=float, default=0.05)
+    args = parser.parse_args()
+
+    semaphore = threading.Semaphore(args.capacity)
+    fifo = simulate(lambda user: semaphore, args)
+
+    scheduler = FairScheduler(capacity=args.capacity, max_per_user=args.capacity, max_queue=10 ** 6,
+                              rate_per_minute=10 ** 6, burst=10 ** 6, max_wait=3600)
+    fair = simulate(lambda user: scheduler.slot(user), args)
+
+    print(f"{args.heavy} heavy + {args.light} light pipelines, capacity {args.capacity}, {args.service}s each")
+    for name, waits in (('first come first served', fifo), ('fair scheduler', fair)):
+        print(f"{name:24s} light users {summary(waits['light'])}   heavy user {summary(waits['heavy'])}")
+    print(scheduler.metrics())
+
+
+if __name__ == '__main__':
+    main()
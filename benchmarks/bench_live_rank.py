@@ -0,0 +1,75 @@
+"""
+Live ranking index: insert throughput and top-100 query latency as the stream grows.
+
+Posts arrive at a constant rate, so a larger corpus covers more days; with decay the
+query should stay roughly flat instead of growing with the corpus.
+
+    python -m benchmarks.bench_live_rank [--posts 200000] [--per-day 10000]
+"""
+import argparse
+import random
+import time
+from itertools import accumulate
+
+from utils.live_rank_index import LiveRankIndex
+
+QUERIES = ["w12 w340 tools", "w7 w2901 w88", "w1500 w31 w977", "w4 w230 w4100"]
+
+
+def make_posts(size: int, per_day: int = 10000, seed: int = 9, vocabulary: int = 20000) -> list:
+    """Time-ordered posts from a Zipf-like vocabulary, so a few terms are common and most are rare"""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    start = time.time() - size * 86400 / per_day
+    return [
+        {
+            'id': str(i),
+            'title': " ".join(rng.choices(words, cum_weights=cum_weights, k=8)),
+            'text': " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(20, 80))),
+            'score': rng.randint(0, 900),
+            'num_comments': rng.randint(0, 300),
+            'created_utc': start + i * 86400 / per_day,
+        }
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=200000)
+    parser.add_argument('--per-day', type=int, default=10000)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts, args.per_day)
+    now = posts[-1]['created_utc']
+    index = LiveRankIndex()
+    inserted = 0
+    insert_s = 0.0
+    for size in sorted({args.posts // 8, args.posts // 4, args.posts // 2, args.posts}):
+        start = time.perf_counter()
+        index.upsert_many(posts[inserted:size])
+        insert_s += time.perf_counter() - start
+        inserted = size
+
+        start = time.perf_counter()
+        for query in QUERIES:
+            index.top(query, 100, now=posts[size - 1]['created_utc'])
+        query_ms = (time.perf_counter() - start) * 1000 / len(QUERIES)
+        print(f"{size:8d} posts ({size / args.per_day:5.1f} days)   top-100 query {query_ms:7.2f} ms")
+
+    start = time.perf_counter()
+    for post in posts[-10000:]:
+        index.update_engagement(post['id'], score=post['score'] + 1)
+    update_us = (time.perf_counter() - start) * 1e6 / min(10000, len(posts))
+
+    start = time.perf_counter()
+    expired = index.expire(7 * 86400, now=now)
+    expire_s = time.perf_counter() - start
+
+    print(f"inserts {inserted / insert_s:9.0f} posts/s   engagement update {update_us:.1f} us   "
+          f"expired {expired} posts in {expire_s:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Cold-start cost of the NLP layer, measured in fresh interpreters.
+
+    python -m benchmarks.bench_nlp_cold_start [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from utils.nltk_resources import PROJECT_ROOT, build_resource_cache
+
+PROBE = """
+import time
+start = time.perf_counter()
+from utils.nlp_processor import NLPProcessor
+imported = time.perf_counter()
+NLPProcessor().analyze_sentiment("This tool is surprisingly good")
+scored = time.perf_counter()
+print(imported - start, scored - start)
+"""
+
+
+def measure(runs: int, env: dict) -> tuple:
+    """Median (import, first score) seconds over several fresh interpreters"""
+    imports, firsts = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(output[-2]))
+        firsts.append(float(output[-1]))
+    return statistics.median(imports), statistics.median(firsts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    base_env = dict(os.environ, NLTK_AUTO_DOWNLOAD='0')
+    with tempfile.TemporaryDirectory() as empty_dir, tempfile.TemporaryDirectory() as cache_dir:
+        build_resource_cache(cache_dir)
+        scenarios = {
+            'nltk data files': dict(base_env, NLP_RESOURCE_DIR=empty_dir),
+            'prebuilt pickle': dict(base_env, NLP_RESOURCE_DIR=cache_dir),
+        }
+        for name, env in scenarios.items():
+            import_s, first_s = measure(args.runs, env)
+            print(f"{name:<16} import {import_s * 1000:7.1f} ms   first score {first_s * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Problem extraction on a synthetic corpus: legacy indicator x sentence loop vs ProblemExtractor,
+then fuzzy clustering of the extracted sentences.
+
+ProblemExtractor fixes the legacy loop's over-counting and substring hits; it is not faster. This
+reports what that correctness costs (the ratio line) so a regression shows up.
+
+    python -m benchmarks.bench_problem_extractor [--posts 100000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from utils.problem_clusterer import ProblemClusterer
+from utils.problem_extractor import PROBLEM_LEXICONS, ProblemExtractor
+
+FILLER = "we launched last month and the team is small but growing fast with early customers".split()
+PAINS = [
+    "I wish invoicing was simpler", "onboarding is so annoying", "we need a better way to track churn",
+    "hiring is difficult for tiny teams", "I hate manual data entry", "pricing is a challenge",
+]
+
+
+def make_posts(size: int, seed: int = 11) -> list:
+    """Deterministic reddit-like posts with a few problem sentences each"""
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(size):
+        sentences = [" ".join(rng.choice(FILLER) for _ in range(rng.randint(6, 14))) for _ in range(rng.randint(3, 10))]
+        for _ in range(rng.randint(0, 3)):
+            sentences.insert(rng.randrange(len(sentences) + 1), rng.choice(PAINS))
+        posts.append({'title': rng.choice(PAINS), 'selftext': ". ".join(sentences) + ".", 'score': rng.randint(0, 500)})
+    return posts
+
+
+def legacy_problem_counts(posts: list, indicators: list) -> dict:
+    """The original IdeaGenerator loop, kept for comparison"""
+    problem_counts = defaultdict(int)
+    for post in posts:
+        text = (post['title'] + " " + post['selftext']).lower()
+        for indicator in indicators:
+            if indicator in text:
+                for sentence in text.split('.'):
+                    if indicator in sentence:
+                        problem_counts[sentence.strip()] += post['score']
+    return problem_counts
+
+
+def single_pass_problem_counts(posts: list, extractor: ProblemExtractor) -> dict:
+    """What IdeaGenerator.generate_ideas now does per post"""
+    problem_counts = defaultdict(int)
+    for post in posts:
+        for problem in extractor.extract(post['title'] + " " + post['selftext']):
+            problem_counts[problem] += post['score']
+    return problem_counts
+
+
+def best_of(repeat: int, run):
+    """(result, fastest wall time) over repeat runs; single runs on a busy machine vary by 30%+"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--lexicon', choices=sorted(PROBLEM_LEXICONS), default='default')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts)
+    extractor = ProblemExtractor(lexicon=args.lexicon)
+
+    legacy, legacy_s = best_of(args.repeat, lambda: legacy_problem_counts(posts, extractor.indicators))
+    single, single_pass_s = best_of(args.repeat, lambda: single_pass_problem_counts(posts, extractor))
+
+    print(f"legacy loop   {legacy_s:7.2f} s   {args.posts / legacy_s:9.0f} posts/s   "
+          f"{len(legacy):6d} problems, weight {sum(legacy.values())}")
+    print(f"single pass   {single_pass_s:7.2f} s   {args.posts / single_pass_s:9.0f} posts/s   "
+          f"{len(single):6d} problems, weight {sum(single.values())}")
+    print(f"ratio         {single_pass_s / legacy_s:7.2f}x legacy time")
+
+    sentences = [
+        (problem, post['score'])
+        for post in posts
+        for problem in extractor.extract(post['title'] + " " + post['selftext'])
+    ]
+    clusterer = ProblemClusterer()
+    start = time.perf_counter()
+    for problem, score in sentences:
+        clusterer.add(problem, score)
+    cluster_s = time.perf_counter() - start
+    print(f"clustering    {cluster_s:7.2f} s   {len(sentences) / cluster_s:9.0f} sentences/s   "
+          f"{len(clusterer.clusters):6d} clusters")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+/generate_ideas payload: full JSON vs field projection, cursor pages and gzip/brotli.
+
+    python -m benchmarks.bench_response_shaping [--ideas 120] [--clusters 6] [--page 20]
+"""
+import argparse
+import json
+import random
+import time
+
+from flask import Flask, request
+
+from utils.response_shaping import json_response, paginate, parse_fields, project_clusters
+
+WORDS = ("platform users small business teams automate manual workflow data pricing customers market "
+         "subscription tools integration remote health finance education local service marketplace "
+         "analytics compliance onboarding freelancers inventory scheduling").split()
+
+
+def sentence(rng, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_result(n_ideas: int, n_clusters: int, seed: int = 3) -> dict:
+    """A result shaped like DeepSeekClient.generate_enriched_ideas output, with varied text"""
+    rng = random.Random(seed)
+    clusters = {}
+    for i in range(n_ideas):
+        cluster = f"cluster{i % n_clusters}"
+        clusters.setdefault(cluster, []).append({
+            'idea': sentence(rng, 18),
+            'problem': sentence(rng, 25),
+            'solution': sentence(rng, 25),
+            'target_market': sentence(rng, 10),
+            'differentiator': sentence(rng, 15),
+            'validation': {
+                'target_users': sentence(rng, 8),
+                'entry_barrier': rng.choice(['low', 'medium', 'high']),
+                'monetization': sentence(rng, 8),
+                'risks': sentence(rng, 12),
+            },
+            'novelty': rng.randint(5, 10),
+            'uniqueness': rng.randint(5, 10),
+            'business_value': rng.randint(5, 10),
+            'justification': sentence(rng, 20),
+            'keywords': [cluster, rng.choice(WORDS)],
+            'market_analysis': {'tam': f"${rng.randint(5, 500)}B", 'cagr': f"{rng.randint(5, 40)}% (2024-2029)",
+                                'source': sentence(rng, 6)},
+        })
+    return {'success': True, 'clusters': clusters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ideas', type=int, default=120)
+    parser.add_argument('--clusters', type=int, default=6)
+    parser.add_argument('--page', type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_result(args.ideas, args.clusters)
+    app = Flask(__name__)
+
+    def measure(label, shaped, accept=''):
+        with app.test_request_context(headers={'Accept-Encoding': accept}):
+            start = time.perf_counter()
+            response = json_response(shaped, request)
+            elapsed = (time.perf_counter() - start) * 1000
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        print(f"{label:30s} {encoding:9s} {len(response.get_data()):9,d} bytes  {elapsed:6.2f} ms")
+
+    print(f"{args.ideas} ideas in {args.clusters} clusters, page size {args.page}")
+    with app.test_request_context():
+        legacy = len(json.dumps(body).encode('utf-8'))
+    print(f"{'before (jsonify, all fields)':30s} {'identity':9s} {legacy:9,d} bytes")
+    measure("full body", body)
+    measure("full body", body, 'gzip')
+    measure("full body", body, 'br, gzip')
+    card = project_clusters(body, parse_fields('card'))
+    measure("fields=card", card, 'gzip')
+    first_page = paginate(body, None, args.page, parse_fields('card'))
+    measure(f"fields=card, first {args.page}", first_page)
+    measure(f"fields=card, first {args.page}", first_page, 'gzip')
+    measure("fields=summary, first page", paginate(body, None, args.page, parse_fields('summary')), 'gzip')
+
+
+if __name__ == '__main__':
+    main()
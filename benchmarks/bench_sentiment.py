@@ -0,0 +1,55 @@
+"""
+Sentiment throughput: per-item loop vs analyze_sentiments, in-process and pooled.
+
+    python -m benchmarks.bench_sentiment [--posts 20000] [--workers 4]
+"""
+import argparse
+import os
+import random
+import time
+
+from utils.nlp_processor import NLPProcessor
+
+WORDS = (
+    "love hate great terrible startup idea need problem pricing support slow fast easy hard "
+    "customers growth frustrated happy tool product market launch failed succeeded wish better"
+).split()
+
+
+def make_corpus(size: int, seed: int = 7) -> list:
+    """Deterministic synthetic post texts of reddit-like length"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 80))) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    texts = make_corpus(args.posts)
+    processor = NLPProcessor()
+    processor.analyze_sentiment("warm up")
+
+    start = time.perf_counter()
+    expected = [processor.analyze_sentiment(text) for text in texts]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = processor.analyze_sentiments(texts, workers=1)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = processor.analyze_sentiments(texts, workers=args.workers)
+    pooled_s = time.perf_counter() - start
+    processor.close()
+
+    assert list(batch.scores) == expected and list(pooled.scores) == expected
+    for name, seconds in (("per-item loop", loop_s), ("batch, 1 worker", batch_s),
+                          (f"batch, {args.workers} workers", pooled_s)):
+        print(f"{name:<20} {seconds:7.2f} s   {len(texts) / seconds:9.0f} texts/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Signup ingestion: synchronous insert per request vs the write-behind SignupBuffer, plus CSV import.
+
+Uses Postgres when DATABASE_URL points at one, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_signup_buffer [--ops 20000] [--threads 8] [--batch 500]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.signup_buffer import SignupBuffer
+from utils.users import PostgresUserStore, SqliteUserStore
+
+
+def timed_signups(add, emails, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(add, emails))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db_url = os.getenv("DATABASE_URL", "")
+    if db_url.startswith(('postgres://', 'postgresql://')):
+        store = PostgresUserStore(db_url, pool_size=args.threads)
+        backend = "postgres"
+    else:
+        store = SqliteUserStore(os.path.join(workdir, "users.db"))
+        backend = "sqlite"
+    store.init()
+    print(f"{backend}, {args.ops} signups, {args.threads} threads, batch {args.batch}")
+
+    sync = timed_signups(store.add_user, [f"sync{i}@example.com" for i in range(args.ops)], args.threads)
+    print(f"insert per request     {sync:7.2f} s   {args.ops / sync:9.0f} signups/s")
+
+    buffer = SignupBuffer(lambda: store, max_batch=args.batch, flush_interval=1.0,
+                          spill_path=os.path.join(workdir, "spill.ndjson"))
+    acked = timed_signups(buffer.add, [f"buffered{i}@example.com" for i in range(args.ops)], args.threads)
+    start = time.perf_counter()
+    buffer.close()
+    drained = acked + time.perf_counter() - start
+    print(f"write-behind (ack)     {acked:7.2f} s   {args.ops / acked:9.0f} signups/s")
+    print(f"write-behind (durable) {drained:7.2f} s   {args.ops / drained:9.0f} signups/s   "
+          f"{buffer.inserted} inserted")
+
+    # Waitlist export with ~10% duplicate addresses
+    csv_path = os.path.join(workdir, "waitlist.csv")
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for i in range(args.ops):
+            writer.writerow([f"waitlist{i - i % 10 if i % 10 == 9 else i}@example.com", "2025-08-21T15:38:10"])
+    importer = SignupBuffer(lambda: store, max_batch=args.batch, background=False,
+                            spill_path=os.path.join(workdir, "spill.ndjson"))
+    start = time.perf_counter()
+    read, inserted = importer.import_csv(csv_path)
+    elapsed = time.perf_counter() - start
+    importer.close()
+    print(f"csv import             {elapsed:7.2f} s   {read / elapsed:9.0f} rows/s   {inserted} new of {read}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Tracing overhead: cost of span() outside a trace, in an unsampled trace and in a sampled trace.
+
+A traced idea pipeline opens roughly --spans spans (stages plus one per subreddit, Quora query and LLM call).
+
+    python -m benchmarks.bench_tracing [--traces 2000] [--spans 60]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from utils import tracing
+from utils.tracing import span, start_trace
+
+
+def pipeline(spans: int):
+    """A root with stage spans, each holding nested call spans"""
+    stages = 6
+    for stage in range(stages):
+        with span(f"stage{stage}"):
+            for call in range(max(spans // stages - 1, 0)):
+                with span("call", index=call):
+                    pass
+
+
+def timed(label: str, traces: int, spans: int, sample_rate=None):
+    start = time.perf_counter()
+    for _ in range(traces):
+        if sample_rate is None:
+            pipeline(spans)
+        else:
+            with start_trace("bench", sample_rate=sample_rate):
+                pipeline(spans)
+    per_trace = (time.perf_counter() - start) / traces * 1e6
+    print(f"{label:28s} {per_trace:9.1f} us per request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--traces', type=int, default=2000)
+    parser.add_argument('--spans', type=int, default=60)
+    args = parser.parse_args()
+
+    tracing.exporter.path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    print(f"{args.traces} requests with ~{args.spans} spans each")
+    timed("no trace", args.traces, args.spans)
+    timed("unsampled (stages only)", args.traces, args.spans, sample_rate=0.0)
+    timed("sampled, jsonl export", args.traces, args.spans, sample_rate=1.0)
+    tracing.exporter.format = 'otlp'
+    timed("sampled, otlp export", args.traces, args.spans, sample_rate=1.0)
+    print(f"exported {os.path.getsize(tracing.exporter.path) / 1e6:.1f} MB to {tracing.exporter.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Signup path: a new connection per statement (the old utils.users code) vs the pooled user store.
+
+Uses Postgres when DATABASE_URL points at one, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_user_store [--ops 5000] [--threads 8]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from utils.users import PostgresUserStore, SqliteUserStore
+
+
+def per_call_connect(db_url: str, path: str):
+    """add_user/user_exists as before: connect, run one statement, close"""
+    if db_url.startswith(('postgres://', 'postgresql://')):
+        connect, placeholder = (lambda: psycopg2.connect(db_url)), '%s'
+        insert = "INSERT INTO users (email) VALUES (%s) ON CONFLICT (email) DO NOTHING"
+    else:
+        connect, placeholder = (lambda: sqlite3.connect(path, timeout=30)), '?'
+        insert = "INSERT OR IGNORE INTO users (email) VALUES (?)"
+
+    def add_user(email):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute(insert, (email,))
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    def user_exists(email):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute(f"SELECT 1 FROM users WHERE email = {placeholder}", (email,))
+        result = cur.fetchone() is not None
+        cur.close()
+        conn.close()
+        return result
+
+    return add_user, user_exists
+
+
+def run(add_user, user_exists, emails, threads: int) -> float:
+    def signup(email):
+        add_user(email)
+        user_exists(email)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(signup, emails))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL", "")
+    path = None
+    if db_url.startswith(('postgres://', 'postgresql://')):
+        store = PostgresUserStore(db_url, pool_size=args.threads)
+        backend = "postgres"
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "users.db")
+        store = SqliteUserStore(path)
+        backend = "sqlite"
+    store.init()
+
+    legacy = run(*per_call_connect(db_url, path), [f"legacy{i}@example.com" for i in range(args.ops)], args.threads)
+    pooled = run(store.add_user, store.user_exists, [f"pooled{i}@example.com" for i in range(args.ops)], args.threads)
+    store.close()
+
+    print(f"{backend}, {args.ops} signups (insert + lookup), {args.threads} threads")
+    print(f"connect per statement   {legacy:7.2f} s   {args.ops / legacy:8.0f} signups/s")
+    print(f"pooled store            {pooled:7.2f} s   {args.ops / pooled:8.0f} signups/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Chart payloads: figure JSON size and build time for the engagement and sentiment charts, with
+size-aware rendering off (every row sent) and on (WebGL, NumPy binning, LTTB downsampling).
+
+    python -m benchmarks.bench_visualizations [--rows 1000 10000 50000 200000] [--max-points 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from components.visualizations import engagement_metrics_figure, sentiment_distribution_figure
+
+
+def posts_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    created = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.uniform(0, 365 * 86400, rows)), unit='s')
+    return pd.DataFrame({
+        'created_utc': created,
+        'score': rng.pareto(1.5, rows).astype(int),
+        'comments': rng.pareto(2.0, rows).astype(int),
+        'sentiment': np.clip(rng.normal(0.1, 0.4, rows), -1, 1),
+    })
+
+
+def payload(build, df, **kwargs):
+    """(bytes of figure JSON, seconds to build and serialize)"""
+    start = time.perf_counter()
+    size = len(build(df, **kwargs).to_json())
+    return size, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000, 200000])
+    parser.add_argument('--max-points', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'chart':12s} {'rows':>8s} {'all rows':>20s} {'size-aware':>20s}")
+    for rows in args.rows:
+        df = posts_frame(rows)
+        for name, build, extra in (('engagement', engagement_metrics_figure, {'max_points': args.max_points}),
+                                   ('sentiment', sentiment_distribution_figure, {})):
+            full_size, full_time = payload(build, df, threshold=float('inf'), **extra)
+            aware_size, aware_time = payload(build, df, threshold=0, **extra)
+            print(f"{name:12s} {rows:8d} {full_size / 1024:9.1f} KB {full_time * 1000:6.0f} ms "
+                  f"{aware_size / 1024:9.1f} KB {aware_time * 1000:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Offline stand-ins and seeded fixtures for the pipeline benchmarks.
+
+FakeReddit answers the subset of praw used by RedditClient, FakeQuoraSession serves Quora search
+pages in the markup QuoraClient parses, and fake_llm_server() runs utils.fake_llm_server in a
+subprocess so its CPU time and memory are not charged to the stage being measured.
+"""
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+from html import escape
+from typing import Dict, List
+
+TOPICS = ["invoicing", "meal planning", "remote hiring", "pet care", "home energy", "tax filing",
+          "tutoring", "fleet maintenance", "event ticketing", "clinic scheduling", "freight quotes",
+          "podcast editing", "grant writing", "inventory tracking", "language learning", "rent payments"]
+PAINS = ["is frustrating", "takes hours every week", "is too expensive", "keeps breaking", "is confusing",
+         "wastes so much time", "is a nightmare for small teams", "has no good tool"]
+ASKS = ["What startup ideas would fix", "Is there a business in", "How would you build a SaaS for",
+        "Why is nobody solving", "What are profitable business ideas around"]
+FILLER = ("we tried spreadsheets and three apps but nothing syncs with our bank and customers "
+          "keep asking for a simpler way to pay on mobile while support tickets pile up").split()
+
+
+def post_text(rng: random.Random, words: int = 40) -> str:
+    topic = rng.choice(TOPICS)
+    sentence = f"I hate that {topic} {rng.choice(PAINS)}."
+    return sentence + " " + " ".join(rng.choice(FILLER) for _ in range(words))
+
+
+def make_posts(size: int, seed: int = 11) -> List[Dict]:
+    """Posts in the shape RedditClient returns, spread over the last week"""
+    rng = random.Random(seed)
+    now = time.time()
+    return [
+        {
+            'id': f"p{i}",
+            'title': f"{rng.choice(ASKS)} {rng.choice(TOPICS)}?",
+            'text': post_text(rng),
+            'score': rng.randint(0, 5000),
+            'comments': rng.randint(0, 400),
+            'created_utc': now - rng.uniform(0, 7 * 86400),
+            'subreddit': 'startups',
+            'source': 'reddit',
+        }
+        for i in range(size)
+    ]
+
+
+def make_problem_sentences(size: int, seed: int = 13) -> List[str]:
+    """Complaints with many paraphrases, so clustering and uniqueness checks find real duplicates"""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(['Honestly', 'Ugh', 'So', 'Again'])} {rng.choice(TOPICS)} {rng.choice(PAINS)} "
+        f"because {' '.join(rng.sample(FILLER, 6))}"
+        for _ in range(size)
+    ]
+
+
+class FakeSubmission:
+    def __init__(self, rng: random.Random, subreddit: str, index: int):
+        self.id = f"{subreddit}_{index}"
+        self.title = f"{rng.choice(ASKS)} {rng.choice(TOPICS)}?"
+        self.selftext = post_text(rng)
+        self.score = rng.randint(0, 5000)
+        self.num_comments = rng.randint(0, 400)
+        self.created_utc = time.time() - rng.uniform(0, 7 * 86400)
+        self.url = f"https://www.reddit.com/r/{subreddit}/comments/{self.id}"
+
+
+class FakeSubreddit:
+    def __init__(self, name: str, submissions: List[FakeSubmission]):
+        self.display_name = name
+        self._submissions = submissions
+
+    def hot(self, limit=None):
+        return iter(self._submissions[:limit])
+
+
+class FakeReddit:
+    """praw.Reddit replacement with every submission built up front"""
+
+    def __init__(self, per_subreddit: int = 10, seed: int = 17):
+        self.per_subreddit = per_subreddit
+        self.seed = seed
+        self._subreddits: Dict[str, FakeSubreddit] = {}
+
+    def preload(self, names: List[str]) -> 'FakeReddit':
+        for name in names:
+            rng = random.Random(f"{self.seed}:{name}")
+            submissions = [FakeSubmission(rng, name, i) for i in range(self.per_subreddit)]
+            self._subreddits[name] = FakeSubreddit(name, submissions)
+        return self
+
+    def subreddit(self, name: str) -> FakeSubreddit:
+        if name not in self._subreddits:
+            self.preload([name])
+        return self._subreddits[name]
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+
+
+class FakeQuoraSession:
+    """requests.Session replacement returning a search results page with questions_per_page questions"""
+
+    def __init__(self, questions_per_page: int = 50, seed: int = 19):
+        self.questions_per_page = questions_per_page
+        self.seed = seed
+        self._pages: Dict[str, bytes] = {}
+
+    def page(self, url: str) -> bytes:
+        if url not in self._pages:
+            rng = random.Random(f"{self.seed}:{url}")
+            questions = "\n".join(
+                f'<div class="q-box"><a href="/q{i}"><div class="q-text">'
+                f'{escape(rng.choice(ASKS))} {escape(rng.choice(TOPICS))} startup business?</div></a>'
+                f'<span class="q-meta">{rng.randint(1, 900)} answers</span></div>'
+                for i in range(self.questions_per_page)
+            )
+            self._pages[url] = f"<html><body><main>{questions}</main></body></html>".encode('utf-8')
+        return self._pages[url]
+
+    def get(self, url, timeout=None, **kwargs):
+        return FakeResponse(self.page(url))
+
+
+def offline_reddit_client(fake: FakeReddit):
+    from utils.reddit_client import RedditClient
+    client = RedditClient()
+    client.reddit = fake
+    return client
+
+
+def offline_quora_client(session: FakeQuoraSession):
+    from utils.quora_client import QuoraClient
+    client = QuoraClient()
+    client.session = session
+    client.request_delay = (0, 0)
+    return client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def fake_llm_server(latency: float = 0.0, startup_timeout: float = 30.0):
+    """Run utils.fake_llm_server on a free port and yield its /v1 base URL"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'utils.fake_llm_server', '--port', str(port), '--latency', str(latency)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}/v1"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"{base_url}/models", timeout=1).read()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("fake LLM server did not start")
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
@@ -0,0 +1,310 @@
+"""
+Offline benchmark suite for the idea pipeline, stage by stage and end to end, with regression checks.
+
+Every stage runs against seeded fixtures and fakes (benchmarks/fakes.py): praw and the Quora session
+are replaced in-process and LLM calls go to utils.fake_llm_server in a subprocess. Each stage and
+size records the median wall time and CPU time over --repeat runs and the peak Python allocation
+(tracemalloc, one extra run). Results are appended to a JSON history. Any metric worse than the
+median of the last --baseline-runs clean runs on this host by more than the threshold is a
+regression, and the exit status is 1.
+
+    python -m benchmarks.run [--stages nlp ranking] [--quick] [--repeat 3] [--threshold 0.25]
+                             [--stage-threshold generate_ideas=0.5] [--history benchmarks/history.json] [--no-save]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import fakes
+
+HISTORY_PATH = os.getenv("BENCH_HISTORY_PATH", os.path.join("benchmarks", "history.json"))
+THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.25"))
+# Differences below these are timer or allocator noise, whatever the ratio
+NOISE_FLOOR = {'wall_s': 0.005, 'cpu_s': 0.005, 'peak_kb': 256}
+PROMPT = "tools for small business owners"
+
+
+def stage_reddit_fetch(size: int, llm_url: str) -> Callable:
+    """RedditClient.fetch_subreddit_data over `size` requested subreddits (plus its built-in list)"""
+    names = [f"sub{i}" for i in range(size)]
+    client = fakes.offline_reddit_client(fakes.FakeReddit().preload(names))
+    client.fetch_subreddit_data(names[:1])
+    return lambda: client.fetch_subreddit_data(names)
+
+
+def stage_quora_parse(size: int, llm_url: str) -> Callable:
+    """QuoraClient search page parsing with `size` questions per page"""
+    client = fakes.offline_quora_client(fakes.FakeQuoraSession(questions_per_page=size))
+    queries = ["startup ideas", "business ideas", "SaaS startup ideas", "AI startup opportunities"]
+    for query in queries:
+        client.session.page(f"{client.base_url}/search?q={query.replace(' ', '+')}")
+    return lambda: [client._search_questions(query, size) for query in queries]
+
+
+def stage_nlp(size: int, llm_url: str) -> Callable:
+    """NLPProcessor.process_data on `size` unseen posts (cold cache, NLTK resources already loaded)"""
+    from utils.nlp_cache import NLPResultCache
+    from utils.nlp_processor import NLPProcessor
+
+    posts = fakes.make_posts(size)
+    processor = NLPProcessor(cache=NLPResultCache(max_entries=size))
+    processor.sia, processor.stop_words
+
+    def run():
+        processor.cache = NLPResultCache(max_entries=size)
+        processor._keyword_engine = None
+        processor.process_data([dict(post) for post in posts])
+    run.cleanup = processor.close
+    return run
+
+
+def stage_trends(size: int, llm_url: str) -> Callable:
+    """DataProcessor.identify_trends over `size` posts that already carry keywords and sentiment"""
+    from utils.data_processor import DataProcessor
+
+    posts = fakes.make_posts(size)
+    for post in posts:
+        words = (post['title'] + ' ' + post['text']).lower().split()
+        post['keywords'] = words[3:13]
+        post['sentiment'] = (post['score'] % 200 - 100) / 100
+    return lambda: DataProcessor.identify_trends(posts, top_k=50)
+
+
+def stage_ranking(size: int, llm_url: str) -> Callable:
+    """IdeaRanker.rank_ideas over `size` posts: BM25 fit and top-k, then one LLM call"""
+    from utils.idea_ranker import IdeaRanker
+
+    posts = fakes.make_posts(size)
+
+    def run():
+        IdeaRanker(base_url=llm_url).rank_ideas([dict(post) for post in posts], PROMPT, 50)
+    return run
+
+
+def stage_uniqueness(size: int, llm_url: str) -> Callable:
+    """DeepSeekClient._is_unique_idea applied to `size` candidate ideas, as in _generate_ideas_from_source"""
+    from utils.deepseek_client import DeepSeekClient
+
+    client = DeepSeekClient(base_url=llm_url)
+    candidates = fakes.make_problem_sentences(size)
+
+    def run():
+        kept = []
+        for idea in candidates:
+            if client._is_unique_idea(idea, kept):
+                kept.append(idea)
+        return kept
+    return run
+
+
+def stage_clustering(size: int, llm_url: str) -> Callable:
+    """ProblemClusterer grouping `size` problem sentences, then the top clusters"""
+    from utils.problem_clusterer import ProblemClusterer
+
+    sentences = fakes.make_problem_sentences(size)
+
+    def run():
+        clusterer = ProblemClusterer()
+        for index, sentence in enumerate(sentences):
+            clusterer.add(sentence, index % 50)
+        return clusterer.top(5)
+    return run
+
+
+def stage_generate_ideas(size: int, llm_url: str) -> Callable:
+    """POST /generate_ideas with a cold prompt cache; Quora pages hold `size` questions each"""
+    import flask_app
+
+    flask_app.reddit_client._instance = fakes.offline_reddit_client(fakes.FakeReddit())
+    flask_app.quora_client._instance = fakes.offline_quora_client(fakes.FakeQuoraSession(questions_per_page=size))
+    client = flask_app.app.test_client()
+    with client.session_transaction() as session:
+        session['user_email'] = 'bench@example.com'
+    runs = iter(range(10 ** 9))
+
+    def run():
+        # A new prompt every run, so the prompt cache never answers
+        response = client.post('/generate_ideas', data={'prompt': f"{PROMPT} {size}-{next(runs)}"})
+        body = response.get_json()
+        if response.status_code != 200 or not body.get('success'):
+            raise RuntimeError(f"/generate_ideas failed: {response.status_code} {body}")
+    return run
+
+
+# name -> (stage, sizes); --quick runs only the first size
+STAGES: Dict[str, tuple] = {
+    'reddit_fetch': (stage_reddit_fetch, [10, 100, 500]),
+    'quora_parse': (stage_quora_parse, [50, 500, 2000]),
+    'nlp': (stage_nlp, [500, 2000, 10000]),
+    'trends': (stage_trends, [1000, 10000, 100000]),
+    'ranking': (stage_ranking, [500, 5000, 20000]),
+    'uniqueness': (stage_uniqueness, [100, 500, 2000]),
+    'clustering': (stage_clustering, [1000, 10000, 50000]),
+    'generate_ideas': (stage_generate_ideas, [10, 50, 100]),
+}
+
+
+def offline_environment(llm_url: str, workdir: str):
+    """Point every client at the fakes and keep state files out of the working tree"""
+    os.environ.update({
+        'DEEPSEEK_API_KEY': 'benchmark',
+        'DEEPSEEK_BASE_URL': llm_url,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'users.db')}",
+        'JOB_QUEUE_PATH': os.path.join(workdir, 'jobs.db'),
+        'SIGNUP_SPILL_PATH': os.path.join(workdir, 'signups_spill.ndjson'),
+        'TRACE_SAMPLE_RATE': '0',
+        'TRACE_EXPORT_PATH': os.path.join(workdir, 'traces.jsonl'),
+        'NLP_CACHE_PATH': '',
+        'SECRET_KEY': 'benchmark',
+        'SCHED_RATE_PER_MINUTE': '1000000',
+        'SCHED_BURST': '1000000',
+    })
+
+
+def measure(run: Callable, repeat: int) -> Dict[str, float]:
+    """Median wall and CPU seconds over repeat runs, and peak traced KB over one more"""
+    walls, cpus = [], []
+    for _ in range(repeat):
+        gc.collect()
+        wall, cpu = time.perf_counter(), time.process_time()
+        run()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'wall_s': statistics.median(walls), 'cpu_s': statistics.median(cpus), 'peak_kb': peak / 1024}
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['runs']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable benchmark history {path}: {e}")
+        return []
+
+
+def save_history(path: str, runs: List[Dict]):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'runs': runs}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def baseline(history: List[Dict], key: str, host: str, runs: int) -> Optional[Dict[str, float]]:
+    """Per-metric median of the last `runs` results for key on this host that were not regressions"""
+    previous = [
+        run['results'][key] for run in history
+        if run.get('host') == host and key in run['results'] and not run['results'][key].get('regressed')
+    ][-runs:]
+    if not previous:
+        return None
+    return {metric: statistics.median(result[metric] for result in previous) for metric in NOISE_FLOOR}
+
+
+def regressions(result: Dict[str, float], base: Optional[Dict[str, float]], threshold: float) -> List[str]:
+    if base is None:
+        return []
+    worse = []
+    for metric, floor in NOISE_FLOOR.items():
+        if result[metric] > base[metric] * (1 + threshold) and result[metric] - base[metric] > floor:
+            worse.append(f"{metric} {base[metric]:.4g} -> {result[metric]:.4g}")
+    return worse
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_stage_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        name, _, ratio = value.partition('=')
+        if name not in STAGES or not ratio:
+            raise SystemExit(f"--stage-threshold expects <stage>=<ratio> with a known stage, got {value!r}")
+        thresholds[name] = float(ratio)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--quick', action='store_true', help="smallest size only, one repeat")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed slowdown or growth as a ratio (default %(default)s)")
+    parser.add_argument('--stage-threshold', action='append', default=[], metavar='STAGE=RATIO')
+    parser.add_argument('--baseline-runs', type=int, default=5)
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    stage_thresholds = parse_stage_thresholds(args.stage_threshold)
+    repeat = 1 if args.quick else args.repeat
+    history = load_history(args.history)
+    host = platform.node()
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'host': host,
+        'python': platform.python_version(),
+        'results': {},
+    }
+    failures = []
+
+    with tempfile.TemporaryDirectory() as workdir, fakes.fake_llm_server() as llm_url:
+        offline_environment(llm_url, workdir)
+        print(f"{'stage':16s} {'size':>7s} {'wall ms':>9s} {'cpu ms':>9s} {'peak KB':>10s} {'vs baseline':>12s}")
+        for name in args.stages:
+            stage, sizes = STAGES[name]
+            for size in sizes[:1] if args.quick else sizes:
+                key = f"{name}@{size}"
+                run = stage(size, llm_url)
+                try:
+                    result = measure(run, repeat)
+                finally:
+                    getattr(run, 'cleanup', lambda: None)()
+
+                base = baseline(history, key, host, args.baseline_runs)
+                worse = regressions(result, base, stage_thresholds.get(name, args.threshold))
+                result['regressed'] = bool(worse)
+                record['results'][key] = result
+                change = f"{(result['wall_s'] / base['wall_s'] - 1) * 100:+.0f}%" if base and base['wall_s'] else 'new'
+                print(f"{name:16s} {size:7d} {result['wall_s'] * 1000:9.1f} {result['cpu_s'] * 1000:9.1f} "
+                      f"{result['peak_kb']:10.0f} {change:>12s}{'  REGRESSION' if worse else ''}")
+                failures.extend(f"{key}: {detail}" for detail in worse)
+
+    if not args.no_save:
+        save_history(args.history, history + [record])
+        print(f"Appended run to {args.history}")
+    if failures:
+        print("Regressions beyond threshold:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
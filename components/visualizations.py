@@ -1,24 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-def plot_sentiment_distribution(df):
-    """Plot sentiment distribution"""
-    fig = px.histogram(
-        df,
-        x='sentiment',
-        nbins=20,
-        title='Sentiment Distribution',
-        labels={'sentiment': 'Sentiment Score', 'count': 'Number of Posts'},
-        color_discrete_sequence=['#FF4B4B']
-    )
-    
+# Above this many rows charts switch to server-side binning, WebGL traces and downsampling
+RENDER_ROW_THRESHOLD = int(os.getenv("VIZ_ROW_THRESHOLD", "5000"))
+# Points kept per engagement series once downsampled
+MAX_POINTS = int(os.getenv("VIZ_MAX_POINTS", "2000"))
+
+def _is_large(df, threshold=None) -> bool:
+    return len(df) > (RENDER_ROW_THRESHOLD if threshold is None else threshold)
+
+def _numeric(values: pd.Series) -> np.ndarray:
+    """Float array for numbers or datetimes (as epoch nanoseconds)"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of n_out points chosen by Largest-Triangle-Three-Buckets; x must be sorted"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # The next bucket is represented by its mean point (the last point for the final bucket)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        prev = selected[i]
+        # Twice the triangle area between the previous pick, each candidate and the next bucket's mean
+        areas = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        selected[i + 1] = start + int(np.argmax(areas))
+    return selected
+
+def sentiment_distribution_figure(df, threshold=None) -> go.Figure:
+    """Sentiment histogram; large frames are binned with NumPy so only bin counts are sent"""
+    if not _is_large(df, threshold):
+        fig = px.histogram(
+            df,
+            x='sentiment',
+            nbins=20,
+            title='Sentiment Distribution',
+            labels={'sentiment': 'Sentiment Score', 'count': 'Number of Posts'},
+            color_discrete_sequence=['#FF4B4B']
+        )
+    else:
+        sentiment = df['sentiment'].dropna()
+        if pd.api.types.is_numeric_dtype(sentiment):
+            counts, edges = np.histogram(sentiment.to_numpy(dtype=float), bins=20)
+            x, width = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+        else:
+            # Labels such as positive/neutral/negative
+            value_counts = sentiment.value_counts()
+            x, counts, width = value_counts.index.astype(str), value_counts.to_numpy(), None
+        fig = go.Figure(go.Bar(x=x, y=counts, width=width, marker_color='#FF4B4B'))
+        fig.update_layout(
+            title='Sentiment Distribution',
+            xaxis_title='Sentiment Score',
+            yaxis_title='Number of Posts',
+            bargap=0
+        )
+
     fig.update_layout(
         showlegend=False,
         plot_bgcolor='white'
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def plot_sentiment_distribution(df):
+    """Plot sentiment distribution"""
+    st.plotly_chart(sentiment_distribution_figure(df), use_container_width=True)
 
 def plot_trending_topics(trends_df):
     """Plot trending topics"""
@@ -31,39 +90,60 @@ def plot_trending_topics(trends_df):
         color='avg_sentiment',
         color_continuous_scale='RdYlGn'
     )
-    
+
     fig.update_layout(
         xaxis_tickangle=-45,
         plot_bgcolor='white'
     )
-    
+
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_engagement_metrics(df):
-    """Plot post engagement metrics"""
+def _engagement_series(df, column, threshold, max_points):
+    """x and y for one engagement trace, LTTB-downsampled for large frames"""
+    if not _is_large(df, threshold):
+        return df['created_utc'], df[column]
+    ordered = df[['created_utc', column]].dropna().sort_values('created_utc')
+    keep = lttb(_numeric(ordered['created_utc']), _numeric(ordered[column]), max_points)
+    return ordered['created_utc'].iloc[keep], ordered[column].iloc[keep]
+
+def engagement_metrics_figure(df, threshold=None, max_points=None) -> go.Figure:
+    """Score and comments over time; large frames use WebGL markers and downsampled series"""
+    large = _is_large(df, threshold)
+    scatter = go.Scattergl if large else go.Scatter
+    max_points = max_points or MAX_POINTS
     fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=df['created_utc'],
-        y=df['score'],
+
+    x, y = _engagement_series(df, 'score', threshold, max_points)
+    fig.add_trace(scatter(
+        x=x,
+        y=y,
         name='Score',
         mode='markers',
-        marker=dict(size=8, color='#FF4B4B')
+        marker=dict(size=4 if large else 8, color='#FF4B4B')
     ))
-    
-    fig.add_trace(go.Scatter(
-        x=df['created_utc'],
-        y=df['comments'],
+
+    x, y = _engagement_series(df, 'comments', threshold, max_points)
+    fig.add_trace(scatter(
+        x=x,
+        y=y,
         name='Comments',
         mode='markers',
-        marker=dict(size=8, color='#0068C9')
+        marker=dict(size=4 if large else 8, color='#0068C9')
     ))
-    
+
     fig.update_layout(
         title='Post Engagement Over Time',
         xaxis_title='Date',
         yaxis_title='Count',
         plot_bgcolor='white'
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    if large:
+        fig.add_annotation(
+            text=f"{len(df):,} posts, up to {max_points:,} shown per series",
+            xref='paper', yref='paper', x=1, y=1.08, showarrow=False, font=dict(size=11)
+        )
+    return fig
+
+def plot_engagement_metrics(df):
+    """Plot post engagement metrics"""
+    st.plotly_chart(engagement_metrics_figure(df), use_container_width=True)
@@ -1,21 +1,36 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context, url_for
+from werkzeug.datastructures import MultiDict
 from utils.reddit_client import RedditClient
 from utils.quora_client import QuoraClient
 from utils.deepseek_client import DeepSeekClient
-from utils.users import add_user, init_db
+from utils.users import get_user_store
+from utils.lazy import Lazy
+from utils.nltk_resources import load_stopwords, load_vader_analyzer
+from utils.signup_buffer import SignupBuffer
+from utils.job_queue import JobQueue, QueueFull
+from utils.fair_scheduler import FairScheduler, QuotaExceeded, Rejected
+from utils.tracing import server_timing, span, start_trace
+from utils.prompt_cache import PromptResultCache
+from utils.response_shaping import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, StaleCursor, json_response, paginate, parse_fields,
+                                    project, project_clusters)
+import json
 import os
+import threading
+import time
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# Every worker must share the key, or sessions break when requests land on another worker
+app.secret_key = os.getenv("SECRET_KEY") or os.urandom(24)
+if not os.getenv("SECRET_KEY"):
+    print("SECRET_KEY is not set; using a random key, so sessions only work with a single worker")
 
-# Initialize components
-reddit_client = RedditClient()
-quora_client = QuoraClient()
-deepseek_client = DeepSeekClient()
+# Clients are created on first use so importing the app (and booting a worker) stays fast
+reddit_client = Lazy(RedditClient)
+quora_client = Lazy(QuoraClient)
+deepseek_client = Lazy(DeepSeekClient)
 
-# Initialize the database
-with app.app_context():
-    init_db()
+# Signups are acknowledged immediately and written to the database in batches
+signup_buffer = Lazy(SignupBuffer)
 
 @app.route('/')
 def index():
@@ -26,12 +41,133 @@ def index():
 @app.route('/signup', methods=['POST'])
 def signup():
     email = request.form.get('email')
-    if email:
-        add_user(email)
-        session['user_email'] = email
+    if email and signup_buffer().add(email):
+        session['user_email'] = email.strip()
         return jsonify({'success': True})
     return jsonify({'success': False, 'error': 'Invalid email'})
 
+def _cluster_key(idea):
+    return idea.get('keywords')[0] if idea.get('keywords') else 'general'
+
+def iter_idea_pipeline(prompt, stream_ideas=False):
+    """Idea generation as (event, data) pairs; the last pair is ('result', response body)"""
+    try:
+        with span('queries'):
+            queries = deepseek_client().generate_search_queries(prompt)
+        if not queries['subreddits'] and not queries['quora']:
+            yield 'result', {'success': False, 'error': 'Failed to generate search queries.'}
+            return
+        yield 'queries', queries
+
+        with span('reddit', subreddits=len(queries['subreddits'])) as current:
+            reddit_data = reddit_client().fetch_subreddit_data(queries['subreddits'])
+            if current is not None:
+                current.set(posts=len(reddit_data))
+        with span('quora', queries=len(queries['quora'])) as current:
+            quora_data = quora_client().fetch_quora_data(queries['quora'])
+            if current is not None:
+                current.set(posts=len(quora_data))
+        combined_data = reddit_data + quora_data
+        yield 'sources', {'reddit': len(reddit_data), 'quora': len(quora_data)}
+
+        with span('enrich', streamed=stream_ideas):
+            if stream_ideas:
+                enriched_ideas = []
+                for idea in deepseek_client().stream_enriched_ideas(combined_data, 20, prompt):
+                    enriched_ideas.append(idea)
+                    yield 'idea', {'index': len(enriched_ideas) - 1, 'cluster': _cluster_key(idea), 'idea': idea}
+            else:
+                enriched_ideas = deepseek_client().generate_enriched_ideas(combined_data, 20, prompt)
+
+        if enriched_ideas:
+            with span('cluster', ideas=len(enriched_ideas)):
+                clusters = {}
+                for idea in enriched_ideas:
+                    key = _cluster_key(idea)
+                    if key not in clusters:
+                        clusters[key] = []
+                    clusters[key].append(idea)
+
+                if not clusters:
+                    clusters = {'business_ideas': enriched_ideas}
+
+            yield 'result', {'success': True, 'clusters': clusters}
+        else:
+            yield 'result', {'success': False, 'error': 'No data found for the given topic.'}
+
+    except Exception as e:
+        yield 'result', {'success': False, 'error': str(e)}
+
+def run_idea_pipeline(prompt, on_event=None):
+    """Full idea generation for one prompt; returns the JSON body for the client"""
+    for event, data in iter_idea_pipeline(prompt, stream_ideas=on_event is not None):
+        if event == 'result':
+            return data
+        if on_event:
+            on_event(event, data)
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Per-user quotas and fair sharing of pipeline slots; cache hits bypass it
+scheduler = FairScheduler()
+
+# Refreshes of stale results queue as one scheduler user, so they are rate limited, get at most
+# SCHED_USER_CONCURRENCY slots and are skipped (the stale result is kept) when the queue is full
+REFRESH_USER = 'system:refresh'
+
+def _scheduled_refresh(prompt):
+    return scheduler.run(REFRESH_USER, run_idea_pipeline, prompt)
+
+# Results by normalized prompt, served stale while a background run refreshes them
+prompt_cache = PromptResultCache(run_idea_pipeline, refresh=_scheduled_refresh)
+
+def cached_idea_pipeline(prompt, user=None):
+    """Pipeline result for the prompt, from the cache when possible, tagged with cache status and age
+
+    For a user, a cache miss first spends their quota and waits for a fair share of the pipeline
+    slots; QuotaExceeded and SchedulerFull propagate to the caller.
+    """
+    cached = prompt_cache.lookup(prompt)
+    if cached is None and user is not None:
+        scheduler.check_quota(user)
+        with span('queue_wait'):
+            ticket = scheduler.enqueue_paid(user)
+            scheduler.wait_paid(ticket)
+        try:
+            cached = prompt_cache.get(prompt)
+        finally:
+            scheduler.release(ticket)
+    body, status, age = cached or prompt_cache.get(prompt)
+    return {**body, 'cache': {'status': status, 'age': int(age)}}
+
+def _rejected(e):
+    """429 for a spent quota, 503 when shedding load; both with Retry-After"""
+    response = jsonify({'success': False, 'error': str(e), 'retry_after': e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429 if isinstance(e, QuotaExceeded) else 503
+
+def _run_job(payload):
+    # Quota was spent at submission; background jobs wait for a slot as long as it takes
+    owner = payload.get('owner') or 'anonymous'
+    with start_trace('idea_job', prompt=payload['prompt']):
+        with span('queue_wait'):
+            ticket = scheduler.enqueue(owner, shed=False)
+            scheduler.wait(ticket, timeout=0)
+        try:
+            return cached_idea_pipeline(payload['prompt'])
+        finally:
+            scheduler.release(ticket)
+
+def _with_cache_headers(response, cache_info):
+    response.headers['X-Cache'] = {'fresh': 'HIT', 'stale': 'STALE'}.get(cache_info['status'], 'MISS')
+    response.headers['Age'] = str(cache_info['age'])
+    return response
+
+# Pipelines submitted as jobs run on a bounded pool; state and results survive restarts
+# Under gunicorn the master requeues abandoned jobs once (on_starting), so workers skip that step
+job_queue = Lazy(lambda: JobQueue(_run_job, recover=os.getenv("JOB_RECOVER_ON_START", "1") == "1"))
+
 @app.route('/generate_ideas', methods=['POST'])
 def generate_ideas():
     if 'user_email' not in session:
@@ -41,34 +177,303 @@ def generate_ideas():
     if not prompt:
         return jsonify({'success': False, 'error': 'Prompt is required'})
 
+    with start_trace('generate_ideas', prompt=prompt) as trace:
+        try:
+            body = cached_idea_pipeline(prompt, session['user_email'])
+        except Rejected as e:
+            return _rejected(e)
+        try:
+            with span('serialize'):
+                shaped = _shape_ideas(body, prompt, request.values)
+                response = json_response(shaped, request, etag=False)
+        except StaleCursor as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
+    response.headers['Server-Timing'] = server_timing(trace)
+    return _with_cache_headers(response, body['cache'])
+
+def _shape_ideas(body, prompt, params):
+    """Apply ?fields= projection and, with ?limit= or ?cursor=, cursor pagination to a pipeline result"""
+    if not body.get('success'):
+        return body
+    fields = parse_fields(params.get('fields'))
+    if not params.get('limit') and not params.get('cursor'):
+        return project_clusters(body, fields)
+    page = paginate(body, params.get('cursor'), params.get('limit', type=int) or DEFAULT_PAGE_SIZE, fields)
+    if page['next_cursor']:
+        page['next_url'] = url_for('idea_results', prompt=prompt, cursor=page['next_cursor'],
+                                   limit=len(page['items']), fields=params.get('fields'))
+    return page
+
+@app.route('/generate_ideas/results', methods=['GET'])
+def idea_results():
+    """Further pages of an already generated result; never reruns the pipeline"""
+    if 'user_email' not in session:
+        return jsonify({'success': False, 'error': 'User not on waitlist'}), 401
+
+    prompt = request.args.get('prompt')
+    if not prompt:
+        return jsonify({'success': False, 'error': 'Prompt is required'}), 400
+
+    # A refresh here would change the result version and break the cursors of whoever is scrolling
+    cached = prompt_cache.peek(prompt)
+    if cached is None:
+        return jsonify({'success': False, 'error': 'Results expired, generate them again'}), 410
+    body, status, age = cached
+    cache_info = {'status': status, 'age': int(age)}
     try:
-        queries = deepseek_client.generate_search_queries(prompt)
-        if not queries['subreddits'] and not queries['quora']:
-            return jsonify({'success': False, 'error': 'Failed to generate search queries.'})
+        page = _shape_ideas({**body, 'cache': cache_info}, prompt, request.args)
+    except StaleCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    return _with_cache_headers(json_response(page, request), cache_info)
 
-        reddit_data = reddit_client.fetch_subreddit_data(queries['subreddits'])
-        quora_data = quora_client.fetch_quora_data(queries['quora'])
-        combined_data = reddit_data + quora_data
+@app.route('/generate_ideas/stream', methods=['GET'])
+def stream_ideas():
+    """Server-Sent Events: queries, sources, each idea as it is parsed, then done"""
+    if 'user_email' not in session:
+        return jsonify({'success': False, 'error': 'User not on waitlist'}), 401
 
-        enriched_ideas = deepseek_client.generate_enriched_ideas(combined_data, 20, prompt)
+    prompt = request.args.get('prompt')
+    if not prompt:
+        return jsonify({'success': False, 'error': 'Prompt is required'}), 400
 
-        if enriched_ideas:
-            clusters = {}
-            for idea in enriched_ideas:
-                key = idea.get('keywords')[0] if idea.get('keywords') else 'general'
-                if key not in clusters:
-                    clusters[key] = []
-                clusters[key].append(idea)
-            
-            if not clusters:
-                clusters = {'business_ideas': enriched_ideas}
-            
-            return jsonify({'success': True, 'clusters': clusters})
-        else:
-            return jsonify({'success': False, 'error': 'No data found for the given topic.'})
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    fields = request.args.get('fields') or ''
+    shape_params = MultiDict({'limit': limit, 'fields': fields})
 
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    cached = prompt_cache.lookup(prompt)
+    ticket = None
+    if cached is None:
+        user = session['user_email']
+        try:
+            scheduler.check_quota(user)
+            ticket = scheduler.enqueue_paid(user)
+        except Rejected as e:
+            return _rejected(e)
+
+    def events():
+        # Headers are gone by the time stages finish, so streamed runs are only visible in exported traces
+        with start_trace('generate_ideas_stream', prompt=prompt, cached=cached is not None):
+            yield from stream_events()
+
+    def replay(cached):
+        body, status, age = cached
+        cache_info = {'status': status, 'age': int(age)}
+        yield _sse('cache', cache_info)
+        if not body.get('success'):
+            yield _sse('done', {**body, 'cache': cache_info})
+            return
+        # Only the first page is replayed; the client pages through the rest on scroll
+        page = _shape_ideas({**body, 'cache': cache_info}, prompt, shape_params)
+        for item in page.pop('items'):
+            yield _sse('idea', item)
+        yield _sse('done', page)
+
+    def stream_events():
+        yield _sse('started', {'prompt': prompt})
+        if cached is not None:
+            yield from replay(cached)
+            return
+
+        if ticket.state == 'queued':
+            yield _sse('queued', {'queue_depth': scheduler.metrics()['queue_depth']})
+        try:
+            with span('queue_wait'):
+                scheduler.wait_paid(ticket)
+        except Rejected as e:
+            yield _sse('done', {'success': False, 'error': str(e), 'retry_after': e.retry_after})
+            return
+
+        # Identical concurrent requests (streamed or not) wait here and reuse this run's result
+        with prompt_cache.single_flight(prompt) as filled:
+            if filled is not None:
+                scheduler.release(ticket)
+                yield from replay(filled)
+                return
+
+            # Live ideas get the same projection and page size as replayed and JSON results
+            projection = parse_fields(fields)
+            streamed = 0
+            for event, data in iter_idea_pipeline(prompt, stream_ideas=True):
+                if event == 'idea':
+                    streamed += 1
+                    if streamed > limit:
+                        continue
+                    data = {**data, 'idea': project(data['idea'], projection)}
+                if event == 'result':
+                    prompt_cache.put(prompt, data)
+                    data = {**data, 'cache': {'status': 'miss', 'age': 0}}
+                    if streamed and data.get('success'):
+                        data = _shape_ideas(data, prompt, shape_params)
+                        if streamed <= limit:
+                            # Every idea was already sent as its own event
+                            data.pop('items')
+                        # Otherwise the first page is sent whole: ideas arrive in generation order but pages
+                        # follow cluster order, so the client swaps its preview for it before paging on
+                yield _sse('done' if event == 'result' else event, data)
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    if ticket is not None:
+        # Frees the slot (or queue place) when the stream ends or the client goes away
+        response.call_on_close(lambda: scheduler.release(ticket))
+    return response
+
+@app.route('/generate_ideas/jobs', methods=['POST'])
+def submit_idea_job():
+    if 'user_email' not in session:
+        return jsonify({'success': False, 'error': 'User not on waitlist'}), 401
+
+    prompt = request.form.get('prompt')
+    if not prompt:
+        return jsonify({'success': False, 'error': 'Prompt is required'}), 400
+
+    try:
+        scheduler.check_quota(session['user_email'])
+    except Rejected as e:
+        return _rejected(e)
+
+    try:
+        job_id = job_queue().submit({'prompt': prompt, 'owner': session['user_email']}, owner=session['user_email'])
+    except QueueFull:
+        # Nothing was queued, so the request must not use up the user's quota
+        scheduler.refund(session['user_email'])
+        response = jsonify({'success': False, 'error': 'Too many pending requests, try again shortly'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': url_for('get_idea_job', job_id=job_id),
+    }), 202
+
+@app.route('/generate_ideas/jobs', methods=['GET'])
+def list_idea_jobs():
+    if 'user_email' not in session:
+        return jsonify({'success': False, 'error': 'User not on waitlist'}), 401
+    return jsonify({'success': True, 'jobs': job_queue().list_jobs(session['user_email'])})
+
+@app.route('/generate_ideas/jobs/<job_id>', methods=['GET'])
+def get_idea_job(job_id):
+    if 'user_email' not in session:
+        return jsonify({'success': False, 'error': 'User not on waitlist'}), 401
+
+    job = job_queue().get(job_id)
+    if job is None or job['owner'] != session['user_email']:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+def _warm_database():
+    get_user_store().init()
+
+def _warm_nlp():
+    load_vader_analyzer()
+    load_stopwords()
+
+# Run in order by warm_up(); the job queue comes last because queued jobs need the clients. Required
+# components keep /readyz at 503 until they start; the others only mark the worker as degraded because
+# requests fall back without them (sample posts, spilled signups).
+WARM_UP_STEPS = [
+    ('database', _warm_database, True),
+    ('nlp', _warm_nlp, False),
+    ('deepseek', deepseek_client, False),
+    ('reddit', reddit_client, False),
+    ('quora', quora_client, False),
+    ('signups', signup_buffer, False),
+    ('jobs', job_queue, True),
+]
+# Failed steps are retried by /readyz at most this often
+WARM_UP_RETRY_SECONDS = float(os.getenv("WARM_UP_RETRY_SECONDS", "10"))
+_warm_state = {'ready': False, 'components': {}, 'errors': {}, 'degraded': [], 'seconds': None, 'attempted_at': None}
+_warm_lock = threading.Lock()
+
+def warm_up():
+    """Open pools, build clients and load NLP data before taking traffic; later calls retry only the
+    steps that failed"""
+    with _warm_lock:
+        components = _warm_state['components']
+        pending = [(name, step, required) for name, step, required in WARM_UP_STEPS if not components.get(name)]
+        if not pending and _warm_state['ready']:
+            return _warm_state
+        start = time.perf_counter()
+        for name, step, required in pending:
+            try:
+                step()
+                components[name] = True
+                _warm_state['errors'].pop(name, None)
+            except Exception as e:
+                print(f"Warm-up step '{name}' failed{'' if required else ' (degraded)'}: {e}")
+                components[name] = False
+                _warm_state['errors'][name] = str(e)
+        _warm_state['attempted_at'] = time.monotonic()
+        if _warm_state['seconds'] is None:
+            _warm_state['seconds'] = round(time.perf_counter() - start, 3)
+            print(f"Warm-up finished in {_warm_state['seconds']} s")
+        _warm_state['ready'] = all(components.get(name) for name, _, required in WARM_UP_STEPS if required)
+        _warm_state['degraded'] = [name for name, _, required in WARM_UP_STEPS
+                                   if not required and not components.get(name)]
+        return _warm_state
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: 200 once warm_up() has started every required component, so load balancers hold traffic
+    until then; failed steps are retried here"""
+    attempted_at = _warm_state['attempted_at']
+    if (attempted_at is not None and _warm_state['errors']
+            and time.monotonic() - attempted_at >= WARM_UP_RETRY_SECONDS):
+        warm_up()
+    body = {
+        'ready': _warm_state['ready'],
+        'components': _warm_state['components'],
+        'errors': _warm_state['errors'],
+        'degraded': _warm_state['degraded'],
+        'warm_up_seconds': _warm_state['seconds'],
+    }
+    return jsonify(body), 200 if _warm_state['ready'] else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Scheduler, cache and job counters in the Prometheus text format"""
+    lines = []
+
+    def add(name, value, help_text, kind='gauge', labels=''):
+        if not any(line.startswith(f"# HELP {name} ") for line in lines):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{labels} {value}")
+
+    sched = scheduler.metrics()
+    add('pipeline_queue_depth', sched['queue_depth'], 'Pipelines waiting for a slot')
+    add('pipeline_running', sched['running'], 'Pipelines running now')
+    add('pipeline_capacity', sched['capacity'], 'Concurrent pipeline slots')
+    add('pipeline_users_waiting', sched['users_waiting'], 'Users with queued pipelines')
+    for quantile, key in (('0.5', 'wait_seconds_p50'), ('0.95', 'wait_seconds_p95')):
+        add('pipeline_wait_seconds', round(sched[key], 3), 'Queue wait before a pipeline starts (recent runs)',
+            'summary', f'{{quantile="{quantile}"}}')
+    add('pipeline_wait_seconds_sum', round(sched['wait_seconds_total'], 3), 'Total queue wait', 'counter')
+    add('pipeline_admitted_total', sched['admitted'], 'Pipelines admitted to the queue', 'counter')
+    add('pipeline_completed_total', sched['completed'], 'Pipelines finished', 'counter')
+    for reason, key in (('quota', 'rejected_quota'), ('full', 'rejected_full'), ('timeout', 'timed_out')):
+        add('pipeline_rejected_total', sched[key], 'Pipelines turned away', 'counter', f'{{reason="{reason}"}}')
+
+    cache = prompt_cache.stats()
+    add('prompt_cache_entries', cache['entries'], 'Cached prompt results')
+    add('prompt_cache_hit_ratio', round(cache['hit_rate'], 4), 'Share of lookups served from the cache')
+
+    if job_queue.initialized:
+        for status, count in job_queue().stats().items():
+            add('jobs', count, 'Background jobs by status', labels=f'{{status="{status}"}}')
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    warm_up()
+    app.run(debug=os.getenv("FLASK_DEBUG", "0") == "1")
\ No newline at end of file
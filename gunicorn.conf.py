@@ -0,0 +1,44 @@
+"""
+Production profile for the Flask app:
+
+    SECRET_KEY=... gunicorn flask_app:app
+
+Each worker warms up (database pool, NLP data, API clients, job pool) before it accepts
+connections, and /readyz turns 200 once it has. Jobs abandoned by a previous deployment are requeued
+once, in the master; every worker is then offered the queued jobs and each job is claimed by one. Settings can be overridden with the env vars below.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count(), 4))))
+# Threads, not more processes: requests mostly wait on the LLM and Reddit, and SSE streams hold a thread each
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+# A full idea pipeline can take over a minute
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+# Pools, flusher threads and job workers must be created in each worker, not inherited across fork
+preload_app = False
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+def on_starting(server):
+    # Master only, before any worker forks; workers inherit JOB_RECOVER_ON_START=0
+    from utils.job_queue import JobQueue
+    recovered = JobQueue.recover()
+    if recovered:
+        print(f"Requeued {recovered} abandoned jobs")
+    os.environ["JOB_RECOVER_ON_START"] = "0"
+
+def post_worker_init(worker):
+    # Runs before the worker starts accepting connections
+    from flask_app import warm_up
+    warm_up()
+
+def worker_exit(server, worker):
+    from flask_app import signup_buffer
+    if signup_buffer.initialized:
+        signup_buffer().close()
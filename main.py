@@ -1,9 +1,8 @@
+import os
+
 import streamlit as st
 import plotly.express as px
-from utils.reddit_analyzer import RedditAnalyzer
-from utils.nlp_processor import NLPProcessor
-from utils.idea_generator import IdeaGenerator
-from utils.quora_client import QuoraClient
+from utils import streamlit_cache
 
 # Page configuration
 st.set_page_config(
@@ -13,16 +12,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state
-if 'reddit_analyzer' not in st.session_state:
-    st.session_state.reddit_analyzer = RedditAnalyzer()
-if 'nlp_processor' not in st.session_state:
-    st.session_state.nlp_processor = NLPProcessor()
-if 'idea_generator' not in st.session_state:
-    st.session_state.idea_generator = IdeaGenerator()
-if 'quora_client' not in st.session_state:
-    st.session_state.quora_client = QuoraClient()
-
 # Main page header
 st.title("💡 AI-Powered Idea Generator")
 st.markdown("""
@@ -31,10 +20,14 @@ This tool uses AI to process user discussions and generate valuable startup idea
 """)
 
 # Add Quora ideas section
-st.subheader("🚀 Startup Ideas from Quora")
-with st.spinner("Fetching startup ideas from Quora..."):
-    quora_ideas = st.session_state.quora_client.search_startup_ideas(limit=8)
-    
+# The panel reads a snapshot scraped in the background, so a slow or blocked Quora never holds up the page;
+# as a fragment it re-renders on its own timer without rerunning the Reddit analysis below
+@st.fragment(run_every=int(os.getenv("QUORA_PANEL_REFRESH", "60")))
+def quora_panel():
+    st.subheader("🚀 Startup Ideas from Quora")
+    snapshot = streamlit_cache.get_quora_snapshot()
+    quora_ideas, status, age = snapshot.get(timeout=float(os.getenv("QUORA_PANEL_TIMEOUT", "0.5")))
+
     if quora_ideas:
         cols = st.columns(2)
         for i, idea in enumerate(quora_ideas):
@@ -43,6 +36,13 @@ with st.spinner("Fetching startup ideas from Quora..."):
     else:
         st.info("No Quora ideas available at the moment.")
 
+    if status == 'fallback':
+        st.caption("Showing curated ideas while fresh ones are fetched from Quora.")
+    elif status == 'stale':
+        st.caption(f"Fetched {age / 60:.0f} minutes ago; refreshing in the background.")
+
+quora_panel()
+
 st.divider()
 
 # Sidebar
@@ -53,15 +53,14 @@ time_filter = st.sidebar.selectbox(
     ["day", "week", "month", "year", "all"]
 )
 post_limit = st.sidebar.slider("Number of Posts", 10, 100, 50)
+if st.sidebar.button("🔄 Refresh data"):
+    streamlit_cache.invalidate(subreddit, time_filter, post_limit)
+    streamlit_cache.get_quora_snapshot().refresh(force=True)
 
 # Main content
 try:
     with st.spinner("Fetching data from Reddit..."):
-        posts = st.session_state.reddit_analyzer.fetch_posts(
-            subreddit, 
-            time_filter, 
-            post_limit
-        )
+        posts = streamlit_cache.fetch_posts(subreddit, time_filter, post_limit)
         
     if posts:
         # Overview metrics
@@ -77,15 +76,13 @@ try:
         
         # Sentiment Analysis
         st.subheader("Sentiment Analysis")
-        sentiments = st.session_state.nlp_processor.analyze_sentiments(
-            [post['title'] + " " + post['selftext'] for post in posts]
-        )
+        sentiments = streamlit_cache.sentiment_counts(streamlit_cache.post_texts(posts))
         
         # Sentiment Distribution Plot
         fig = px.pie(
-            values=[sentiments.count('positive'), 
-                   sentiments.count('neutral'), 
-                   sentiments.count('negative')],
+            values=[sentiments['positive'], 
+                   sentiments['neutral'], 
+                   sentiments['negative']],
             names=['Positive', 'Neutral', 'Negative'],
             title='Sentiment Distribution',
             color_discrete_sequence=['#00CC96', '#FFA15A', '#EF553B']
@@ -94,8 +91,7 @@ try:
         
         # Export data
         if st.button("Export Data"):
-            df = st.session_state.reddit_analyzer.export_to_dataframe(posts)
-            csv = df.to_csv(index=False)
+            csv = streamlit_cache.export_posts(subreddit, time_filter, post_limit, 'csv')
             st.download_button(
                 label="Download CSV",
                 data=csv,
@@ -22,12 +22,157 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    const loadingText = loading.querySelector('p');
+    const defaultLoadingText = loadingText.textContent;
+
+    // Ideas are requested a page at a time, with only the fields the cards show
+    const PAGE_SIZE = 20;
+    const CARD_FIELDS = 'card';
+    let clusterCounts = {};
+    let pager = null;
+
+    // Loads the next page when this element scrolls into view
+    const sentinel = document.createElement('div');
+    sentinel.id = 'ideas-sentinel';
+    container.insertAdjacentElement('afterend', sentinel);
+
+    function resetResults() {
+        container.innerHTML = '';
+        clusterCounts = {};
+        if (pager) {
+            pager.disconnect();
+            pager = null;
+        }
+    }
+
+    function appendIdea(cluster, idea) {
+        let section = document.getElementById(clusterSectionId(cluster));
+        if (!section) {
+            container.insertAdjacentHTML('beforeend', clusterSectionHtml(cluster));
+            section = document.getElementById(clusterSectionId(cluster));
+        }
+        clusterCounts[cluster] = (clusterCounts[cluster] || 0) + 1;
+        section.insertAdjacentHTML('beforeend', ideaCardHtml(idea, clusterCounts[cluster] - 1));
+    }
+
+    function renderPage(page) {
+        page.items.forEach(item => appendIdea(item.cluster, item.idea));
+    }
+
+    function startPaging(nextUrl) {
+        if (!nextUrl || !window.IntersectionObserver) {
+            return;
+        }
+        let loadingPage = false;
+        pager = new IntersectionObserver(function(entries) {
+            if (!entries[0].isIntersecting || loadingPage || !nextUrl) {
+                return;
+            }
+            loadingPage = true;
+            const observer = pager;
+            fetch(nextUrl)
+                .then(response => response.json())
+                .then(page => {
+                    if (observer !== pager) {
+                        return;
+                    }
+                    if (!page.success) {
+                        container.insertAdjacentHTML('beforeend', `<p class="cache-note" style="color: #718096;">${page.error}</p>`);
+                        nextUrl = null;
+                    } else {
+                        renderPage(page);
+                        nextUrl = page.next_url;
+                    }
+                    if (!nextUrl) {
+                        observer.disconnect();
+                    }
+                })
+                .catch(() => observer.disconnect())
+                .finally(() => { loadingPage = false; });
+        }, { rootMargin: '400px' });
+        pager.observe(sentinel);
+    }
+
     function generateIdeas(prompt) {
+        if (!window.EventSource) {
+            return fetchIdeas(prompt);
+        }
+
         loading.style.display = 'block';
-        container.innerHTML = '';
+        loadingText.textContent = defaultLoadingText;
+        resetResults();
+
+        // Ideas are rendered one by one as the server streams them
+        let rendered = 0;
+        const source = new EventSource('/generate_ideas/stream?prompt=' + encodeURIComponent(prompt) +
+            `&fields=${CARD_FIELDS}&limit=${PAGE_SIZE}`);
+
+        source.addEventListener('queries', function(e) {
+            const queries = JSON.parse(e.data);
+            const total = (queries.subreddits || []).length + (queries.quora || []).length;
+            loadingText.textContent = `🔎 Searching ${total} communities...`;
+        });
+
+        source.addEventListener('queued', function(e) {
+            const queue = JSON.parse(e.data);
+            loadingText.textContent = `⏳ Busy right now, ${queue.queue_depth} requests in the queue...`;
+        });
+
+        source.addEventListener('sources', function(e) {
+            const counts = JSON.parse(e.data);
+            loadingText.textContent = `📚 Read ${counts.reddit} Reddit and ${counts.quora} Quora discussions. Writing ideas...`;
+        });
+
+        source.addEventListener('cache', function(e) {
+            const cache = JSON.parse(e.data);
+            const minutes = Math.round(cache.age / 60);
+            const note = cache.status === 'stale' ? ' (refreshing in the background)' : '';
+            container.insertAdjacentHTML('afterbegin', `<p class="cache-note" style="color: #718096;">⚡ Saved results from ${minutes} min ago${note}</p>`);
+        });
+
+        source.addEventListener('idea', function(e) {
+            const data = JSON.parse(e.data);
+            appendIdea(data.cluster, data.idea);
+            rendered += 1;
+        });
+
+        source.addEventListener('done', function(e) {
+            source.close();
+            loading.style.display = 'none';
+            const data = JSON.parse(e.data);
+            if (!data.success) {
+                container.innerHTML = `<div class="error">Error: ${data.error}</div>`;
+            } else if (!rendered && data.clusters) {
+                displayIdeas(data.clusters);
+            } else {
+                if (data.items) {
+                    // More ideas than one page: replace the live preview with the first page in result order
+                    resetResults();
+                    renderPage(data);
+                }
+                startPaging(data.next_url);
+            }
+        });
+
+        source.onerror = function() {
+            // Don't let EventSource reconnect and rerun the whole pipeline
+            source.close();
+            if (!rendered) {
+                fetchIdeas(prompt);
+            } else {
+                loading.style.display = 'none';
+            }
+        };
+    }
+
+    function fetchIdeas(prompt) {
+        loading.style.display = 'block';
+        resetResults();
 
         const formData = new FormData();
         formData.append('prompt', prompt);
+        formData.append('limit', PAGE_SIZE);
+        formData.append('fields', CARD_FIELDS);
 
         fetch('/generate_ideas', {
             method: 'POST',
@@ -37,7 +182,8 @@ document.addEventListener('DOMContentLoaded', function() {
         .then(data => {
             loading.style.display = 'none';
             if (data.success) {
-                displayIdeas(data.clusters);
+                renderPage(data);
+                startPaging(data.next_url);
             } else {
                 container.innerHTML = `<div class="error">Error: ${data.error}</div>`;
             }
@@ -48,6 +194,14 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function clusterSectionId(cluster) {
+        return 'cluster-' + String(cluster).toLowerCase().replace(/[^a-z0-9]+/g, '-');
+    }
+
+    function clusterSectionHtml(cluster) {
+        return `<div id="${clusterSectionId(cluster)}"><div class="ideas-header"><h2>🎯 ${cluster.charAt(0).toUpperCase() + cluster.slice(1)}</h2></div></div>`;
+    }
+
     function displayIdeas(clusters) {
         let html = '';
         
@@ -55,53 +209,57 @@ document.addEventListener('DOMContentLoaded', function() {
             html += `<div class="ideas-header"><h2>🎯 ${cluster.charAt(0).toUpperCase() + cluster.slice(1)}</h2></div>`;
             
             clusters[cluster].forEach((idea, index) => {
-                html += `
-                <div class="idea-card">
-                    <h3 style="color: #2d3748; margin-bottom: 1rem;">💡 Idea ${index + 1}</h3>
-                    <p style="font-size: 1.1rem; line-height: 1.6; margin-bottom: 1.5rem;">${idea.idea}</p>
-                    
-                    <div class="metric-grid">
-                        <div class="metric-card">
-                            <h4 style="color: #667eea; margin: 0;">⭐ ${idea.novelty || 8}/10</h4>
-                            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Novelty</p>
-                        </div>
-                        <div class="metric-card">
-                            <h4 style="color: #38a169; margin: 0;">🎯 ${idea.uniqueness || 7}/10</h4>
-                            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Uniqueness</p>
-                        </div>
-                        <div class="metric-card">
-                            <h4 style="color: #f56565; margin: 0;">💰 ${idea.business_value || 9}/10</h4>
-                            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Business Value</p>
-                        </div>
-                    </div>
-                    
-                    ${idea.differentiator ? `<p><strong>🎯 Key Differentiator:</strong> ${idea.differentiator}</p>` : ''}
-                    
-                    ${idea.validation ? `
-                    <div class="validation-section">
-                        <h4 style="color: #c2410c; margin-bottom: 0.5rem;">✅ Validation Framework</h4>
-                        <p><strong>Target Users:</strong> ${idea.validation.target_users || 'TBD'}</p>
-                        <p><strong>Entry Barrier:</strong> ${(idea.validation.entry_barrier || 'medium').charAt(0).toUpperCase() + (idea.validation.entry_barrier || 'medium').slice(1)}</p>
-                        <p><strong>Monetization:</strong> ${idea.validation.monetization || 'TBD'}</p>
-                        <p><strong>Key Risks:</strong> ${idea.validation.risks || 'Market competition'}</p>
-                    </div>
-                    ` : ''}
-                    
-                    ${idea.market_analysis ? `
-                    <div class="market-section">
-                        <h4 style="color: #1e40af; margin-bottom: 0.5rem;">📊 Market Intelligence</h4>
-                        <p><strong>Total Addressable Market:</strong> ${idea.market_analysis.tam || 'Analyzing...'}</p>
-                        <p><strong>Growth Rate:</strong> ${idea.market_analysis.cagr || 'Calculating...'}</p>
-                        <p style="font-size: 0.9rem; color: #64748b;"><em>Source: ${idea.market_analysis.source || 'Market Research 2024'}</em></p>
-                    </div>
-                    ` : ''}
-                    
-                    ${idea.justification ? `<p><strong>💭 Analysis:</strong> ${idea.justification}</p>` : ''}
-                </div>
-                `;
+                html += ideaCardHtml(idea, index);
             });
         });
         
         container.innerHTML = html;
     }
+
+    function ideaCardHtml(idea, index) {
+        return `
+            <div class="idea-card">
+                <h3 style="color: #2d3748; margin-bottom: 1rem;">💡 Idea ${index + 1}</h3>
+                <p style="font-size: 1.1rem; line-height: 1.6; margin-bottom: 1.5rem;">${idea.idea}</p>
+
+                <div class="metric-grid">
+                    <div class="metric-card">
+                        <h4 style="color: #667eea; margin: 0;">⭐ ${idea.novelty || 8}/10</h4>
+                        <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Novelty</p>
+                    </div>
+                    <div class="metric-card">
+                        <h4 style="color: #38a169; margin: 0;">🎯 ${idea.uniqueness || 7}/10</h4>
+                        <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Uniqueness</p>
+                    </div>
+                    <div class="metric-card">
+                        <h4 style="color: #f56565; margin: 0;">💰 ${idea.business_value || 9}/10</h4>
+                        <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #718096;">Business Value</p>
+                    </div>
+                </div>
+
+                ${idea.differentiator ? `<p><strong>🎯 Key Differentiator:</strong> ${idea.differentiator}</p>` : ''}
+
+                ${idea.validation ? `
+                <div class="validation-section">
+                    <h4 style="color: #c2410c; margin-bottom: 0.5rem;">✅ Validation Framework</h4>
+                    <p><strong>Target Users:</strong> ${idea.validation.target_users || 'TBD'}</p>
+                    <p><strong>Entry Barrier:</strong> ${(idea.validation.entry_barrier || 'medium').charAt(0).toUpperCase() + (idea.validation.entry_barrier || 'medium').slice(1)}</p>
+                    <p><strong>Monetization:</strong> ${idea.validation.monetization || 'TBD'}</p>
+                    <p><strong>Key Risks:</strong> ${idea.validation.risks || 'Market competition'}</p>
+                </div>
+                ` : ''}
+
+                ${idea.market_analysis ? `
+                <div class="market-section">
+                    <h4 style="color: #1e40af; margin-bottom: 0.5rem;">📊 Market Intelligence</h4>
+                    <p><strong>Total Addressable Market:</strong> ${idea.market_analysis.tam || 'Analyzing...'}</p>
+                    <p><strong>Growth Rate:</strong> ${idea.market_analysis.cagr || 'Calculating...'}</p>
+                    <p style="font-size: 0.9rem; color: #64748b;"><em>Source: ${idea.market_analysis.source || 'Market Research 2024'}</em></p>
+                </div>
+                ` : ''}
+
+                ${idea.justification ? `<p><strong>💭 Analysis:</strong> ${idea.justification}</p>` : ''}
+            </div>
+        `;
+    }
 });
\ No newline at end of file
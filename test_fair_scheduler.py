@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for FairScheduler: token-bucket quotas, refunds, fair slot ordering and load shedding
+"""
+
+from utils.fair_scheduler import FairScheduler, QuotaExceeded, SchedulerFull
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_scheduler(clock=None, **kwargs):
+    options = dict(capacity=1, max_per_user=1, max_queue=8, rate_per_minute=6, burst=2, max_wait=1, weights={})
+    options.update(kwargs)
+    return FairScheduler(clock=clock or Clock(), **options)
+
+def spend(scheduler, user):
+    try:
+        scheduler.check_quota(user)
+        return True
+    except QuotaExceeded:
+        return False
+
+def test_quota_allows_burst_then_refills():
+    clock = Clock()
+    scheduler = make_scheduler(clock)
+    assert spend(scheduler, 'a') and spend(scheduler, 'a')
+    try:
+        scheduler.check_quota('a')
+        assert False, "third request within the burst should be rejected"
+    except QuotaExceeded as e:
+        assert e.retry_after == 10
+    # Other users have their own bucket
+    assert spend(scheduler, 'b')
+    clock.now += 10
+    assert spend(scheduler, 'a')
+    assert not spend(scheduler, 'a')
+
+def test_zero_burst_rejects_everything():
+    scheduler = make_scheduler(burst=0)
+    assert not spend(scheduler, 'a')
+
+def test_refund_returns_a_token_up_to_burst():
+    scheduler = make_scheduler()
+    assert spend(scheduler, 'a') and spend(scheduler, 'a')
+    scheduler.refund('a')
+    assert spend(scheduler, 'a')
+    assert not spend(scheduler, 'a')
+    for _ in range(5):
+        scheduler.refund('a')
+    assert spend(scheduler, 'a') and spend(scheduler, 'a')
+    assert not spend(scheduler, 'a')
+
+def test_shed_run_is_refunded():
+    scheduler = make_scheduler(max_queue=1)
+    holder = scheduler.enqueue('x')
+    waiting = scheduler.enqueue('y')
+    assert spend(scheduler, 'a') and spend(scheduler, 'a')
+    try:
+        scheduler.enqueue_paid('a')
+        assert False, "queue is full"
+    except SchedulerFull:
+        pass
+    assert spend(scheduler, 'a')
+    scheduler.release(waiting)
+    scheduler.release(holder)
+
+def test_timed_out_wait_is_refunded():
+    scheduler = make_scheduler()
+    holder = scheduler.enqueue('x')
+    assert spend(scheduler, 'a') and spend(scheduler, 'a')
+    ticket = scheduler.enqueue_paid('a')
+    try:
+        scheduler.wait_paid(ticket, timeout=0.01)
+        assert False, "no slot frees up"
+    except SchedulerFull:
+        pass
+    assert ticket.state == 'done'
+    assert scheduler.metrics()['queue_depth'] == 0
+    assert spend(scheduler, 'a')
+    scheduler.release(holder)
+
+def test_slots_go_round_robin_between_users():
+    """A user with many queued runs does not starve one who queued later"""
+    scheduler = make_scheduler(capacity=1)
+    holder = scheduler.enqueue('holder')
+    heavy = [scheduler.enqueue('heavy') for _ in range(3)]
+    light = [scheduler.enqueue('light') for _ in range(2)]
+    order = []
+    current = holder
+    for _ in range(5):
+        scheduler.release(current)
+        current = next(t for t in heavy + light if t.state == 'running')
+        order.append(current.user)
+    scheduler.release(current)
+    assert order == ['heavy', 'light', 'heavy', 'light', 'heavy']
+
+def test_weights_give_a_larger_share():
+    scheduler = make_scheduler(capacity=1, weights={'gold': 2})
+    holder = scheduler.enqueue('holder')
+    tickets = [scheduler.enqueue('gold') for _ in range(4)] + [scheduler.enqueue('basic') for _ in range(2)]
+    order = []
+    current = holder
+    for _ in range(6):
+        scheduler.release(current)
+        current = next(t for t in tickets if t.state == 'running')
+        order.append(current.user)
+    scheduler.release(current)
+    assert order[:3].count('gold') == 2
+
+def test_max_queue_sheds_new_runs():
+    scheduler = make_scheduler(capacity=1, max_queue=2)
+    running = scheduler.enqueue('a')
+    queued = [scheduler.enqueue('b'), scheduler.enqueue('c')]
+    try:
+        scheduler.enqueue('d')
+        assert False, "queue is full"
+    except SchedulerFull as e:
+        assert e.retry_after >= 1
+    # Background work may opt out of shedding
+    extra = scheduler.enqueue('d', shed=False)
+    assert scheduler.metrics()['rejected_full'] == 1
+    for ticket in [running] + queued + [extra]:
+        scheduler.release(ticket)
+    assert scheduler.metrics()['running'] == 0
+
+if __name__ == "__main__":
+    test_quota_allows_burst_then_refills()
+    test_zero_burst_rejects_everything()
+    test_refund_returns_a_token_up_to_burst()
+    test_shed_run_is_refunded()
+    test_timed_out_wait_is_refunded()
+    test_slots_go_round_robin_between_users()
+    test_weights_give_a_larger_share()
+    test_max_queue_sheds_new_runs()
+    print("ok")
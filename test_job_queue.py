@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for JobQueue leases: recovery across processes sharing one database, and atomic claims
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.job_queue import JobQueue
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_live_lease_is_not_recovered():
+    """A second queue on the same database must not take over a job the first is still running"""
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    runs = []
+    release = threading.Event()
+
+    def slow(payload):
+        runs.append(payload['n'])
+        release.wait(5)
+        return {'n': payload['n']}
+
+    first = JobQueue(slow, path=path, workers=1, lease_seconds=0.3)
+    job_id = first.submit({'n': 1})
+    assert wait_for(lambda: runs == [1])
+
+    second = JobQueue(slow, path=path, workers=1, lease_seconds=0.3)
+    # Several heartbeats: the first queue keeps renewing its lease, so nothing is requeued
+    time.sleep(0.5)
+    release.set()
+    assert wait_for(lambda: first.get(job_id)['status'] == 'succeeded')
+    assert runs == [1]
+    first.shutdown()
+    second.shutdown()
+
+def test_expired_lease_is_recovered_once():
+    """A running job whose owner died is requeued and run by exactly one of the surviving queues"""
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    JobQueue(lambda payload: {}, path=path).shutdown()
+    db = sqlite3.connect(path)
+    db.execute(
+        "INSERT INTO jobs (id, payload, status, attempts, created_at, started_at, worker, lease_expires) "
+        "VALUES ('orphan', '{}', 'running', 1, ?, ?, 'dead-host:1:x', ?)",
+        (time.time() - 120, time.time() - 120, time.time() - 60)
+    )
+    db.commit()
+    db.close()
+
+    assert JobQueue.recover(path) == 1
+    runs = []
+    lock = threading.Lock()
+
+    def handler(payload):
+        with lock:
+            runs.append(1)
+        time.sleep(0.05)
+        return {}
+
+    queues = [JobQueue(handler, path=path, workers=2, recover=False) for _ in range(3)]
+    assert wait_for(lambda: queues[0].get('orphan')['status'] == 'succeeded')
+    time.sleep(0.1)
+    assert len(runs) == 1
+    assert queues[0].get('orphan')['status'] == 'succeeded'
+    for queue in queues:
+        queue.shutdown()
+
+def test_job_is_claimed_by_one_pool():
+    """Every queued job is offered to every pool, but each runs exactly once"""
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    runs = []
+    lock = threading.Lock()
+
+    def handler(payload):
+        with lock:
+            runs.append(payload['n'])
+        return {}
+
+    submitter = JobQueue(handler, path=path, workers=1)
+    job_ids = [submitter.submit({'n': n}) for n in range(20)]
+    others = [JobQueue(handler, path=path, workers=2) for _ in range(2)]
+    assert wait_for(lambda: all(submitter.get(job_id)['status'] == 'succeeded' for job_id in job_ids))
+    time.sleep(0.1)
+    assert sorted(runs) == list(range(20))
+    for queue in [submitter] + others:
+        queue.shutdown()
+
+def test_finished_jobs_are_purged_while_running():
+    """Retention is enforced by a long-lived queue, not only when one starts"""
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    queue = JobQueue(lambda payload: {}, path=path, workers=1, retention_seconds=0.2,
+                     lease_seconds=0.15, purge_interval=0.1)
+    job_id = queue.submit({'n': 1})
+    assert wait_for(lambda: (queue.get(job_id) or {}).get('status') == 'succeeded')
+    assert wait_for(lambda: queue.get(job_id) is None)
+    queue.shutdown()
+
+if __name__ == "__main__":
+    test_live_lease_is_not_recovered()
+    test_expired_lease_is_recovered_once()
+    test_job_is_claimed_by_one_pool()
+    test_finished_jobs_are_purged_while_running()
+    print("ok")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for JSONArrayStream, the incremental parser behind streamed ideas
+"""
+
+from utils.json_stream import JSONArrayStream
+
+def feed_all(chunks):
+    stream = JSONArrayStream()
+    elements = []
+    for chunk in chunks:
+        elements.extend(stream.feed(chunk))
+    return elements
+
+def test_preamble_with_brackets_is_skipped():
+    assert feed_all(['Here are [20] ideas:\n', '[{"a": 1}, {"a": 2}]']) == [{'a': 1}, {'a': 2}]
+
+def test_elements_split_across_chunks():
+    text = '[{"title": "Split \\"quoted\\" ]}", "tags": ["x", "y"]}, {"b": [1, {"c": 2}]}]'
+    for size in (1, 2, 7):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert feed_all(chunks) == [{'title': 'Split "quoted" ]}', 'tags': ['x', 'y']}, {'b': [1, {'c': 2}]}]
+
+def test_trailing_text_is_ignored():
+    chunks = ['Here: [{"a":1},', '{"a":2}]', ' Note: see [{"a":3}] too']
+    assert feed_all(chunks) == [{'a': 1}, {'a': 2}]
+
+def test_invalid_element_is_skipped():
+    assert feed_all(['[{"a": 1}, {"a": oops}, {"a": 3}]']) == [{'a': 1}, {'a': 3}]
+
+if __name__ == "__main__":
+    test_preamble_with_brackets_is_skipped()
+    test_elements_split_across_chunks()
+    test_trailing_text_is_ignored()
+    test_invalid_element_is_skipped()
+    print("ok")
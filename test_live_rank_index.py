@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for LiveRankIndex: same ranking as BM25Index, decay, engagement updates and expiry
+"""
+
+import random
+
+from utils.bm25_index import BM25Index
+from utils.live_rank_index import LiveRankIndex
+
+NOW = 1_700_000_000.0
+WORDS = "crm invoicing churn onboarding hiring pricing tools app team customers data manual".split()
+
+def make_posts(size, seed=5):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': str(i),
+            'title': " ".join(rng.choices(WORDS, k=4)),
+            'text': " ".join(rng.choices(WORDS, k=rng.randint(3, 20))),
+            # Distinct engagement, so the order has no ties to break differently
+            'score': rng.randint(0, 400) + i / 1000,
+            'num_comments': rng.randint(0, 100),
+            'created_utc': NOW - rng.uniform(0, 30 * 86400),
+        }
+        for i in range(size)
+    ]
+
+def bm25_ranking(posts, query, n, decay=None):
+    index = BM25Index().fit(posts)
+    scores = index.scores(query)
+    if decay:
+        scores = scores * [decay(post['created_utc']) for post in posts]
+    order = sorted(range(len(posts)), key=lambda i: -scores[i])[:n]
+    return [(posts[i]['id'], scores[i]) for i in order]
+
+def live_ranking(index, query, n):
+    return [(post['id'], post['relevance_score']) for post in index.top(query, n, now=NOW)]
+
+def assert_same(live, expected):
+    assert [key for key, _ in live] == [key for key, _ in expected]
+    for (_, a), (_, b) in zip(live, expected):
+        assert abs(a - b) < 1e-9
+
+def test_matches_bm25_index_without_decay():
+    posts = make_posts(600)
+    index = LiveRankIndex(half_life_seconds=None, segment_seconds=86400).upsert_many(posts)
+    for query in ["crm", "invoicing churn", "pricing tools for teams", "unknown words only"]:
+        for n in (1, 10, 100, 600):
+            assert_same(live_ranking(index, query, n), bm25_ranking(posts, query, n))
+
+def test_posts_without_query_terms_still_rank_on_engagement():
+    posts = [
+        {'id': 'match', 'title': "crm", 'text': "", 'score': 0, 'num_comments': 0, 'created_utc': NOW},
+        {'id': 'popular', 'title': "hiring", 'text': "", 'score': 10000, 'num_comments': 1000, 'created_utc': NOW},
+    ]
+    index = LiveRankIndex(half_life_seconds=None).upsert_many(posts)
+    assert [post['id'] for post in index.top("crm", 2, now=NOW)] == ['popular', 'match']
+
+def test_matches_decayed_bm25_scores():
+    posts = make_posts(600, seed=8)
+    index = LiveRankIndex(half_life_seconds=3 * 86400, segment_seconds=6 * 3600).upsert_many(posts)
+    decay = lambda created: 0.5 ** ((NOW - created) / (3 * 86400))
+    for query in ["crm", "manual data entry", "onboarding churn app"]:
+        for n in (5, 50):
+            assert_same(live_ranking(index, query, n), bm25_ranking(posts, query, n, decay))
+
+def test_engagement_updates_and_expiry():
+    posts = make_posts(200, seed=2)
+    index = LiveRankIndex(half_life_seconds=None).upsert_many(posts)
+    last = index.top("crm", 200, now=NOW)[-1]['id']
+    assert index.update_engagement(last, score=100000, num_comments=10000)
+    assert index.top("crm", 1, now=NOW)[0]['id'] == last
+    assert not index.update_engagement('missing', score=1)
+    # Undated posts can't be decayed or expired, so they are not indexed
+    assert index.upsert({'id': 'undated', 'title': "crm"}) is None
+    assert index.undated == 1 and 'undated' not in index.posts
+
+    old = sum(1 for post in posts if post['created_utc'] < NOW - 10 * 86400)
+    assert index.expire(10 * 86400, now=NOW) == old
+    assert len(index) == len(posts) - old
+    remaining = [post for post in posts if post['created_utc'] >= NOW - 10 * 86400]
+    assert_same(live_ranking(index, "pricing", 20), bm25_ranking(remaining, "pricing", 20))
+
+if __name__ == "__main__":
+    test_matches_bm25_index_without_decay()
+    test_posts_without_query_terms_still_rank_on_engagement()
+    test_matches_decayed_bm25_scores()
+    test_engagement_updates_and_expiry()
+    print("ok")
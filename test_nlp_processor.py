@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch sentiment API of NLPProcessor
+"""
+
+from utils.nlp_processor import NLPProcessor, SENTIMENT_LABELS
+
+TEXTS = [
+    "I love how simple this tool is",
+    "This is the worst onboarding I have ever seen",
+    "The meeting is at 3pm",
+    "",
+    None,
+    "Not bad, but pricing is frustrating and support is slow",
+] * 50
+
+def test_batch_matches_single_item():
+    """analyze_sentiments must agree exactly with analyze_sentiment"""
+    processor = NLPProcessor()
+    expected = [processor.analyze_sentiment(text) for text in TEXTS]
+
+    in_process = processor.analyze_sentiments(TEXTS, workers=1)
+    pooled = processor.analyze_sentiments(TEXTS, workers=2, chunk_size=64)
+    processor.close()
+
+    assert list(in_process.scores) == expected
+    assert list(pooled.scores) == expected
+    assert list(pooled.codes) == list(in_process.codes)
+    assert sum(in_process.count(label) for label in SENTIMENT_LABELS) == len(TEXTS)
+
+if __name__ == "__main__":
+    test_batch_matches_single_item()
+    print("ok")
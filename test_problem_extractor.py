@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for ProblemExtractor, pinned against the legacy IdeaGenerator loop it replaced
+"""
+
+from collections import defaultdict
+
+from benchmarks.bench_problem_extractor import legacy_problem_counts, make_posts
+from utils.problem_extractor import PROBLEM_LEXICONS, ProblemExtractor, register_lexicon
+
+def test_matches_legacy_loop_except_for_double_counting():
+    """Same sentences as the old loop; it only differed by counting a sentence once per indicator"""
+    posts = make_posts(2000)
+    extractor = ProblemExtractor()
+    legacy = legacy_problem_counts(posts, extractor.indicators)
+    weighted = defaultdict(int)
+    for post in posts:
+        for sentence, found in extractor.extract_with_indicators(post['title'] + " " + post['selftext']):
+            weighted[sentence] += post['score'] * len(found)
+    assert set(weighted) == set(legacy)
+    assert dict(weighted) == dict(legacy)
+
+def test_sample_post_output():
+    extractor = ProblemExtractor()
+    text = ("Running a bakery. I wish invoicing was simpler! We need a better way to track orders? "
+            "Betterment is not a problem here.\nHiring is difficult")
+    assert extractor.extract(text) == [
+        "i wish invoicing was simpler",
+        "we need a better way to track orders",
+        "betterment is not a problem here",
+        "hiring is difficult",
+    ]
+    assert extractor.extract_with_indicators(text)[1] == ("we need a better way to track orders", ["need", "better"])
+
+def test_indicators_match_whole_words_only():
+    extractor = ProblemExtractor()
+    # The legacy loop matched these as substrings
+    assert extractor.extract("Betterment of the app. Needless to say it works. Wishful thinking.") == []
+    assert extractor.extract("It could be better. Betterment aside.") == ["it could be better"]
+
+def test_multi_indicator_sentence_counted_once():
+    extractor = ProblemExtractor()
+    assert extractor.extract("I hate this problem, we need to improve") == ["i hate this problem, we need to improve"]
+    legacy = legacy_problem_counts([{'title': "I hate this problem", 'selftext': "", 'score': 1}], extractor.indicators)
+    assert legacy == {"i hate this problem": 2}
+
+def test_lexicons():
+    extended = ProblemExtractor(lexicon='extended')
+    assert extended.extract("I can't find a good CRM. All good otherwise.") == ["i can't find a good crm"]
+    assert ProblemExtractor().extract("I can't find a good CRM.") == []
+    register_lexicon('test-only', ["slow"])
+    try:
+        assert ProblemExtractor(lexicon='test-only').extract("Builds are slow. Need help.") == ["builds are slow"]
+    finally:
+        del PROBLEM_LEXICONS['test-only']
+
+def test_non_text_is_ignored():
+    assert ProblemExtractor().extract(None) == []
+
+if __name__ == "__main__":
+    test_matches_legacy_loop_except_for_double_counting()
+    test_sample_post_output()
+    test_indicators_match_whole_words_only()
+    test_multi_indicator_sentence_counted_once()
+    test_lexicons()
+    test_non_text_is_ignored()
+    print("ok")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for PromptResultCache: TTL, stale-while-revalidate refresh, single-flight misses and LRU eviction
+"""
+
+import threading
+import time
+
+from utils import prompt_cache
+from utils.prompt_cache import PromptResultCache, normalize_prompt
+
+class Clock:
+    """Stands in for the time module inside prompt_cache"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+def with_clock(test):
+    def run():
+        clock = Clock()
+        original = prompt_cache.time
+        prompt_cache.time = clock
+        try:
+            test(clock)
+        finally:
+            prompt_cache.time = original
+    run.__name__ = test.__name__
+    return run
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt):
+        self.calls.append(prompt)
+        return {'ideas': [f"{prompt} #{len(self.calls)}"]}
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def test_normalize_prompt():
+    assert normalize_prompt("Startup ideas for Dentists") == normalize_prompt("dentist ideas")
+    assert normalize_prompt("CRM for gyms!") == normalize_prompt("gym crm")
+    assert normalize_prompt("business ideas") == "business ideas"
+
+@with_clock
+def test_ttl_fresh_then_expired(clock):
+    compute = Counter()
+    cache = PromptResultCache(compute, ttl=60, stale_seconds=0, max_entries=8)
+    value, status, _ = cache.get("crm for gyms")
+    assert status == 'miss'
+    clock.now += 59
+    assert cache.get("gym crm") == (value, 'fresh', 59)
+    clock.now += 1
+    assert cache.lookup("gym crm") is None
+    assert cache.get("gym crm")[1] == 'miss'
+    assert len(compute.calls) == 2
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+@with_clock
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    release = threading.Event()
+    refreshed = []
+
+    def refresh(prompt):
+        release.wait(2)
+        refreshed.append(prompt)
+        return {'ideas': ["new"]}
+
+    cache = PromptResultCache(Counter(), ttl=60, stale_seconds=600, max_entries=8, refresh=refresh)
+    old, _, _ = cache.get("crm")
+    clock.now += 120
+    # Served at once, however many requests arrive while the refresh is in flight
+    for _ in range(5):
+        assert cache.get("crm") == (old, 'stale', 120)
+    release.set()
+    wait_for(lambda: refreshed and not cache._refreshing)
+    assert refreshed == ["crm"]
+    assert cache.get("crm") == ({'ideas': ["new"]}, 'fresh', 0)
+    assert cache.stats()['stale_hits'] == 5
+
+@with_clock
+def test_failed_refresh_keeps_the_stale_entry(clock):
+    def refresh(prompt):
+        raise RuntimeError("provider down")
+
+    cache = PromptResultCache(Counter(), ttl=60, stale_seconds=600, max_entries=8, refresh=refresh)
+    old, _, _ = cache.get("crm")
+    clock.now += 120
+    assert cache.get("crm")[1] == 'stale'
+    wait_for(lambda: not cache._refreshing)
+    assert cache.get("crm") == (old, 'stale', 120)
+
+def test_concurrent_misses_compute_once():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute(prompt):
+        calls.append(prompt)
+        started.set()
+        release.wait(2)
+        return {'ideas': ["shared"]}
+
+    cache = PromptResultCache(compute, ttl=60, stale_seconds=0, max_entries=8)
+    results = []
+    threads = [threading.Thread(target=lambda p=p: results.append(cache.get(p))) for p in ["crm gyms", "gym CRM", "CRMs for gyms"] * 3]
+    for thread in threads:
+        thread.start()
+    started.wait(2)
+    wait_for(lambda: cache._key_locks.get(normalize_prompt("crm gyms"), [None, 0])[1] == len(threads))
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert calls == [calls[0]]
+    assert sorted(status for _, status, _ in results) == ['fresh'] * 8 + ['miss']
+    assert not cache._key_locks
+
+def test_single_flight_sees_result_of_the_first_stream():
+    cache = PromptResultCache(Counter(), ttl=60, stale_seconds=0, max_entries=8)
+    with cache.single_flight("crm") as cached:
+        assert cached is None
+        cache.put("crm", {'ideas': ["streamed"]})
+    with cache.single_flight("CRM!") as cached:
+        assert cached[0] == {'ideas': ["streamed"]} and cached[1] == 'fresh'
+    assert cache.stats()['misses'] == 1
+
+def test_lru_eviction_and_uncacheable_results():
+    cache = PromptResultCache(Counter(), ttl=60, stale_seconds=0, max_entries=2)
+    cache.get("crm")
+    cache.get("invoicing")
+    # Touching crm makes invoicing the least recently used
+    assert cache.lookup("crm")[1] == 'fresh'
+    cache.get("churn")
+    assert cache.peek("invoicing") is None
+    assert cache.peek("crm") is not None and cache.peek("churn") is not None
+
+    cache.put("failed", {'success': False})
+    cache.put("empty", {})
+    assert cache.peek("failed") is None and cache.peek("empty") is None
+    assert cache.stats()['entries'] == 2
+
+if __name__ == "__main__":
+    test_normalize_prompt()
+    test_ttl_fresh_then_expired()
+    test_stale_entry_is_served_while_one_refresh_runs()
+    test_failed_refresh_keeps_the_stale_entry()
+    test_concurrent_misses_compute_once()
+    test_single_flight_sees_result_of_the_first_stream()
+    test_lru_eviction_and_uncacheable_results()
+    print("ok")
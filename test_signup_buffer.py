@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for SignupBuffer spill files shared by several processes
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+
+import psycopg2
+
+from utils.signup_buffer import SignupBuffer
+from utils.users import SqliteUserStore
+
+class DownStore:
+    def add_users(self, rows):
+        raise ConnectionError("database down")
+
+class PickyStore:
+    """Rejects any batch containing a row whose created_at is not a timestamp, like Postgres would"""
+
+    def __init__(self):
+        self.emails = []
+        self.calls = 0
+
+    def add_users(self, rows):
+        self.calls += 1
+        if any(created_at == 'not a date' for _, created_at in rows):
+            raise psycopg2.errors.InvalidDatetimeFormat('invalid input syntax for type timestamp')
+        self.emails.extend(email for email, _ in rows)
+        return len(rows)
+
+def spill_and_wait(spill_path, started, finish):
+    """Another worker: spills one signup while the database is down, then stays alive"""
+    buffer = SignupBuffer(DownStore, spill_path=spill_path, background=False)
+    buffer.write_rows([('child@example.com', None)])
+    started.set()
+    finish.wait(10)
+
+def spill_and_exit(spill_path):
+    buffer = SignupBuffer(DownStore, spill_path=spill_path, background=False)
+    buffer.write_rows([('dead@example.com', None)])
+    os._exit(0)
+
+def make_store(workdir):
+    store = SqliteUserStore(os.path.join(workdir, "users.db"))
+    store.init()
+    return store
+
+def emails(store):
+    with store.connection() as conn:
+        return sorted(row[0] for row in conn.execute("SELECT email FROM users"))
+
+def test_live_workers_spill_is_left_alone():
+    """Replaying in one process must not consume (and delete) a live process's spill file"""
+    workdir = tempfile.mkdtemp()
+    spill_path = os.path.join(workdir, "spill.ndjson")
+    context = multiprocessing.get_context('fork')
+    started, finish = context.Event(), context.Event()
+    child = context.Process(target=spill_and_wait, args=(spill_path, started, finish))
+    child.start()
+    assert started.wait(10)
+
+    store = make_store(workdir)
+    buffer = SignupBuffer(lambda: store, spill_path=spill_path, background=False)
+    buffer.write_rows([('parent@example.com', None)])
+    assert emails(store) == ['parent@example.com']
+    child_spill = [name for name in os.listdir(workdir) if name.endswith(f".{child.pid}.ndjson")]
+    assert len(child_spill) == 1
+
+    finish.set()
+    child.join()
+    # Once the other worker is gone its file is taken over and replayed
+    buffer.write_rows([])
+    assert emails(store) == ['child@example.com', 'parent@example.com']
+    assert not [name for name in os.listdir(workdir) if 'spill' in name]
+
+def test_dead_workers_spill_is_replayed_once():
+    workdir = tempfile.mkdtemp()
+    spill_path = os.path.join(workdir, "spill.ndjson")
+    context = multiprocessing.get_context('fork')
+    child = context.Process(target=spill_and_exit, args=(spill_path,))
+    child.start()
+    child.join()
+
+    store = make_store(workdir)
+    first = SignupBuffer(lambda: store, spill_path=spill_path, background=False)
+    second = SignupBuffer(lambda: store, spill_path=spill_path, background=False)
+    assert first.write_rows([]) == 1
+    assert second.write_rows([]) == 0
+    assert emails(store) == ['dead@example.com']
+
+def test_rejected_rows_are_quarantined_not_spilled():
+    """One bad row must not be spilled and replayed ahead of (and so block) every later batch"""
+    workdir = tempfile.mkdtemp()
+    quarantine = os.path.join(workdir, "quarantine.ndjson")
+    store = PickyStore()
+    buffer = SignupBuffer(lambda: store, spill_path=os.path.join(workdir, "spill.ndjson"),
+                          quarantine_path=quarantine, background=False)
+    rows = [(f"user{n}@example.com", None) for n in range(16)]
+    rows[5] = ('bad@example.com', 'not a date')
+    assert buffer.write_rows(rows) == 15
+    assert buffer.spilled == 0
+    assert not [name for name in os.listdir(workdir) if 'spill' in name]
+    with open(quarantine) as f:
+        assert [json.loads(line)['email'] for line in f] == ['bad@example.com']
+
+    calls = store.calls
+    assert buffer.write_rows([('later@example.com', None)]) == 1
+    assert store.calls == calls + 1
+    assert len(store.emails) == 16
+
+if __name__ == "__main__":
+    test_live_workers_spill_is_left_alone()
+    test_dead_workers_spill_is_replayed_once()
+    test_rejected_rows_are_quarantined_not_spilled()
+    print("ok")
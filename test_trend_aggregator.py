@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for TrendAggregator: sliding-window pruning, bounded history and posts without created_utc
+"""
+
+from datetime import datetime, timezone
+
+from utils.trend_aggregator import TrendAggregator, post_timestamp
+
+DAY = 86400
+START = 1_700_000_000 // DAY * DAY
+
+def post(day, *keywords, sentiment=0.0):
+    return {'created_utc': START + day * DAY + 60, 'keywords': list(keywords), 'sentiment': sentiment}
+
+def frequencies(aggregator):
+    return {trend['keyword']: trend['frequency'] for trend in aggregator.top_k()}
+
+def test_post_timestamp():
+    assert post_timestamp({'created_utc': 1700000000}) == 1700000000.0
+    assert post_timestamp({'created_utc': datetime(2024, 1, 1, tzinfo=timezone.utc)}) == 1704067200.0
+    assert post_timestamp({'created_utc': "1700000000.5"}) == 1700000000.5
+    assert post_timestamp({'created_utc': "2024-01-01T00:00:00+00:00"}) == 1704067200.0
+    for missing in ({}, {'created_utc': None}, {'created_utc': "yesterday"}, {'created_utc': True}):
+        assert post_timestamp(missing) is None
+
+def test_undated_posts_are_skipped_and_counted():
+    aggregator = TrendAggregator(num_windows=3)
+    aggregator.add_many([post(0, 'crm'), {'keywords': ['crm', 'invoicing']}, {'keywords': []}])
+    assert aggregator.undated == 1
+    assert aggregator.posts_seen == 1
+    assert frequencies(aggregator) == {'crm': 1}
+    assert aggregator.window_counts('crm') == [0, 0, 1]
+
+def test_windows_slide_out_of_range():
+    aggregator = TrendAggregator(num_windows=3)
+    aggregator.add_many([post(0, 'crm'), post(0, 'crm', 'churn'), post(1, 'crm'), post(2, 'hiring')])
+    assert frequencies(aggregator) == {'crm': 3, 'churn': 1, 'hiring': 1}
+    assert aggregator.window_counts('crm') == [2, 1, 0]
+
+    # Day 3 retires day 0; its counts leave the totals and keywords seen only then disappear
+    aggregator.add(post(3, 'hiring'))
+    assert frequencies(aggregator) == {'crm': 1, 'hiring': 2}
+    assert aggregator.window_counts('crm') == [1, 0, 0]
+    assert sorted(aggregator._windows) == [START // DAY + 1, START // DAY + 2, START // DAY + 3]
+
+    # Posts older than the retained windows are ignored without history
+    aggregator.add(post(0, 'crm'))
+    assert frequencies(aggregator)['crm'] == 1
+    assert aggregator.posts_seen == 5
+
+def test_velocity_and_acceleration():
+    aggregator = TrendAggregator(num_windows=3)
+    aggregator.add_many([post(0, 'crm')] + [post(1, 'crm')] * 3 + [post(2, 'crm')] * 4)
+    trend = aggregator.top_k(1)[0]
+    assert trend['velocity'] == 1
+    assert trend['acceleration'] == 1 - 2
+
+def test_history_keeps_retired_windows():
+    aggregator = TrendAggregator(num_windows=2, keep_history=True)
+    aggregator.add_many([post(0, 'crm', sentiment=1.0), post(5, 'crm', sentiment=0.0), post(1, 'churn')])
+    assert frequencies(aggregator) == {'crm': 2, 'churn': 1}
+    assert aggregator.top_k(1)[0]['avg_sentiment'] == 0.5
+    assert len(aggregator._windows) == 1
+
+def test_history_is_bounded():
+    aggregator = TrendAggregator(num_windows=2, keep_history=True, max_history_keywords=10)
+    for day in range(30):
+        aggregator.add(post(day, 'crm', f'rare{day}'))
+        assert len(aggregator._totals) <= 10
+    # Frequent keywords survive pruning with exact counts
+    assert frequencies(aggregator)['crm'] == 30
+
+def test_window_keyword_bound():
+    aggregator = TrendAggregator(num_windows=2, max_keywords_per_window=8)
+    for n in range(20):
+        aggregator.add(post(0, 'crm', f'rare{n}'))
+    assert len(aggregator._windows[START // DAY]) <= 8
+    assert frequencies(aggregator)['crm'] == 20
+    assert set(frequencies(aggregator)) == set(aggregator._windows[START // DAY])
+
+if __name__ == "__main__":
+    test_post_timestamp()
+    test_undated_posts_are_skipped_and_counted()
+    test_windows_slide_out_of_range()
+    test_velocity_and_acceleration()
+    test_history_keeps_retired_windows()
+    test_history_is_bounded()
+    test_window_keyword_bound()
+    print("ok")
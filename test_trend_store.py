@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for TrendStore: per-post counting, z-score burst detection and dropping the old snapshot tables
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from utils.trend_store import TrendStore
+
+DAY = 86400
+# Noon of the current (latest) day, so every post lands mid-day
+NOW = 1_700_000_000 // DAY * DAY + DAY // 2
+
+def make_store(tmp):
+    return TrendStore(path=os.path.join(tmp, "trends.db"))
+
+def posts_for(days_ago, keyword, count, prefix=None):
+    prefix = prefix or f"{keyword}-{days_ago}"
+    return [
+        {'id': f"{prefix}-{n}", 'created_utc': NOW - days_ago * DAY, 'keywords': [keyword], 'sentiment': 0.5}
+        for n in range(count)
+    ]
+
+def record_series(store, keyword, counts):
+    """counts: mentions per day, oldest first, the last one being today"""
+    for offset, count in enumerate(counts):
+        store.record_posts('r/test', posts_for(len(counts) - 1 - offset, keyword, count))
+
+def test_burst_z_scores():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        record_series(store, 'crm', [2, 4, 2, 4, 8])        # baseline mean 3, std 1
+        record_series(store, 'churn', [0, 0, 0, 0, 3])      # new keyword: std floored at 1
+        record_series(store, 'steady', [3, 3, 3, 3, 3])
+        record_series(store, 'rare', [0, 0, 0, 0, 2])       # below min_frequency
+        rising = store.rising('r/test', period_seconds=DAY, baseline_periods=4, now=NOW)
+        store.close()
+    assert [(t['keyword'], t['frequency'], t['baseline_mean'], t['z_score']) for t in rising] == [
+        ('crm', 8, 3.0, 5.0),
+        ('churn', 3, 0.0, 3.0),
+        ('steady', 3, 3.0, 0.0),
+    ]
+    assert rising[0]['avg_sentiment'] == 0.5
+
+def test_hourly_periods_use_buckets():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        hour = [dict(post, created_utc=NOW - 3600 * 2) for post in posts_for(0, 'crm', 1, 'old')]
+        store.record_posts('r/test', hour + posts_for(0, 'crm', 5, 'now'))
+        rising = store.rising('r/test', period_seconds=3600, baseline_periods=3, now=NOW)
+        store.close()
+    # Baseline hours [0, 1, 0]: mean 1/3, std ~0.47 floored at 1
+    assert rising[0]['keyword'] == 'crm'
+    assert rising[0]['frequency'] == 5
+    assert rising[0]['z_score'] == round(5 - 1 / 3, 3)
+
+def test_refetched_posts_are_counted_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        posts = posts_for(0, 'crm', 4)
+        assert store.record_posts('r/test', posts) == 4
+        assert store.record_posts('r/test', posts) == 0
+        assert store.record_posts('r/other', posts) == 4
+        assert store.record_posts('r/test', [{'id': 'undated', 'keywords': ['crm']}]) == 0
+        assert store.undated == 1
+        rising = store.rising('r/test', period_seconds=DAY, now=NOW)
+        store.close()
+    assert rising[0]['frequency'] == 4
+
+def test_old_snapshot_tables_are_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trends.db")
+        db = sqlite3.connect(path)
+        db.executescript("""
+            CREATE TABLE keywords (id INTEGER PRIMARY KEY, keyword TEXT UNIQUE NOT NULL);
+            CREATE TABLE trend_snapshots (scope TEXT, bucket INTEGER, keyword_id INTEGER, frequency INTEGER, sentiment_sum REAL);
+            CREATE TABLE trend_daily (scope TEXT, day INTEGER, keyword_id INTEGER, frequency INTEGER, sentiment_sum REAL);
+            INSERT INTO keywords VALUES (1, 'crm');
+            INSERT INTO trend_snapshots VALUES ('r/test', 1, 1, 50, 0);
+            INSERT INTO trend_daily VALUES ('r/test', 1, 1, 50, 0);
+        """)
+        db.close()
+
+        store = make_store(tmp)
+        store.close()
+        db = sqlite3.connect(path)
+        tables = {name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        db.close()
+    assert 'trend_snapshots' not in tables and 'trend_daily' not in tables
+    assert {'keywords', 'trend_posts', 'trend_buckets', 'trend_days'} <= tables
+
+if __name__ == "__main__":
+    test_burst_z_scores()
+    test_hourly_periods_use_buckets()
+    test_refetched_posts_are_counted_once()
+    test_old_snapshot_tables_are_dropped()
+    print("ok")
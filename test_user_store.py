@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for PostgresUserStore's pool handling against a fake psycopg2 pool: warm connections,
+recycled connections and reconnects after a broken one
+"""
+
+import gc
+
+import psycopg2
+
+from utils import users
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        conn = self.connection
+        if conn.closed or conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        conn.executed.append(sql.split()[0])
+        if sql == "DEALLOCATE ALL":
+            conn.prepared.clear()
+        elif sql.startswith("PREPARE "):
+            conn.prepared.add(sql.split()[1])
+        elif sql.startswith("EXECUTE "):
+            name = sql.split()[1]
+            if name not in conn.prepared:
+                raise psycopg2.ProgrammingError(f'prepared statement "{name}" does not exist')
+            self.rowcount = 1
+            self._row = (1,)
+
+    def fetchone(self):
+        return self._row
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.prepared = set()
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+class FakePool:
+    """Keeps at most minconn idle connections and closes the rest on putconn, like psycopg2's pool"""
+
+    instances = []
+
+    def __init__(self, minconn, maxconn, dsn):
+        self.minconn = minconn
+        self.idle = [FakeConnection() for _ in range(minconn)]
+        self.opened = minconn
+        self.recycle = False
+        FakePool.instances.append(self)
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        self.opened += 1
+        return FakeConnection()
+
+    def putconn(self, conn, close=False):
+        if close or self.recycle or len(self.idle) >= self.minconn:
+            conn.close()
+        else:
+            self.idle.append(conn)
+
+    def closeall(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle = []
+
+def make_store(**kwargs):
+    original = users.pg_pool.ThreadedConnectionPool
+    users.pg_pool.ThreadedConnectionPool = FakePool
+    try:
+        store = users.PostgresUserStore("postgresql://fake", **kwargs)
+    finally:
+        users.pg_pool.ThreadedConnectionPool = original
+    return store, FakePool.instances[-1]
+
+def test_pool_keeps_every_connection_warm():
+    store, pool = make_store(pool_size=3)
+    borrowed = [store._pool.getconn() for _ in range(3)]
+    for conn in borrowed:
+        store._release(conn)
+    assert len(pool.idle) == 3
+    assert pool.opened == 3
+
+def test_recycled_connection_is_prepared_again():
+    """A connection the pool closed is forgotten, even if its replacement reuses the same id()"""
+    store, pool = make_store(pool_size=1)
+    pool.recycle = True
+    for n in range(20):
+        assert store.add_user(f"user{n}@example.com")
+        gc.collect()
+    assert pool.opened >= 20
+    assert len(store._prepared) == 0
+
+def test_broken_connection_is_replaced_and_prepared():
+    store, pool = make_store(pool_size=1, health_check_interval=0)
+    assert store.add_user("first@example.com")
+    pool.idle[0].broken = True
+    assert store.user_exists("first@example.com")
+    replacement = pool.idle[0]
+    assert not replacement.broken
+    assert replacement.executed.count("PREPARE") == len(store.STATEMENTS)
+
+if __name__ == "__main__":
+    test_pool_keeps_every_connection_warm()
+    test_recycled_connection_is_prepared_again()
+    test_broken_connection_is_replaced_and_prepared()
+    print("ok")
@@ -0,0 +1,111 @@
+import hashlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.keyword_engine import tokenize
+
+def engagement_score(post: Dict) -> float:
+    """Upvotes (capped at 5 points) plus comments (capped at 3 points)"""
+    comments = post.get('num_comments', post.get('comments', 0)) or 0
+    return min((post.get('score', 0) or 0) / 100, 5) + min(comments / 50, 3)
+
+def post_text(post: Dict) -> str:
+    return f"{post.get('title', '')} {post.get('text', '')}"
+
+class BM25Index:
+    """Inverted index over a post corpus with vectorized BM25 scoring fused with engagement"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, engagement_weight: float = 1.0):
+        self.k1 = k1
+        self.b = b
+        self.engagement_weight = engagement_weight
+        self.vocabulary: Dict[str, int] = {}
+        self.fingerprint: Optional[str] = None
+        self.n_docs = 0
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.float64)
+        self._idf = np.zeros(0, dtype=np.float64)
+        self._norm = np.zeros(0, dtype=np.float64)
+        self.engagement = np.zeros(0, dtype=np.float64)
+
+    @staticmethod
+    def corpus_fingerprint(posts: List[Dict]) -> str:
+        """Identity of a corpus by post id (or url) and text, so unchanged corpora skip re-indexing
+
+        The text is included because edited posts keep their id; hashing it is far cheaper than tokenizing.
+        """
+        digest = hashlib.sha1()
+        for post in posts:
+            digest.update(str(post.get('id') or post.get('url') or '').encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(post_text(post).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def fit(self, posts: List[Dict]):
+        """Index the corpus: CSR postings (term -> doc ids, term frequencies) and document lengths"""
+        vocabulary: Dict[str, int] = {}
+        term_ids, doc_ids, tfs = [], [], []
+        doc_lengths = np.zeros(len(posts), dtype=np.float64)
+        for doc_id, post in enumerate(posts):
+            tokens = tokenize(post_text(post))
+            doc_lengths[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind='stable')
+        df = np.bincount(term_ids, minlength=len(vocabulary))
+
+        self.vocabulary = vocabulary
+        self.n_docs = len(posts)
+        self._offsets = np.concatenate([[0], np.cumsum(df)])
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self._tfs = np.asarray(tfs, dtype=np.float64)[order]
+        self._idf = np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+        avg_length = doc_lengths.mean() if len(posts) and doc_lengths.mean() else 1.0
+        self._norm = self.k1 * (1 - self.b + self.b * doc_lengths / avg_length)
+        self.update_engagement(posts)
+        self.fingerprint = self.corpus_fingerprint(posts)
+        return self
+
+    def update_engagement(self, posts: List[Dict]):
+        """Refresh engagement features without touching the postings"""
+        self.engagement = np.fromiter((engagement_score(post) for post in posts), dtype=np.float64, count=len(posts))
+
+    def bm25(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query's distinct terms"""
+        scores = np.zeros(self.n_docs, dtype=np.float64)
+        for term in dict.fromkeys(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs = self._doc_ids[start:end]
+            tf = self._tfs[start:end]
+            # Each doc appears once per term's postings, so fancy-index += is safe
+            scores[docs] += self._idf[term_id] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        return scores
+
+    def scores(self, query: str) -> np.ndarray:
+        """Relevance plus weighted engagement for every document"""
+        return self.bm25(query) + self.engagement_weight * self.engagement
+
+    def top_k(self, query: str, k: int = 100, candidates: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """(doc index, fused score) of the k best documents, optionally among candidate indices only"""
+        scores = self.scores(query)
+        indices = np.arange(self.n_docs) if candidates is None else np.asarray(candidates, dtype=np.int64)
+        if not len(indices) or k <= 0:
+            return []
+        subset = scores[indices]
+        if k < len(indices):
+            best = np.argpartition(-subset, k - 1)[:k]
+        else:
+            best = np.arange(len(indices))
+        best = best[np.lexsort((indices[best], -subset[best]))]
+        return list(zip(indices[best].tolist(), subset[best].tolist()))
@@ -1,38 +1,23 @@
 from datetime import datetime, timedelta
-from collections import Counter
+from typing import Iterable
 from utils.deepseek_client import DeepSeekClient
+from utils.exporters import top_k_by
+from utils.trend_aggregator import TrendAggregator
+from utils.trend_store import TrendStore
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, trend_store: TrendStore = None):
         self.deepseek = DeepSeekClient()
+        self.trend_store = trend_store
 
     @staticmethod
-    def identify_trends(data: list) -> list:
-        """Identify trends in the processed data"""
+    def identify_trends(data: Iterable[dict], top_k: int = None, window_seconds: int = 86400, num_windows: int = 7) -> list:
+        """Identify trends in the processed data, with velocity between the latest daily windows"""
         if not data:
             return []
 
-        all_keywords = [keyword for item in data for keyword in item.get('keywords', [])]
-        keyword_counts = Counter(all_keywords)
-
-        keyword_sentiments = {}
-        for item in data:
-            sentiment = item.get('sentiment', 0)
-            for keyword in item.get('keywords', []):
-                if keyword not in keyword_sentiments:
-                    keyword_sentiments[keyword] = []
-                keyword_sentiments[keyword].append(sentiment)
-
-        trends = [
-            {
-                'keyword': keyword,
-                'frequency': count,
-                'avg_sentiment': sum(keyword_sentiments.get(keyword, [0])) / len(keyword_sentiments.get(keyword, [1]))
-            }
-            for keyword, count in keyword_counts.items()
-        ]
-
-        return sorted(trends, key=lambda x: x['frequency'], reverse=True)
+        aggregator = TrendAggregator(window_seconds=window_seconds, num_windows=num_windows, keep_history=True)
+        return aggregator.add_many(data).top_k(top_k)
 
     def generate_ideas(self, trends_data: list, num_ideas=5):
         """Generate business ideas using DeepSeek"""
@@ -41,6 +26,30 @@ class DataProcessor:
 
         return self.deepseek.generate_business_ideas(trends_data, num_ideas)
 
+    def record_posts(self, scope: str, processed_posts: list) -> int:
+        """Persist keyword mentions of processed posts (e.g. for 'r/startups') so bursts can be detected later"""
+        if self.trend_store is None:
+            self.trend_store = TrendStore()
+        return self.trend_store.record_posts(scope, processed_posts)
+
+    def generate_emerging_ideas(self, scope: str, num_ideas=5, period_seconds: int = 7 * 86400):
+        """Generate business ideas from keywords that are bursting above their baseline"""
+        if self.trend_store is None:
+            self.trend_store = TrendStore()
+        rising = self.trend_store.rising(scope, period_seconds)
+        if not rising:
+            return []
+
+        trends_data = [
+            {
+                'title': trend['keyword'],
+                'text': f"Mentioned {trend['frequency']} times this period versus a baseline of "
+                        f"{trend['baseline_mean']} (z-score {trend['z_score']})"
+            }
+            for trend in rising
+        ]
+        return self.generate_ideas(trends_data, num_ideas)
+
     def analyze_deep_trends(self, data: list):
         """Perform deep trend analysis using DeepSeek"""
         if not data:
@@ -49,14 +58,22 @@ class DataProcessor:
         return self.deepseek.analyze_trends(data)
 
     @staticmethod
-    def prepare_export_data(data: list, trends_data: list, deep_analysis=None):
-        """Prepare data for export"""
-        top_posts = sorted(data, key=lambda x: x.get('score', 0), reverse=True)[:10]
+    def prepare_export_data(data: Iterable[dict], trends_data: list, deep_analysis=None):
+        """Prepare data for export in a single pass over data, which may be a stream"""
+        totals = {'posts': 0, 'sentiment': 0}
+
+        def tally(rows):
+            for row in rows:
+                totals['posts'] += 1
+                totals['sentiment'] += row.get('sentiment', 0)
+                yield row
+
+        top_posts = top_k_by(tally(data), key=lambda x: x.get('score', 0), k=10)
         export_data = {
             'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'posts_analyzed': len(data),
+            'posts_analyzed': totals['posts'],
             'trending_topics': [trend['keyword'] for trend in trends_data[:10]],
-            'average_sentiment': sum(item.get('sentiment', 0) for item in data) / len(data) if data else 0,
+            'average_sentiment': totals['sentiment'] / totals['posts'] if totals['posts'] else 0,
             'top_posts': [
                 {'title': post.get('title'), 'score': post.get('score'), 'sentiment': post.get('sentiment')}
                 for post in top_posts
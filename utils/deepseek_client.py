@@ -1,12 +1,17 @@
 import os
 import openai
 import json
+import random
 import httpx
 import pandas as pd
 from .market_enricher import MarketEnricher
+from .json_stream import JSONArrayStream
+from .tracing import span
+
+DEFAULT_BASE_URL = "https://api.sambanova.ai/v1"
 
 class DeepSeekClient:
-    def __init__(self):
+    def __init__(self, base_url=None):
         api_key = os.getenv("DEEPSEEK_API_KEY")
         print(f"API Key from env: {api_key}")
         if not api_key:
@@ -14,12 +19,22 @@ class DeepSeekClient:
         
         self.client = openai.OpenAI(
             api_key=api_key,
-            base_url="https://api.sambanova.ai/v1",
+            base_url=base_url or os.getenv("DEEPSEEK_BASE_URL", DEFAULT_BASE_URL),
             http_client=httpx.Client(),
         )
         self.model = "Llama-4-Maverick-17B-128E-Instruct"
         self.market_enricher = MarketEnricher(self)
 
+    def create_completion(self, operation, **kwargs):
+        """chat.completions.create with a tracing span named after the calling operation"""
+        kwargs.setdefault('model', self.model)
+        with span(f"llm.{operation}", model=kwargs['model'], stream=bool(kwargs.get('stream'))) as current:
+            response = self.client.chat.completions.create(**kwargs)
+            if current is not None and getattr(response, 'usage', None):
+                current.set(prompt_tokens=response.usage.prompt_tokens,
+                            completion_tokens=response.usage.completion_tokens)
+            return response
+
     def generate_business_ideas(self, trends_data, num_ideas=5):
         """Generate business ideas using DeepSeek"""
         try:
@@ -41,8 +56,8 @@ Generate {num_ideas} business ideas in this JSON format:
     {{"problem": "...", "solution": "..."}}
 ]"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self.create_completion(
+                'generate_business_ideas',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -81,8 +96,8 @@ Generate {num_ideas} business ideas in this JSON format:
             except json.JSONDecodeError:
                 print("⚠️ The AI response format was unexpected. Retrying with simplified format...")
                 # Retry with more basic prompt
-                retry_response = self.client.chat.completions.create(
-                    model=self.model,
+                retry_response = self.create_completion(
+                    'generate_business_ideas_retry',
                     messages=[
                         {"role": "system", "content": "Generate simple business ideas in JSON format."},
                         {"role": "user", "content": f"Generate {num_ideas} business ideas based on these trends: {trends_context}"}
@@ -158,13 +173,10 @@ Generate {num_ideas} business ideas in this JSON format:
             'market_ranges': {'tam': (20, 400), 'cagr': (10, 30)}
         }
 
-    def generate_enriched_ideas(self, combined_data, num_ideas=20, prompt="business innovation"):
-        """Generate category-aligned business ideas with market intelligence"""
-        try:
-            constraints = self.get_category_constraints(prompt)
-            
-            # Enhanced system prompt with category constraints
-            system_prompt = f"""You are a YC-tier startup analyst specializing in {prompt}. Generate {num_ideas} innovative business ideas that:
+    def _enriched_idea_messages(self, combined_data, num_ideas, prompt, constraints):
+        """Chat messages asking for category-aligned ideas as a JSON array"""
+        # Enhanced system prompt with category constraints
+        system_prompt = f"""You are a YC-tier startup analyst specializing in {prompt}. Generate {num_ideas} innovative business ideas that:
 
 MUST focus on: {', '.join(constraints['domains'])}
 MUST NOT include: {', '.join(constraints['exclude'])}
@@ -196,22 +208,60 @@ Return valid JSON array with this structure:
   }}
 ]"""
 
-            trends_context = "\n".join([
-                f"Title: {post.get('title', '')}\nText: {post.get('text', '')}"
-                for post in combined_data[:15]
-            ])
+        trends_context = "\n".join([
+            f"Title: {post.get('title', '')}\nText: {post.get('text', '')}"
+            for post in combined_data[:15]
+        ])
 
-            user_prompt = f"""Based on this {prompt} market data:
+        user_prompt = f"""Based on this {prompt} market data:
 {trends_context}
 
 Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea must solve real problems from the data and have specific differentiators beyond "AI-driven"."""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+    def _process_enriched_idea(self, idea, prompt, constraints):
+        """Normalize one generated idea and attach market data for its category"""
+        processed_idea = {
+            'idea': f"{idea.get('problem', 'Business opportunity')}: {idea.get('solution', 'Innovative solution')}",
+            'problem': idea.get('problem', 'Market opportunity identified'),
+            'solution': idea.get('solution', 'Innovative solution approach'),
+            'target_market': idea.get('target_market', 'Target market analysis'),
+            'differentiator': idea.get('differentiator', 'Unique value proposition'),
+            'validation': idea.get('validation', {
+                'target_users': 'Market research needed',
+                'entry_barrier': 'medium',
+                'monetization': 'subscription model',
+                'risks': 'market competition'
+            }),
+            'novelty': idea.get('novelty', 8),
+            'uniqueness': idea.get('uniqueness', 7),
+            'business_value': idea.get('business_value', 9),
+            'justification': f"Strong potential in {prompt} market with specific differentiator",
+            'keywords': idea.get('keywords', [prompt.split()[0], 'innovation'])
+        }
+
+        # Add realistic market data based on category
+        tam_range = constraints['market_ranges']['tam']
+        cagr_range = constraints['market_ranges']['cagr']
+        processed_idea['market_analysis'] = {
+            'tam': f"${random.randint(tam_range[0], tam_range[1])}B ({prompt} market)",
+            'cagr': f"{random.randint(cagr_range[0], cagr_range[1])}% (2024-2029)",
+            'source': f"Global {prompt.title()} Market Report 2024"
+        }
+
+        return processed_idea
+
+    def generate_enriched_ideas(self, combined_data, num_ideas=20, prompt="business innovation"):
+        """Generate category-aligned business ideas with market intelligence"""
+        try:
+            constraints = self.get_category_constraints(prompt)
+
+            response = self.create_completion(
+                'generate_enriched_ideas',
+                messages=self._enriched_idea_messages(combined_data, num_ideas, prompt, constraints),
                 temperature=0.7,
                 top_p=0.9,
             )
@@ -227,40 +277,7 @@ Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea m
                     ideas = json.loads(json_str)
                     
                     # Process and enrich each idea
-                    enriched_ideas = []
-                    for idea in ideas:
-                        processed_idea = {
-                            'idea': f"{idea.get('problem', 'Business opportunity')}: {idea.get('solution', 'Innovative solution')}",
-                            'problem': idea.get('problem', 'Market opportunity identified'),
-                            'solution': idea.get('solution', 'Innovative solution approach'),
-                            'target_market': idea.get('target_market', 'Target market analysis'),
-                            'differentiator': idea.get('differentiator', 'Unique value proposition'),
-                            'validation': idea.get('validation', {
-                                'target_users': 'Market research needed',
-                                'entry_barrier': 'medium',
-                                'monetization': 'subscription model',
-                                'risks': 'market competition'
-                            }),
-                            'novelty': idea.get('novelty', 8),
-                            'uniqueness': idea.get('uniqueness', 7),
-                            'business_value': idea.get('business_value', 9),
-                            'justification': f"Strong potential in {prompt} market with specific differentiator",
-                            'keywords': idea.get('keywords', [prompt.split()[0], 'innovation'])
-                        }
-                        
-                        # Add realistic market data based on category
-                        tam_range = constraints['market_ranges']['tam']
-                        cagr_range = constraints['market_ranges']['cagr']
-                        import random
-                        processed_idea['market_analysis'] = {
-                            'tam': f"${random.randint(tam_range[0], tam_range[1])}B ({prompt} market)",
-                            'cagr': f"{random.randint(cagr_range[0], cagr_range[1])}% (2024-2029)",
-                            'source': f"Global {prompt.title()} Market Report 2024"
-                        }
-                        
-                        enriched_ideas.append(processed_idea)
-                    
-                    return enriched_ideas
+                    return [self._process_enriched_idea(idea, prompt, constraints) for idea in ideas]
                     
             except json.JSONDecodeError as e:
                 print(f"JSON parsing error: {e}")
@@ -269,6 +286,33 @@ Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea m
         except Exception as e:
             print(f"Error generating enriched ideas: {str(e)}")
             return self._generate_fallback_ideas(prompt, num_ideas)
+
+    def stream_enriched_ideas(self, combined_data, num_ideas=20, prompt="business innovation"):
+        """Like generate_enriched_ideas, but yields each idea as soon as the model has finished writing it"""
+        yielded = 0
+        try:
+            constraints = self.get_category_constraints(prompt)
+            response = self.create_completion(
+                'stream_enriched_ideas',
+                messages=self._enriched_idea_messages(combined_data, num_ideas, prompt, constraints),
+                temperature=0.7,
+                top_p=0.9,
+                stream=True,
+            )
+
+            parser = JSONArrayStream()
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                for idea in parser.feed(chunk.choices[0].delta.content or ''):
+                    if isinstance(idea, dict):
+                        yielded += 1
+                        yield self._process_enriched_idea(idea, prompt, constraints)
+        except Exception as e:
+            print(f"Error streaming enriched ideas: {str(e)}")
+
+        if not yielded:
+            yield from self._generate_fallback_ideas(prompt, num_ideas)
     
     def _generate_fallback_ideas(self, prompt, num_ideas):
         """Generate fallback ideas when main generation fails"""
@@ -412,8 +456,8 @@ Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea m
             """
             user_prompt = f"Enrich the following ideas: {json.dumps(idea_texts)}"
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self.create_completion(
+                'enrich_ideas',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -467,8 +511,8 @@ Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea m
             """
             user_prompt = f"Refine this business idea: {idea}"
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self.create_completion(
+                'refine_idea',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -523,8 +567,8 @@ Generate {num_ideas} business ideas strictly within {prompt} domain. Each idea m
 Generate 5 completely unique business ideas. Make each idea specific, actionable, and different from typical solutions. Return only the ideas, one per line."""
                 
                 try:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
+                    response = self.create_completion(
+                        'generate_ideas_from_source',
                         messages=[
                             {"role": "system", "content": system_prompt},
                             {"role": "user", "content": user_prompt}
@@ -606,8 +650,8 @@ Return the analysis in this exact JSON format:
     "themes": ["theme 1", "theme 2", "theme 3"]
 }}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self.create_completion(
+                'analyze_trends',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -0,0 +1,138 @@
+"""
+Constant-memory export of post/trend rows as chunked CSV, NDJSON or Parquet.
+
+Rows can come from any iterable, including a cursor over a local SQLite store:
+
+    python -m utils.exporters trends.db "SELECT * FROM trend_days" trends.parquet
+"""
+import argparse
+import csv
+import heapq
+import io
+import json
+import sqlite3
+import tempfile
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+def top_k_by(rows: Iterable[dict], key: Callable[[dict], Any], k: int = 10) -> List[dict]:
+    """Largest k rows by key in O(n log k), consuming rows once"""
+    return heapq.nlargest(k, rows, key=key)
+
+def _peek(rows: Iterable[dict]):
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return None, iter(())
+    return first, chain([first], iterator)
+
+def iter_csv(rows: Iterable[dict], fieldnames: Optional[List[str]] = None, chunk_rows: int = 1000) -> Iterator[str]:
+    """CSV text in chunks of chunk_rows rows; columns default to the first row's keys"""
+    first, rows = _peek(rows)
+    if first is None:
+        return
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames or list(first.keys()), extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson(rows: Iterable[dict], chunk_rows: int = 1000) -> Iterator[str]:
+    """Newline-delimited JSON in chunks of chunk_rows rows"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_rows))
+        if not chunk:
+            return
+        yield ''.join(json.dumps(row, default=str) + '\n' for row in chunk)
+
+def write_parquet(rows: Iterable[dict], path, batch_rows: int = 10000) -> int:
+    """Write rows to Parquet one record batch at a time; requires pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    iterator = iter(rows)
+    writer = None
+    written = 0
+    try:
+        while True:
+            chunk = list(islice(iterator, batch_rows))
+            if not chunk:
+                break
+            if writer is None:
+                batch = pa.RecordBatch.from_pylist(chunk)
+                writer = pq.ParquetWriter(path, batch.schema)
+            else:
+                batch = pa.RecordBatch.from_pylist(chunk, schema=writer.schema)
+            writer.write_batch(batch)
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+def write_export(rows: Iterable[dict], fp_or_path, fmt: str = 'csv', **kwargs):
+    """Write rows in the given format to an open text file (csv/ndjson) or a path (any format)"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    if fmt == 'parquet':
+        return write_parquet(rows, fp_or_path, **kwargs)
+
+    chunks = iter_csv(rows, **kwargs) if fmt == 'csv' else iter_ndjson(rows, **kwargs)
+    if isinstance(fp_or_path, (str, bytes)) or hasattr(fp_or_path, '__fspath__'):
+        with open(fp_or_path, 'w', encoding='utf-8', newline='') as fp:
+            fp.writelines(chunks)
+    else:
+        fp_or_path.writelines(chunks)
+
+def spooled_export(rows: Iterable[dict], fmt: str = 'csv', max_memory: int = 8 * 1024 * 1024):
+    """Export into a temporary file that spills to disk past max_memory bytes, rewound for reading"""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory, mode='w+b')
+    if fmt == 'parquet':
+        write_parquet(rows, spool)
+    else:
+        chunks = iter_csv(rows) if fmt == 'csv' else iter_ndjson(rows)
+        for chunk in chunks:
+            spool.write(chunk.encode('utf-8'))
+    spool.seek(0)
+    return spool
+
+def iter_sqlite(path: str, query: str, params=(), batch_rows: int = 5000) -> Iterator[dict]:
+    """Stream rows of a SQLite query as dicts without loading the result set"""
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        while True:
+            batch = cursor.fetchmany(batch_rows)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(zip(columns, row))
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a SQLite query to CSV, NDJSON or Parquet in constant memory")
+    parser.add_argument('db')
+    parser.add_argument('query')
+    parser.add_argument('output')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="Defaults to the output file extension")
+    args = parser.parse_args()
+
+    fmt = args.format or args.output.rsplit('.', 1)[-1].lower()
+    write_export(iter_sqlite(args.db, args.query), args.output, fmt)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional
+
+class Rejected(Exception):
+    """Request turned away; retry_after is a hint in seconds for the Retry-After header"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+class QuotaExceeded(Rejected):
+    """The user spent their pipeline quota"""
+
+class SchedulerFull(Rejected):
+    """Too many pipelines are already waiting (or the wait took too long)"""
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """'a@x.com:2,b@y.com:0.5' -> {'a@x.com': 2.0, 'b@y.com': 0.5}"""
+    weights = {}
+    for part in (value or '').split(','):
+        user, _, weight = part.strip().rpartition(':')
+        try:
+            if user:
+                weights[user] = float(weight)
+        except ValueError:
+            print(f"Ignoring bad scheduler weight '{part}'")
+    return weights
+
+class TokenBucket:
+    """rate tokens per second, holding at most burst"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """0 if a token was taken, otherwise seconds until one is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def give(self, now: float):
+        """Put back a token that was taken"""
+        self._refill(now)
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+class Ticket:
+    """One pipeline run waiting for, holding or done with a slot"""
+
+    __slots__ = ('user', 'tag', 'enqueued_at', 'started_at', 'state', 'event')
+
+    def __init__(self, user: str, tag: float, now: float):
+        self.user = user
+        self.tag = tag
+        self.enqueued_at = now
+        self.started_at = None
+        self.state = 'queued'
+        self.event = threading.Event()
+
+class FairScheduler:
+    """Admission control for expensive pipelines
+
+    Each user has a token bucket (rate_per_minute, burst) checked when a run is requested. Admitted
+    runs wait in per-user FIFO queues; free slots (capacity in total, max_per_user per user) go to
+    the queued run with the lowest virtual finish tag (start-time fair queuing), so a user with many
+    queued runs only gets their weighted share while others are waiting. Beyond max_queue waiting
+    runs new ones are shed.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, max_per_user: Optional[int] = None,
+                 max_queue: Optional[int] = None, rate_per_minute: Optional[float] = None,
+                 burst: Optional[float] = None, max_wait: Optional[float] = None,
+                 weights: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity or int(os.getenv("SCHED_CONCURRENCY", "4"))
+        self.max_per_user = max_per_user or int(os.getenv("SCHED_USER_CONCURRENCY", "1"))
+        self.max_queue = max_queue or int(os.getenv("SCHED_MAX_QUEUE", "32"))
+        self.rate = (rate_per_minute if rate_per_minute is not None
+                     else float(os.getenv("SCHED_RATE_PER_MINUTE", "6"))) / 60.0
+        self.burst = burst if burst is not None else float(os.getenv("SCHED_BURST", "3"))
+        self.max_wait = max_wait or float(os.getenv("SCHED_MAX_WAIT", "60"))
+        self.weights = weights if weights is not None else parse_weights(os.getenv("SCHED_WEIGHTS"))
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, Deque[Ticket]] = {}
+        self._running: Dict[str, int] = {}
+        self._last_tag: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._queued = 0
+        self._running_total = 0
+        # Recent waits for percentiles, plus running totals
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self._service_seconds = 30.0
+        self.counters = {'admitted': 0, 'completed': 0, 'rejected_quota': 0, 'rejected_full': 0, 'timed_out': 0}
+        self.wait_seconds_total = 0.0
+
+    def weight(self, user: str) -> float:
+        return max(self.weights.get(user, 1.0), 0.01)
+
+    def check_quota(self, user: str):
+        """Spend one of the user's tokens, or raise QuotaExceeded"""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(user)
+            if bucket is None:
+                if len(self._buckets) > 10000:
+                    # Full buckets carry no state worth keeping
+                    self._buckets = {u: b for u, b in self._buckets.items() if not b.full(now)}
+                bucket = self._buckets[user] = TokenBucket(self.rate * self.weight(user), self.burst, now)
+            wait = bucket.take(now)
+            if wait:
+                self.counters['rejected_quota'] += 1
+                raise QuotaExceeded(f"Quota exceeded, try again in {int(math.ceil(wait))} s", wait)
+
+    def refund(self, user: str):
+        """Return the token check_quota spent when the run it paid for was never accepted"""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(user)
+            if bucket is not None:
+                bucket.give(now)
+
+    def enqueue_paid(self, user: str) -> Ticket:
+        """enqueue() for a run check_quota already charged; shedding it refunds the token"""
+        try:
+            return self.enqueue(user)
+        except SchedulerFull:
+            self.refund(user)
+            raise
+
+    def wait_paid(self, ticket: Ticket, timeout: Optional[float] = None):
+        """wait() for a run check_quota already charged; timing out refunds the token"""
+        try:
+            self.wait(ticket, timeout)
+        except SchedulerFull:
+            self.refund(ticket.user)
+            raise
+
+    def _estimated_wait(self) -> float:
+        return self._service_seconds * (self._queued + 1) / self.capacity
+
+    def enqueue(self, user: str, shed: bool = True) -> Ticket:
+        """Queue a run for the user; raises SchedulerFull when shed and the queue is at max_queue"""
+        now = self.clock()
+        with self._lock:
+            if shed and self._queued >= self.max_queue:
+                self.counters['rejected_full'] += 1
+                raise SchedulerFull(f"{self._queued} pipelines already waiting", self._estimated_wait())
+            # A user's tag starts at the current virtual time so idle users don't bank credit
+            tag = max(self._virtual_time, self._last_tag.get(user, 0.0)) + 1.0 / self.weight(user)
+            self._last_tag[user] = tag
+            ticket = Ticket(user, tag, now)
+            self._queues.setdefault(user, deque()).append(ticket)
+            self._queued += 1
+            self.counters['admitted'] += 1
+            self._dispatch(now)
+        return ticket
+
+    def _dispatch(self, now: float):
+        """Grant free slots to the eligible queued runs with the lowest tags; caller holds the lock"""
+        while self._running_total < self.capacity:
+            best = None
+            for user, queue in self._queues.items():
+                if queue and self._running.get(user, 0) < self.max_per_user:
+                    if best is None or queue[0].tag < best.tag:
+                        best = queue[0]
+            if best is None:
+                return
+            queue = self._queues[best.user]
+            queue.popleft()
+            if not queue:
+                del self._queues[best.user]
+            self._queued -= 1
+            self._running_total += 1
+            self._running[best.user] = self._running.get(best.user, 0) + 1
+            self._virtual_time = max(self._virtual_time, best.tag - 1.0 / self.weight(best.user))
+            best.state = 'running'
+            best.started_at = now
+            wait = now - best.enqueued_at
+            self._waits.append(wait)
+            self.wait_seconds_total += wait
+            best.event.set()
+
+    def wait(self, ticket: Ticket, timeout: Optional[float] = None):
+        """Block until the ticket holds a slot (timeout 0 waits indefinitely); raises SchedulerFull and
+        gives up the place on timeout"""
+        timeout = self.max_wait if timeout is None else timeout
+        if ticket.event.wait(timeout if timeout > 0 else None):
+            return
+        with self._lock:
+            if ticket.state == 'running':
+                return
+            self.counters['timed_out'] += 1
+            retry_after = self._estimated_wait()
+        self.release(ticket)
+        raise SchedulerFull(f"Waited {timeout:g} s without a free slot", retry_after)
+
+    def release(self, ticket: Ticket):
+        """Give up a queued place or a running slot; safe to call more than once"""
+        now = self.clock()
+        with self._lock:
+            if ticket.state == 'queued':
+                queue = self._queues.get(ticket.user)
+                if queue and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[ticket.user]
+                    self._queued -= 1
+            elif ticket.state == 'running':
+                self._running_total -= 1
+                self._running[ticket.user] -= 1
+                if not self._running[ticket.user]:
+                    del self._running[ticket.user]
+                self.counters['completed'] += 1
+                # Moving average of pipeline duration, for Retry-After estimates
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * (now - ticket.started_at)
+            ticket.state = 'done'
+            if not self._queues.get(ticket.user) and not self._running.get(ticket.user):
+                self._last_tag.pop(ticket.user, None)
+            self._dispatch(now)
+
+    @contextmanager
+    def slot(self, user: str, shed: bool = True, timeout: Optional[float] = None):
+        """Hold one of the user's pipeline slots for the duration of the block"""
+        ticket = self.enqueue(user, shed=shed)
+        try:
+            self.wait(ticket, timeout)
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def run(self, user: str, fn: Callable, *args, **kwargs):
+        """Quota check, fair wait for a slot, then fn(*args, **kwargs); the quota is refunded if the run is shed"""
+        self.check_quota(user)
+        ticket = self.enqueue_paid(user)
+        try:
+            self.wait_paid(ticket)
+            return fn(*args, **kwargs)
+        finally:
+            self.release(ticket)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            def percentile(p):
+                return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+            return {
+                'queue_depth': self._queued,
+                'running': self._running_total,
+                'capacity': self.capacity,
+                'users_waiting': len(self._queues),
+                'wait_seconds_p50': percentile(0.5),
+                'wait_seconds_p95': percentile(0.95),
+                'wait_seconds_max': waits[-1] if waits else 0.0,
+                'wait_seconds_total': self.wait_seconds_total,
+                'service_seconds_avg': self._service_seconds,
+                **self.counters,
+            }
@@ -0,0 +1,424 @@
+"""
+Local OpenAI-compatible stand-in for the SambaNova chat-completions API.
+
+Point the clients at it with DEEPSEEK_BASE_URL=http://127.0.0.1:8001/v1 and any
+DEEPSEEK_API_KEY. Responses are generated deterministically from the request
+so pipeline benchmarks are repeatable and free.
+
+    python -m utils.fake_llm_server --port 8001 --latency 0.2 --tokens-per-second 400
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Any
+
+from flask import Flask, Response, jsonify, request, stream_with_context
+
+DEFAULT_CONFIG = {
+    'FAKE_LLM_LATENCY': float(os.getenv('FAKE_LLM_LATENCY', '0')),
+    'FAKE_LLM_TOKENS_PER_SECOND': float(os.getenv('FAKE_LLM_TOKENS_PER_SECOND', '0')),
+    'FAKE_LLM_ERROR_RATE': float(os.getenv('FAKE_LLM_ERROR_RATE', '0')),
+    'FAKE_LLM_RATE_LIMIT_RATE': float(os.getenv('FAKE_LLM_RATE_LIMIT_RATE', '0')),
+    'FAKE_LLM_MAX_REQUESTS_PER_MINUTE': int(os.getenv('FAKE_LLM_MAX_REQUESTS_PER_MINUTE', '0')),
+    'FAKE_LLM_RETRY_AFTER': int(os.getenv('FAKE_LLM_RETRY_AFTER', '1')),
+    'FAKE_LLM_SEED': os.getenv('FAKE_LLM_SEED', 'aaron-insights'),
+    'FAKE_LLM_CANNED': {},
+}
+
+MODELS = [
+    "Llama-4-Maverick-17B-128E-Instruct",
+    "DeepSeek-R1-Distill-Llama-70B",
+]
+
+PROBLEMS = [
+    "Small teams lose hours reconciling data across disconnected tools",
+    "Consumers cannot verify the sustainability claims of products they buy",
+    "Freelancers struggle to forecast irregular income and taxes",
+    "Gym members abandon training plans after the first month",
+    "Local shops have no affordable way to run loyalty programs",
+    "Remote managers lack visibility into team workload and burnout",
+    "Parents find it hard to vet after-school tutors",
+    "Clinics waste staff time on manual appointment reminders",
+]
+
+SOLUTIONS = [
+    "a lightweight hub that syncs records and flags conflicts automatically",
+    "a verification marketplace backed by independent auditors",
+    "a cash-flow assistant that sets aside taxes from every payment",
+    "a community accountability program with coach check-ins",
+    "a shared loyalty network priced per redemption",
+    "a workload radar built on calendar and ticket signals",
+    "a vetted tutor directory with parent reviews and trial sessions",
+    "an SMS-first scheduling agent that fills cancellations",
+]
+
+SEGMENTS = [
+    "seed-stage startups", "eco-conscious millennials", "independent contractors",
+    "boutique gyms", "neighbourhood retailers", "distributed engineering teams",
+    "working parents", "independent clinics",
+]
+
+
+def _content_tokens(text: str) -> List[str]:
+    """Split text into whitespace-preserving pseudo tokens"""
+    return re.findall(r'\S+\s*|\s+', text)
+
+
+def _extract_json(text: str, opener: str, closer: str):
+    """Return the JSON value between the first opener and last closer, if any"""
+    start_idx = text.find(opener)
+    end_idx = text.rfind(closer) + 1
+    if start_idx >= 0 and end_idx > start_idx:
+        try:
+            return json.loads(text[start_idx:end_idx])
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def _requested_count(text: str, default: int) -> int:
+    """Find the number of items a prompt asks for"""
+    match = re.search(r'(?:[Gg]enerate(?: exactly)?)\s+(\d+)', text)
+    return int(match.group(1)) if match else default
+
+
+def _topic(system_prompt: str, user_prompt: str) -> str:
+    """Best-effort guess of the user's topic from the prompt text"""
+    for pattern in (r'specializing in (.+?)[.\n]', r'interest in "(.+?)"', r'User prompt: "(.+?)"'):
+        match = re.search(pattern, system_prompt + "\n" + user_prompt)
+        if match:
+            return match.group(1).strip()
+    return "business innovation"
+
+
+class ResponseGenerator:
+    """Builds schema-shaped completions for the prompts the pipeline sends"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        """Pick a schema from the prompt wording and render a response"""
+        if '"detailed_analysis"' in system_prompt:
+            return json.dumps(self.detailed_analysis(user_prompt))
+        if 'execution_pathway' in system_prompt:
+            return json.dumps(self.enrich_ideas(user_prompt))
+        if '"enriched_ideas"' in system_prompt:
+            return json.dumps(self.market_enrichment(user_prompt))
+        if 'refined_ideas' in system_prompt:
+            return json.dumps(self.refined_ideas())
+        if 'quora_queries' in system_prompt:
+            return json.dumps(self.search_queries(_topic(system_prompt, user_prompt)))
+        if 'source_insight' in system_prompt:
+            count = _requested_count(system_prompt, 10)
+            return json.dumps(self.ranked_ideas(_topic(system_prompt, user_prompt), count), indent=2)
+        if '"validation"' in system_prompt and 'differentiator' in system_prompt:
+            count = _requested_count(system_prompt, 20)
+            return json.dumps(self.enriched_ideas(_topic(system_prompt, user_prompt), count), indent=2)
+        if 'pain_points' in system_prompt:
+            return json.dumps(self.trend_analysis())
+        if "'problem' and 'solution'" in system_prompt:
+            count = _requested_count(system_prompt, 5)
+            return json.dumps([self._problem_solution() for _ in range(count)])
+        if 'one per line' in user_prompt:
+            return "\n".join(f"{i}. {self._sentence()}" for i in range(1, 6))
+        return self._sentence()
+
+    def _pick(self, options: List[str]) -> str:
+        return options[self.rng.randrange(len(options))]
+
+    def _sentence(self) -> str:
+        return f"Build {self._pick(SOLUTIONS)} for {self._pick(SEGMENTS)} because {self._pick(PROBLEMS).lower()}."
+
+    def _problem_solution(self) -> Dict[str, str]:
+        return {"problem": self._pick(PROBLEMS), "solution": self._pick(SOLUTIONS).capitalize()}
+
+    def enriched_ideas(self, topic: str, count: int) -> List[Dict[str, Any]]:
+        """Schema consumed by DeepSeekClient.generate_enriched_ideas"""
+        keyword = topic.split()[0] if topic.split() else "business"
+        ideas = []
+        for _ in range(count):
+            idea = self._problem_solution()
+            idea.update({
+                "target_market": self._pick(SEGMENTS),
+                "differentiator": f"Community-driven model for {self._pick(SEGMENTS)}",
+                "validation": {
+                    "target_users": self._pick(SEGMENTS),
+                    "entry_barrier": self._pick(["low", "medium", "high"]),
+                    "monetization": self._pick(["subscription", "marketplace fees", "usage-based pricing"]),
+                    "risks": self._pick(["slow adoption", "regulation", "incumbent response"]),
+                },
+                "novelty": self.rng.randint(5, 10),
+                "uniqueness": self.rng.randint(5, 10),
+                "business_value": self.rng.randint(5, 10),
+                "keywords": [keyword, self._pick(["automation", "community", "marketplace", "analytics"])],
+            })
+            ideas.append(idea)
+        return ideas
+
+    def _ideas_from_user_prompt(self, user_prompt: str) -> List[Any]:
+        ideas = _extract_json(user_prompt, '[', ']')
+        return ideas if isinstance(ideas, list) else []
+
+    def market_enrichment(self, user_prompt: str) -> Dict[str, Any]:
+        """Schema consumed by MarketEnricher.batch_enrich_ideas"""
+        return {"enriched_ideas": [
+            {
+                "original_idea": idea.get('idea', '') if isinstance(idea, dict) else str(idea),
+                "market_analysis": {"tam": f"${self.rng.randint(5, 500)}B", "cagr": f"{self.rng.randint(5, 40)}%"},
+                "competitive_landscape": {"differentiator": f"Focus on {self._pick(SEGMENTS)}"},
+            }
+            for idea in self._ideas_from_user_prompt(user_prompt)
+        ]}
+
+    def detailed_analysis(self, user_prompt: str) -> Dict[str, Any]:
+        """Schema consumed by MarketEnricher.batch_get_detailed_analysis"""
+        return {"detailed_analysis": [
+            {
+                "original_idea": idea.get('idea', '') if isinstance(idea, dict) else str(idea),
+                "market_analysis": {
+                    "tam": f"${self.rng.randint(5, 500)}B",
+                    "cagr": f"{self.rng.randint(5, 40)}%",
+                    "market_trends": [self._pick(PROBLEMS) for _ in range(3)],
+                },
+                "competitive_landscape": {
+                    "direct_competitors": [f"Competitor {self.rng.randint(1, 99)}" for _ in range(2)],
+                    "indirect_competitors": [f"Alternative {self.rng.randint(1, 99)}" for _ in range(2)],
+                    "differentiator": f"Focus on {self._pick(SEGMENTS)}",
+                },
+            }
+            for idea in self._ideas_from_user_prompt(user_prompt)
+        ]}
+
+    def enrich_ideas(self, user_prompt: str) -> Dict[str, Any]:
+        """Schema consumed by DeepSeekClient.enrich_ideas"""
+        return {"enriched_ideas": [
+            {
+                "idea": idea,
+                "novelty": self.rng.randint(1, 10),
+                "uniqueness": self.rng.randint(1, 10),
+                "business_value": self.rng.randint(1, 10),
+                "justification": self._sentence(),
+                "execution_pathway": ["Interview users", "Ship a prototype", "Run a paid pilot"],
+                "keywords": [self._pick(["automation", "community", "marketplace"])],
+            }
+            for idea in self._ideas_from_user_prompt(user_prompt)
+        ]}
+
+    def refined_ideas(self) -> Dict[str, Any]:
+        """Schema consumed by DeepSeekClient.refine_idea"""
+        return {"refined_ideas": [{"title": self._pick(SOLUTIONS).capitalize(), "description": self._sentence()} for _ in range(5)]}
+
+    def search_queries(self, topic: str) -> Dict[str, List[str]]:
+        """Schema consumed by PromptProcessor.generate_search_queries"""
+        return {
+            "subreddits": ["startups", "Entrepreneur", "smallbusiness", "SideProject", "indiehackers"],
+            "quora_queries": [f"{topic} startup ideas", f"{topic} business problems", f"{topic} market trends"],
+        }
+
+    def ranked_ideas(self, topic: str, count: int) -> List[Dict[str, Any]]:
+        """Schema consumed by IdeaRanker._generate_final_ideas"""
+        return [
+            {
+                "rank": rank,
+                "title": f"{topic.title()}: {self._pick(SOLUTIONS)}",
+                "problem": self._pick(PROBLEMS),
+                "solution": self._pick(SOLUTIONS).capitalize(),
+                "market": self._pick(SEGMENTS),
+                "potential": self._pick(["High", "Medium", "Low"]),
+                "source_insight": self._pick(PROBLEMS),
+            }
+            for rank in range(1, count + 1)
+        ]
+
+    def trend_analysis(self) -> Dict[str, List[str]]:
+        """Schema consumed by DeepSeekClient.analyze_trends"""
+        return {
+            "market_trends": [self._pick(SOLUTIONS) for _ in range(3)],
+            "pain_points": [self._pick(PROBLEMS) for _ in range(3)],
+            "opportunities": [self._sentence() for _ in range(3)],
+            "themes": [self._pick(SEGMENTS) for _ in range(3)],
+        }
+
+
+def _error(status: int, message: str, error_type: str, headers=None):
+    response = jsonify({"error": {"message": message, "type": error_type, "code": status}})
+    response.status_code = status
+    for key, value in (headers or {}).items():
+        response.headers[key] = value
+    return response
+
+
+def create_app(**overrides) -> Flask:
+    """Create the fake server; overrides use the FAKE_LLM_* config keys"""
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(overrides)
+
+    counter_lock = threading.Lock()
+    state = {'requests': 0, 'window_start': time.monotonic(), 'window_count': 0}
+
+    def _rate_limited() -> bool:
+        limit = app.config['FAKE_LLM_MAX_REQUESTS_PER_MINUTE']
+        if not limit:
+            return False
+        with counter_lock:
+            now = time.monotonic()
+            if now - state['window_start'] >= 60:
+                state['window_start'] = now
+                state['window_count'] = 0
+            state['window_count'] += 1
+            return state['window_count'] > limit
+
+    @app.route('/v1/models', methods=['GET'])
+    def list_models():
+        return jsonify({"object": "list", "data": [{"id": m, "object": "model", "owned_by": "fake"} for m in MODELS]})
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(silent=True) or {}
+        messages = body.get('messages') or []
+        model = body.get('model', MODELS[0])
+
+        digest = hashlib.sha256(
+            (str(app.config['FAKE_LLM_SEED']) + model + json.dumps(messages, sort_keys=True)).encode('utf-8')
+        ).hexdigest()
+        rng = random.Random(digest)
+        with counter_lock:
+            state['requests'] += 1
+            request_number = state['requests']
+        # Injected failures are drawn per request, not per content: a retried identical request must be able
+        # to succeed, while a run with the same seed still fails the same requests
+        failures = random.Random(f"{app.config['FAKE_LLM_SEED']}:{request_number}")
+
+        if _rate_limited() or failures.random() < app.config['FAKE_LLM_RATE_LIMIT_RATE']:
+            return _error(429, "Rate limit exceeded", "rate_limit_error",
+                          {"Retry-After": str(app.config['FAKE_LLM_RETRY_AFTER'])})
+        if failures.random() < app.config['FAKE_LLM_ERROR_RATE']:
+            return _error(500, "Simulated upstream failure", "server_error")
+
+        system_prompt = "\n".join(m.get('content', '') for m in messages if m.get('role') == 'system')
+        user_prompt = "\n".join(m.get('content', '') for m in messages if m.get('role') == 'user')
+
+        generator = ResponseGenerator(rng)
+        content = None
+        for marker, canned in app.config['FAKE_LLM_CANNED'].items():
+            if marker in system_prompt or marker in user_prompt:
+                content = canned if isinstance(canned, str) else json.dumps(canned)
+                break
+        if content is None:
+            content = generator.generate(system_prompt, user_prompt)
+
+        response_format = body.get('response_format') or {}
+        if response_format.get('type') == 'json_object' and not content.lstrip().startswith('{'):
+            content = json.dumps({"result": _extract_json(content, '[', ']') or content})
+
+        tokens = _content_tokens(content)
+        max_tokens = body.get('max_tokens')
+        finish_reason = 'stop'
+        if max_tokens and len(tokens) > max_tokens:
+            tokens = tokens[:max_tokens]
+            content = ''.join(tokens)
+            finish_reason = 'length'
+
+        completion_id = f"chatcmpl-{uuid.UUID(digest[:32])}"
+        created = int(time.time())
+        prompt_tokens = sum(len(_content_tokens(m.get('content', ''))) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        latency = app.config['FAKE_LLM_LATENCY']
+        tokens_per_second = app.config['FAKE_LLM_TOKENS_PER_SECOND']
+
+        if body.get('stream'):
+            def event_stream():
+                if latency:
+                    time.sleep(latency)
+                for token in tokens:
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if tokens_per_second:
+                        time.sleep(1 / tokens_per_second)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return Response(stream_with_context(event_stream()), mimetype='text/event-stream')
+
+        delay = latency + (len(tokens) / tokens_per_second if tokens_per_second else 0)
+        if delay:
+            time.sleep(delay)
+
+        return jsonify({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        })
+
+    @app.route('/stats', methods=['GET'])
+    def stats():
+        return jsonify({"requests": state['requests']})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server for local benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=DEFAULT_CONFIG['FAKE_LLM_LATENCY'],
+                        help="Seconds to wait before the first token")
+    parser.add_argument('--tokens-per-second', type=float, default=DEFAULT_CONFIG['FAKE_LLM_TOKENS_PER_SECOND'],
+                        help="Simulated generation speed (0 = instant)")
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_CONFIG['FAKE_LLM_ERROR_RATE'],
+                        help="Fraction of requests that fail with HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=DEFAULT_CONFIG['FAKE_LLM_RATE_LIMIT_RATE'],
+                        help="Fraction of requests that fail with HTTP 429")
+    parser.add_argument('--max-rpm', type=int, default=DEFAULT_CONFIG['FAKE_LLM_MAX_REQUESTS_PER_MINUTE'],
+                        help="Return 429 once this many requests arrive within a minute (0 = unlimited)")
+    parser.add_argument('--retry-after', type=int, default=DEFAULT_CONFIG['FAKE_LLM_RETRY_AFTER'])
+    parser.add_argument('--seed', default=DEFAULT_CONFIG['FAKE_LLM_SEED'])
+    parser.add_argument('--canned', help="JSON file mapping a prompt substring to a fixed response")
+    args = parser.parse_args()
+
+    canned = {}
+    if args.canned:
+        with open(args.canned, encoding='utf-8') as f:
+            canned = json.load(f)
+
+    app = create_app(
+        FAKE_LLM_LATENCY=args.latency,
+        FAKE_LLM_TOKENS_PER_SECOND=args.tokens_per_second,
+        FAKE_LLM_ERROR_RATE=args.error_rate,
+        FAKE_LLM_RATE_LIMIT_RATE=args.rate_limit_rate,
+        FAKE_LLM_MAX_REQUESTS_PER_MINUTE=args.max_rpm,
+        FAKE_LLM_RETRY_AFTER=args.retry_after,
+        FAKE_LLM_SEED=args.seed,
+        FAKE_LLM_CANNED=canned,
+    )
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
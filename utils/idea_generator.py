@@ -1,41 +1,32 @@
-from collections import defaultdict
+from utils.problem_extractor import ProblemExtractor, PROBLEM_LEXICONS
+from utils.problem_clusterer import ProblemClusterer
 
 class IdeaGenerator:
-    def __init__(self):
-        self.problem_indicators = [
-            "need", "wish", "problem", "difficult", "hate", "annoying",
-            "frustrated", "challenge", "improve", "better"
-        ]
+    def __init__(self, indicators=None, lexicon='default', similarity_threshold=0.5):
+        self.problem_indicators = list(indicators) if indicators is not None else list(PROBLEM_LEXICONS[lexicon])
+        self.problem_extractor = ProblemExtractor(self.problem_indicators)
+        self.similarity_threshold = similarity_threshold
     
     def generate_ideas(self, posts, keywords):
         """Generate business ideas based on Reddit posts and keywords."""
         ideas = []
-        problem_counts = defaultdict(int)
+        # Paraphrases of the same complaint pool their scores
+        clusterer = ProblemClusterer(threshold=self.similarity_threshold)
         
         # Analyze posts for common problems and patterns
         for post in posts:
-            text = (post['title'] + " " + post['selftext']).lower()
-            
-            for indicator in self.problem_indicators:
-                if indicator in text:
-                    # Extract the sentence containing the problem indicator
-                    sentences = text.split('.')
-                    for sentence in sentences:
-                        if indicator in sentence:
-                            problem = sentence.strip()
-                            problem_counts[problem] += post['score']
+            text = post['title'] + " " + post['selftext']
+
+            # Each problem sentence counts once per post, however many indicators it contains
+            for problem in self.problem_extractor.extract(text):
+                clusterer.add(problem, post['score'])
         
         # Generate ideas based on top problems
-        sorted_problems = sorted(
-            problem_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )
-        
-        for problem, score in sorted_problems[:5]:
+        for problem, score, mentions in clusterer.top(5):
             idea = {
                 'problem': problem,
                 'relevance_score': score,
+                'mentions': mentions,
                 'potential_solution': self._generate_solution(problem, keywords)
             }
             ideas.append(idea)
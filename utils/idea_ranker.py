@@ -3,17 +3,20 @@ import os
 import json
 from typing import List, Dict
 from dotenv import load_dotenv
+from utils.bm25_index import BM25Index
 
 load_dotenv()
 
 class IdeaRanker:
     """Ranks and filters ideas to return top 50"""
     
-    def __init__(self):
+    def __init__(self, base_url=None):
         self.client = openai.OpenAI(
             api_key=os.getenv("DEEPSEEK_API_KEY"),
-            base_url="https://api.sambanova.ai/v1"
+            base_url=base_url or os.getenv("DEEPSEEK_BASE_URL", "https://api.sambanova.ai/v1")
         )
+        # Reused across requests; rebuilt only when the corpus changes
+        self.index = BM25Index()
     
     def rank_ideas(self, all_posts: List[Dict], user_prompt: str, limit: int = 50) -> List[Dict]:
         """Rank all collected posts and return top ideas"""
@@ -21,37 +24,25 @@ class IdeaRanker:
         if not all_posts:
             return []
         
-        # First, filter and score posts
-        scored_posts = self._score_posts(all_posts, user_prompt)
-        
-        # Sort by score and take top posts
-        top_posts = sorted(scored_posts, key=lambda x: x.get('relevance_score', 0), reverse=True)[:100]
+        # Score and select top posts
+        top_posts = self._top_posts(all_posts, user_prompt, 100)
         
         # Generate final ideas from top posts
         return self._generate_final_ideas(top_posts, user_prompt, limit)
     
-    def _score_posts(self, posts: List[Dict], user_prompt: str) -> List[Dict]:
-        """Score posts based on relevance to user prompt"""
-        scored_posts = []
+    def _top_posts(self, posts: List[Dict], user_prompt: str, k: int) -> List[Dict]:
+        """Best k posts by BM25 relevance to the prompt plus engagement"""
+        if self.index.fingerprint != BM25Index.corpus_fingerprint(posts):
+            self.index.fit(posts)
+        else:
+            self.index.update_engagement(posts)
         
-        for post in posts:
-            score = 0
-            text = f"{post.get('title', '')} {post.get('text', '')}".lower()
-            prompt_words = user_prompt.lower().split()
-            
-            # Basic keyword matching
-            for word in prompt_words:
-                if word in text:
-                    score += 1
-            
-            # Engagement score
-            score += min(post.get('score', 0) / 100, 5)  # Cap at 5 points
-            score += min(post.get('num_comments', 0) / 50, 3)  # Cap at 3 points
-            
+        top_posts = []
+        for doc_index, score in self.index.top_k(user_prompt, k):
+            post = posts[doc_index]
             post['relevance_score'] = score
-            scored_posts.append(post)
-        
-        return scored_posts
+            top_posts.append(post)
+        return top_posts
     
     def _generate_final_ideas(self, top_posts: List[Dict], user_prompt: str, limit: int) -> List[Dict]:
         """Generate final ranked ideas from top posts"""
@@ -0,0 +1,260 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+# A job that was running when the process died this many times is failed instead of retried
+MAX_ATTEMPTS = 3
+# A running job's lease is renewed every third of this; once it lapses the job counts as abandoned
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+class QueueFull(Exception):
+    """Raised when too many jobs are waiting for a worker"""
+
+class JobQueue:
+    """Background jobs run by a bounded thread pool, with state and results persisted in SQLite
+
+    Several processes may share one database: a job is claimed atomically before it runs and holds a
+    lease (worker id plus expiry) renewed by a heartbeat. Only jobs whose lease has lapsed, because
+    their process died, are put back in the queue.
+    """
+
+    def __init__(self, handler: Callable[[dict], dict], path: Optional[str] = None,
+                 workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 retention_seconds: Optional[float] = None, lease_seconds: Optional[float] = None,
+                 recover: bool = True, purge_interval: Optional[float] = None):
+        self.handler = handler
+        self.path = path or os.getenv("JOB_QUEUE_PATH", "jobs.db")
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_pending = max_pending or int(os.getenv("JOB_MAX_PENDING", "100"))
+        self.retention_seconds = retention_seconds or float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 86400)))
+        self.lease_seconds = lease_seconds or LEASE_SECONDS
+        # Long-lived workers enforce retention from the heartbeat, not just at start-up
+        self.purge_interval = purge_interval or float(os.getenv("JOB_PURGE_SECONDS", "3600"))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._db = self._connect(self.path)
+        if recover:
+            self.requeue_expired()
+        self.purge()
+        self._next_purge = time.time() + self.purge_interval
+        self._enqueue_queued()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created_at);
+        """)
+        # Databases created before leases existed
+        columns = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (('worker', 'TEXT'), ('lease_expires', 'REAL')):
+            if column not in columns:
+                db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        db.commit()
+        return db
+
+    @classmethod
+    def recover(cls, path: Optional[str] = None) -> int:
+        """Requeue abandoned jobs without starting a pool, e.g. once in a gunicorn master"""
+        db = cls._connect(path or os.getenv("JOB_QUEUE_PATH", "jobs.db"))
+        try:
+            return len(cls._requeue_expired(db))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _requeue_expired(db: sqlite3.Connection) -> List[str]:
+        """Put running jobs whose lease lapsed back in the queue, failing ones interrupted too often"""
+        now = time.time()
+        expired = "status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)"
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', finished_at = ?, "
+            f"worker = NULL, lease_expires = NULL WHERE {expired} AND attempts >= ?", (now, now, MAX_ATTEMPTS)
+        )
+        job_ids = [row[0] for row in db.execute(f"SELECT id FROM jobs WHERE {expired}", (now,))]
+        db.executemany(
+            "UPDATE jobs SET status = 'queued', started_at = NULL, worker = NULL, lease_expires = NULL "
+            f"WHERE id = ? AND {expired}", [(job_id, now) for job_id in job_ids]
+        )
+        db.commit()
+        for job_id in job_ids:
+            print(f"Recovering unfinished job {job_id}")
+        return job_ids
+
+    def requeue_expired(self) -> int:
+        """Requeue abandoned jobs and hand them to this pool"""
+        with self._lock:
+            job_ids = self._requeue_expired(self._db)
+            rows = self._db.execute(
+                f"SELECT id, payload FROM jobs WHERE status = 'queued' AND id IN ({','.join('?' * len(job_ids))})",
+                job_ids
+            ).fetchall() if job_ids else []
+        for job_id, payload in rows:
+            self._enqueue(job_id, json.loads(payload))
+        return len(rows)
+
+    def _enqueue_queued(self):
+        """Offer every queued job to this pool; whichever process claims one first runs it"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        for job_id, payload in rows:
+            self._enqueue(job_id, json.loads(payload))
+
+    def _heartbeat_loop(self):
+        """Renew the leases of jobs running here, pick up jobs abandoned by dead processes and purge old ones"""
+        while not self._stopped.wait(self.lease_seconds / 3):
+            try:
+                with self._lock:
+                    self._db.execute(
+                        "UPDATE jobs SET lease_expires = ? WHERE worker = ? AND status = 'running'",
+                        (time.time() + self.lease_seconds, self.worker_id)
+                    )
+                    self._db.commit()
+                self.requeue_expired()
+                if time.time() >= self._next_purge:
+                    self._next_purge = time.time() + self.purge_interval
+                    self.purge()
+            except sqlite3.Error as e:
+                print(f"Job heartbeat failed: {e}")
+
+    def _enqueue(self, job_id: str, payload: dict):
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, job_id, payload)
+
+    def submit(self, payload: dict, owner: Optional[str] = None) -> str:
+        """Persist a job and hand it to the pool; returns its id immediately"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} jobs already waiting")
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO jobs (id, owner, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, owner, json.dumps(payload), time.time())
+            )
+            self._db.commit()
+        self._enqueue(job_id, payload)
+        return job_id
+
+    def _update(self, job_id: str, **fields):
+        """Record the outcome of a job this process holds the lease for"""
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments}, lease_expires = NULL WHERE id = ? AND worker = ?",
+                (*fields.values(), job_id, self.worker_id)
+            )
+            self._db.commit()
+
+    def _claim(self, job_id: str) -> bool:
+        """Atomically take a queued job; False when another pool got it first"""
+        now = time.time()
+        with self._lock:
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ? AND status = 'queued'",
+                (self.worker_id, now + self.lease_seconds, now, job_id)
+            ).rowcount
+            self._db.commit()
+        return claimed == 1
+
+    def _run(self, job_id: str, payload: dict):
+        try:
+            if not self._claim(job_id):
+                return
+            result = self.handler(payload)
+            self._update(job_id, status='succeeded', result=json.dumps(result, default=str), finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @staticmethod
+    def _row_to_job(row) -> dict:
+        job_id, owner, status, result, error, created_at, started_at, finished_at = row
+        job = {
+            'id': job_id,
+            'owner': owner,
+            'status': status,
+            'created_at': created_at,
+            'started_at': started_at,
+            'finished_at': finished_at,
+        }
+        if result is not None:
+            job['result'] = json.loads(result)
+        if error is not None:
+            job['error'] = error
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Current state of a job, including its result once finished"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, owner, status, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, owner: str, limit: int = 20) -> List[dict]:
+        """Most recent jobs of an owner, without their results"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, owner, status, NULL, error, created_at, started_at, finished_at FROM jobs "
+                "WHERE owner = ? ORDER BY created_at DESC LIMIT ?",
+                (owner, limit)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        """Delete finished jobs older than the retention period"""
+        cutoff = time.time() - (older_than if older_than is not None else self.retention_seconds)
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,)
+            ).rowcount
+            self._db.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status plus the in-process backlog"""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            pending = self._pending
+        return {**{status: counts.get(status, 0) for status in JOB_STATUSES}, 'pending': pending}
+
+    def shutdown(self, wait: bool = True):
+        self._stopped.set()
+        self._executor.shutdown(wait=wait)
+        self._heartbeat.join()
+        self._db.close()
@@ -0,0 +1,76 @@
+import json
+from typing import Any, List
+
+class JSONArrayStream:
+    """Incrementally parses a JSON array arriving in chunks, returning each object or array element once complete
+
+    Text before the opening '[' (e.g. model preamble) is ignored; elements that fail to parse are skipped.
+    A bracketed run without objects or arrays in it, like "[20]" in "Here are [20] ideas:", counts as
+    preamble too. Once the array holding the elements closes, all later input is dropped.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._elements = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element_start = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Add text and return the array elements completed by it"""
+        if self._done:
+            return []
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if not self._started:
+                if char == '[':
+                    self._started = True
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._element_start = pos
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    # Closing bracket of the array itself
+                    self._started = False
+                    if self._elements:
+                        # Anything after it (e.g. "see [{...}]" in a trailing note) is ignored
+                        self._done = True
+                        self._buffer, self._pos = '', 0
+                        return completed
+                    pos += 1
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    self._elements += 1
+                    try:
+                        completed.append(json.loads(buffer[self._element_start:pos + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._element_start = None
+            pos += 1
+
+        # Drop consumed text so the buffer only holds the element in progress
+        keep_from = self._element_start if self._element_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return completed
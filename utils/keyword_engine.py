@@ -0,0 +1,122 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['’][a-z]+)*")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation attached to a word no longer drops it"""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower().replace('’', "'"))
+
+def extract_terms(text: str, stop_words: set, max_ngram: int = 2) -> List[str]:
+    """Unigrams and adjacent-word n-grams, skipping stopwords and bare numbers"""
+    tokens = tokenize(text)
+    keep = [len(tok) > 1 and tok not in stop_words and not tok.isdigit() for tok in tokens]
+
+    terms = [tok for tok, kept in zip(tokens, keep) if kept]
+    for n in range(2, max_ngram + 1):
+        for i in range(len(tokens) - n + 1):
+            if all(keep[i:i + n]):
+                terms.append(' '.join(tokens[i:i + n]))
+    return terms
+
+class KeywordEngine:
+    """Corpus-level TF-IDF keyword extraction with an incrementally grown vocabulary"""
+
+    def __init__(self, stop_words: Iterable[str] = (), max_ngram: int = 2):
+        self.stop_words = set(stop_words)
+        self.max_ngram = max_ngram
+        self.vocabulary: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._df = np.zeros(1024, dtype=np.int64)
+        self.n_docs = 0
+
+    def _term_ids(self, terms: List[str], update: bool, unseen: Dict[str, int]) -> List[int]:
+        ids = []
+        for term in terms:
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                if update:
+                    term_id = len(self._terms)
+                    self.vocabulary[term] = term_id
+                    self._terms.append(term)
+                else:
+                    # Scored as df=0 without growing the shared vocabulary
+                    term_id = unseen.setdefault(term, len(self._terms) + len(unseen))
+            ids.append(term_id)
+        return ids
+
+    def _vectorize(self, docs: List[str], update: bool):
+        """Sparse (doc, term, tf) triplets for a batch, optionally folding it into the corpus"""
+        unseen: Dict[str, int] = {}
+        doc_ids, term_ids, tfs = [], [], []
+        for doc_index, doc in enumerate(docs):
+            counts = Counter(self._term_ids(extract_terms(doc, self.stop_words, self.max_ngram), update, unseen))
+            doc_ids.extend([doc_index] * len(counts))
+            term_ids.extend(counts.keys())
+            tfs.extend(counts.values())
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        tfs = np.asarray(tfs, dtype=np.float64)
+
+        if update:
+            if len(self._terms) > len(self._df):
+                grown = np.zeros(max(len(self._terms), 2 * len(self._df)), dtype=np.int64)
+                grown[:len(self._df)] = self._df
+                self._df = grown
+            np.add.at(self._df, term_ids, 1)
+            self.n_docs += len(docs)
+        return doc_ids, term_ids, tfs, unseen
+
+    def partial_fit(self, docs: Iterable[str]):
+        """Add documents to the corpus statistics"""
+        self._vectorize(list(docs), update=True)
+        return self
+
+    def idf(self, extra_terms: int = 0) -> np.ndarray:
+        """Smoothed inverse document frequency per term id"""
+        df = self._df[:len(self._terms)]
+        if extra_terms:
+            df = np.concatenate([df, np.zeros(extra_terms, dtype=np.int64)])
+        return np.log((1 + self.n_docs) / (1 + df)) + 1
+
+    def top_keywords(self, docs: Iterable[str], top_n: int = 10, update: bool = True) -> List[List[Tuple[str, float]]]:
+        """Top TF-IDF terms per document as (term, score) pairs, highest first"""
+        docs = list(docs)
+        if not docs:
+            return []
+
+        doc_ids, term_ids, tfs, unseen = self._vectorize(docs, update)
+        results: List[List[Tuple[str, float]]] = [[] for _ in docs]
+        if not len(term_ids):
+            return results
+
+        scores = (1 + np.log(tfs)) * self.idf(len(unseen))[term_ids]
+
+        # Group by document, best score first, term id as a stable tie-break
+        order = np.lexsort((term_ids, -scores, doc_ids))
+        doc_sorted = doc_ids[order]
+        group_start = np.searchsorted(doc_sorted, doc_sorted, side='left')
+        selected = order[(np.arange(len(order)) - group_start) < top_n]
+
+        vocab_size = len(self._terms)
+        unseen_terms = list(unseen)
+        for doc_index, term_id, score in zip(doc_ids[selected].tolist(), term_ids[selected].tolist(), scores[selected].tolist()):
+            term = self._terms[term_id] if term_id < vocab_size else unseen_terms[term_id - vocab_size]
+            results[doc_index].append((term, round(score, 4)))
+        return results
+
+    def top_corpus_terms(self, top_n: int = 20) -> List[Tuple[str, int]]:
+        """Most widespread terms across the corpus seen so far"""
+        df = self._df[:len(self._terms)]
+        if not len(df):
+            return []
+        top_n = min(top_n, len(df))
+        candidates = np.argpartition(-df, top_n - 1)[:top_n]
+        candidates = candidates[np.lexsort((candidates, -df[candidates]))]
+        return [(self._terms[i], int(df[i])) for i in candidates]
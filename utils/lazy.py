@@ -0,0 +1,25 @@
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+class Lazy(Generic[T]):
+    """Process-wide instance built by factory on first call, safe to call from many threads"""
+
+    def __init__(self, factory: Callable[[], T]):
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
@@ -0,0 +1,226 @@
+import heapq
+import math
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from utils.bm25_index import engagement_score, post_text
+from utils.keyword_engine import tokenize
+from utils.trend_aggregator import post_timestamp
+
+class _Segment:
+    """Postings for posts created within one time slice"""
+
+    __slots__ = ('postings', 'keys', 'newest', 'max_engagement')
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.keys = set()
+        self.newest = float('-inf')
+        self.max_engagement = 0.0
+
+class LiveRankIndex:
+    """Incrementally maintained BM25 + engagement ranking over a stream of posts
+
+    Posts are inserted, have their engagement updated and are expired by age in place. The postings
+    are partitioned into time segments; a query visits segments by their best possible (decayed) score
+    and stops at the first one that can no longer reach the current top n, so with decay enabled query
+    cost follows the recent posting volume rather than the size of the whole corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, half_life_seconds: Optional[float] = 86400,
+                 segment_seconds: float = 6 * 3600, max_age_seconds: Optional[float] = None,
+                 common_term_ratio: float = 0.5):
+        self.k1 = k1
+        self.b = b
+        # None disables time decay (and with it, segment pruning)
+        self.half_life_seconds = half_life_seconds
+        self.segment_seconds = segment_seconds
+        self.max_age_seconds = max_age_seconds
+        # Postings of terms in more than this share of a segment are only walked if they can still reach the top n
+        self.common_term_ratio = common_term_ratio
+        self.posts: Dict[str, Dict] = {}
+        self._segments: Dict[int, _Segment] = {}
+        # key -> (segment id, created, length, term frequencies)
+        self._docs: Dict[str, tuple] = {}
+        self._engagement: Dict[str, float] = {}
+        self._df: Counter = Counter()
+        self._total_length = 0
+        # Posts skipped for lacking created_utc: without an age they can be neither decayed nor expired
+        self.undated = 0
+
+    def __len__(self):
+        return len(self.posts)
+
+    @staticmethod
+    def post_key(post: Dict) -> str:
+        return str(post.get('id') or post.get('url') or post_text(post))
+
+    def upsert(self, post: Dict) -> Optional[str]:
+        """Insert a post, or re-index it if its id is already present; posts without created_utc are skipped"""
+        created = post_timestamp(post)
+        if created is None:
+            self.undated += 1
+            return None
+        key = self.post_key(post)
+        if key in self.posts:
+            self.remove(key)
+
+        segment_id = int(created // self.segment_seconds)
+        segment = self._segments.get(segment_id)
+        if segment is None:
+            segment = self._segments[segment_id] = _Segment()
+
+        terms = Counter(tokenize(post_text(post)))
+        for term, tf in terms.items():
+            segment.postings.setdefault(term, {})[key] = tf
+        self._df.update(terms.keys())
+        length = sum(terms.values())
+        self._total_length += length
+
+        engagement = engagement_score(post)
+        segment.keys.add(key)
+        segment.newest = max(segment.newest, created)
+        segment.max_engagement = max(segment.max_engagement, engagement)
+        self._docs[key] = (segment_id, created, length, terms)
+        self._engagement[key] = engagement
+        self.posts[key] = post
+        return key
+
+    def upsert_many(self, posts: List[Dict]):
+        for post in posts:
+            self.upsert(post)
+        return self
+
+    def update_engagement(self, key: str, score: Optional[int] = None, num_comments: Optional[int] = None) -> bool:
+        """Apply new vote/comment counts to an indexed post without re-tokenizing it"""
+        post = self.posts.get(key)
+        if post is None:
+            return False
+        if score is not None:
+            post['score'] = score
+        if num_comments is not None:
+            post['num_comments'] = num_comments
+        engagement = engagement_score(post)
+        self._engagement[key] = engagement
+        segment = self._segments[self._docs[key][0]]
+        segment.max_engagement = max(segment.max_engagement, engagement)
+        return True
+
+    def remove(self, key: str) -> bool:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return False
+        segment_id, _, length, terms = doc
+        segment = self._segments[segment_id]
+        for term in terms:
+            postings = segment.postings[term]
+            del postings[key]
+            if not postings:
+                del segment.postings[term]
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+        segment.keys.discard(key)
+        if not segment.keys:
+            del self._segments[segment_id]
+        self._total_length -= length
+        del self._engagement[key]
+        del self.posts[key]
+        return True
+
+    def expire(self, max_age_seconds: Optional[float] = None, now: Optional[float] = None) -> int:
+        """Drop posts older than max_age_seconds (default: the index's max_age_seconds)"""
+        max_age = max_age_seconds if max_age_seconds is not None else self.max_age_seconds
+        if max_age is None:
+            return 0
+        cutoff = (now or time.time()) - max_age
+        expired = 0
+        # Only segments that start before the cutoff can hold expired posts
+        for segment_id in [s for s in self._segments if s * self.segment_seconds < cutoff]:
+            for key in list(self._segments[segment_id].keys):
+                if self._docs[key][1] < cutoff:
+                    self.remove(key)
+                    expired += 1
+        return expired
+
+    def _decay(self, created: float, now: float) -> float:
+        if not self.half_life_seconds:
+            return 1.0
+        return 0.5 ** (max(0.0, now - created) / self.half_life_seconds)
+
+    def _score_candidates(self, keys, terms, avg_length: float, now: float, n: int, best: List[tuple]):
+        """Score posts and keep the n best in the min-heap best"""
+        k1, b = self.k1, self.b
+        for key in keys:
+            _, created, length, _ = self._docs[key]
+            norm = k1 * (1 - b + b * length / avg_length)
+            relevance = 0.0
+            for idf, postings in terms:
+                tf = postings.get(key)
+                if tf:
+                    relevance += idf * tf * (k1 + 1) / (tf + norm)
+            entry = ((relevance + self._engagement[key]) * self._decay(created, now), key)
+            if len(best) < n:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+    def top(self, query: str, n: int = 100, now: Optional[float] = None) -> List[Dict]:
+        """Best n posts for the query: (BM25 + engagement), decayed by post age
+
+        Every post is ranked, as in BM25Index: posts without a query term score their engagement alone.
+        """
+        if not self.posts or n <= 0:
+            return []
+        now = now or time.time()
+        n_docs = len(self.posts)
+        avg_length = self._total_length / n_docs or 1.0
+        k1 = self.k1
+
+        idfs = {}
+        for term in dict.fromkeys(tokenize(query)):
+            df = self._df.get(term)
+            if df:
+                idfs[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        # BM25 term weight approaches idf * (k1 + 1) as tf grows
+        max_relevance = sum(idfs.values()) * (k1 + 1)
+
+        # Visit segments by their best possible score, so the first one that can't reach the top n ends the scan
+        bounds = []
+        for segment_id, segment in self._segments.items():
+            decay = self._decay(segment.newest, now)
+            bounds.append(((max_relevance + segment.max_engagement) * decay, decay, segment_id))
+        bounds.sort(reverse=True)
+
+        best: List[tuple] = []
+        for bound, decay, segment_id in bounds:
+            if len(best) == n and bound < best[0][0]:
+                break
+            segment = self._segments[segment_id]
+
+            terms = [(idf, segment.postings[term]) for term, idf in idfs.items() if term in segment.postings]
+            # Rare terms nominate candidates first; posts matching only common terms are scored too
+            # unless their best possible score can't reach the current top n
+            limit = self.common_term_ratio * len(segment.keys)
+            selective = [postings for _, postings in terms if len(postings) <= limit]
+            common = [(idf, postings) for idf, postings in terms if len(postings) > limit]
+            scored = set().union(*selective)
+            self._score_candidates(scored, terms, avg_length, now, n, best)
+
+            common_bound = (sum(idf for idf, _ in common) * (k1 + 1) + segment.max_engagement) * decay
+            if common and (len(best) < n or common_bound >= best[0][0]):
+                rest = set().union(*(postings for _, postings in common)) - scored
+                self._score_candidates(rest, terms, avg_length, now, n, best)
+                scored |= rest
+
+            # The remaining posts can only get in on engagement
+            if len(best) < n or segment.max_engagement * decay >= best[0][0]:
+                self._score_candidates(segment.keys - scored, terms, avg_length, now, n, best)
+
+        results = []
+        for score, key in sorted(best, reverse=True):
+            post = self.posts[key]
+            post['relevance_score'] = score
+            results.append(post)
+        return results
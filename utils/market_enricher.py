@@ -22,8 +22,8 @@ Each object must have this exact structure:
 """
 
         try:
-            response = self.client.client.chat.completions.create(
-                model=self.client.model,
+            response = self.client.create_completion(
+                'market_enrichment',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -76,8 +76,8 @@ Each object must have this exact structure:
 """
 
         try:
-            response = self.client.client.chat.completions.create(
-                model=self.client.model,
+            response = self.client.create_completion(
+                'competitor_analysis',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
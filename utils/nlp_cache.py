@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+class NLPResultCache:
+    """Per-post NLP results keyed by content hash: an in-memory LRU with an optional SQLite tier"""
+
+    def __init__(self, max_entries: int = 20000, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_results (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(title: str, text: str, version: str) -> str:
+        """Hash of the whitespace-normalized post content and the processor version
+
+        Case is kept: VADER scores "GREAT" higher than "great", so posts differing only in case are different inputs.
+        """
+        normalized = ' '.join(f"{title or ''} {text or ''}".split())
+        return hashlib.sha1(f"{version}\0{normalized}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """Look up several keys, promoting persistent hits into memory"""
+        found = {}
+        missing = {}
+        with self._lock:
+            for key in keys:
+                if key in found or key in missing:
+                    continue
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = value
+                    self.hits += 1
+                else:
+                    missing[key] = None
+            missing = list(missing)
+
+            if missing and self._db is not None:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, value FROM nlp_results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, value in rows:
+                        found[key] = json.loads(value)
+                        self._remember(key, found[key])
+                        self.hits += 1
+                        self.persistent_hits += 1
+
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def put_many(self, results: Dict[str, dict]):
+        """Store freshly computed results in both tiers"""
+        if not results:
+            return
+        with self._lock:
+            for key, value in results.items():
+                self._remember(key, value)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO nlp_results (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in results.items()]
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: dict):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached result from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM nlp_results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._entries),
+        }
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> NLPResultCache:
+    """Process-wide cache configured by NLP_CACHE_SIZE and NLP_CACHE_PATH"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = NLPResultCache(
+                max_entries=int(os.getenv("NLP_CACHE_SIZE", "20000")),
+                path=os.getenv("NLP_CACHE_PATH") or None,
+            )
+        return _default_cache
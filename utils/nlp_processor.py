@@ -1,50 +1,164 @@
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from collections import Counter
-
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('vader_lexicon')
-nltk.download('stopwords')
-nltk.download('punkt_tab')
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from utils.keyword_engine import KeywordEngine
+from utils.nlp_cache import NLPResultCache, get_default_cache
+from utils.nltk_resources import load_vader_analyzer, load_stopwords
+
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+# Standard VADER cut-offs on the compound score
+NEUTRAL_BAND = 0.05
+
+def sentiment_code(score: float) -> int:
+    """Index into SENTIMENT_LABELS for a compound score"""
+    if score >= NEUTRAL_BAND:
+        return 2
+    if score <= -NEUTRAL_BAND:
+        return 0
+    return 1
+
+class SentimentBatch:
+    """Compound scores and label codes for a batch of texts, stored as compact arrays"""
+
+    def __init__(self, scores: array):
+        self.scores = scores
+        self.codes = array('b', map(sentiment_code, scores))
+
+    def __len__(self):
+        return len(self.scores)
+
+    @property
+    def labels(self) -> list:
+        return [SENTIMENT_LABELS[code] for code in self.codes]
+
+    def count(self, label: str) -> int:
+        """Number of texts with the given label"""
+        return self.codes.count(SENTIMENT_LABELS.index(label))
+
+_worker_processor = None
+
+def _init_sentiment_worker():
+    global _worker_processor
+    _worker_processor = NLPProcessor()
+
+def _score_chunk(texts: list) -> array:
+    return array('d', map(_worker_processor.analyze_sentiment, texts))
 
 class NLPProcessor:
-    def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+    # Bump whenever sentiment or keyword output changes so cached results are not reused
+    VERSION = "4"
+    # Batches smaller than this are scored in-process; pool start-up would dominate
+    PARALLEL_THRESHOLD = 5000
+    CHUNK_SIZE = 2000
+
+    def __init__(self, cache: NLPResultCache = None):
+        self.cache = cache if cache is not None else get_default_cache()
+        # NLTK resources are loaded on first use so importing this module stays cheap
+        self._sia = None
+        self._sia_loaded = False
+        self._stop_words = None
+        self._keyword_engine = None
+        self._pool = None
+        self._pool_workers = 0
+
+    @property
+    def sia(self):
+        """VADER analyzer, loaded on first use"""
+        if not self._sia_loaded:
+            self._sia = load_vader_analyzer()
+            self._sia_loaded = True
+            if self._sia is None:
+                print("Warning: VADER lexicon unavailable, sentiment will be reported as neutral")
+        return self._sia
+
+    @property
+    def stop_words(self):
+        """English stopwords, loaded on first use"""
+        if self._stop_words is None:
+            self._stop_words = load_stopwords('english')
+        return self._stop_words
+
+    @property
+    def keyword_engine(self):
+        """Corpus-level TF-IDF engine shared by every batch this processor sees"""
+        if self._keyword_engine is None:
+            self._keyword_engine = KeywordEngine(self.stop_words)
+        return self._keyword_engine
 
     def analyze_sentiment(self, text):
         """Analyze sentiment of given text"""
-        if not isinstance(text, str):
+        if not isinstance(text, str) or self.sia is None:
             return 0
 
         sentiment_scores = self.sia.polarity_scores(text)
         return sentiment_scores['compound']
 
+    def analyze_sentiments(self, texts, workers=None, chunk_size=None) -> SentimentBatch:
+        """Score many texts, fanning large batches out across a process pool"""
+        texts = list(texts)
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        if workers is None:
+            workers = (os.cpu_count() or 1) if len(texts) >= self.PARALLEL_THRESHOLD else 1
+
+        if workers <= 1 or len(texts) <= chunk_size:
+            return SentimentBatch(array('d', map(self.analyze_sentiment, texts)))
+
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        scores = array('d')
+        for part in self._get_pool(workers).map(_score_chunk, chunks):
+            scores.extend(part)
+        return SentimentBatch(scores)
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Reuse one worker pool per processor; each worker loads its own analyzer"""
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_sentiment_worker)
+            self._pool_workers = workers
+        return self._pool
+
+    def close(self):
+        """Shut down the sentiment worker pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
+
     def extract_keywords(self, text, top_n=10):
-        """Extract most common keywords from text"""
+        """Extract the highest TF-IDF keywords and bigrams from text"""
         if not isinstance(text, str):
             return []
 
-        # Tokenize and clean text
-        words = text.lower().split()  # Simplified tokenization
-        words = [word for word in words if word.isalnum() 
-                and word not in self.stop_words]
-
-        # Count frequencies
-        word_freq = Counter(words)
-        return word_freq.most_common(top_n)
+        # Scored against the corpus seen so far without adding this text to it
+        return self.keyword_engine.top_keywords([text], top_n, update=False)[0]
 
     def process_data(self, data: list) -> list:
         """Process a list of dictionaries with sentiment analysis and keyword extraction"""
         if not data:
             return []
 
-        for item in data:
-            combined_text = item.get('title', '') + ' ' + item.get('text', '')
-            item['sentiment'] = self.analyze_sentiment(combined_text)
-            item['keywords'] = [kw[0] for kw in self.extract_keywords(combined_text)]
+        keys = [NLPResultCache.make_key(item.get('title', ''), item.get('text', ''), self.VERSION) for item in data]
+        results = self.cache.get_many(keys)
+
+        # Only posts we have never seen go through NLP; duplicates within the batch are scored once
+        pending = {}
+        for item, key in zip(data, keys):
+            if key not in results and key not in pending:
+                pending[key] = item.get('title', '') + ' ' + item.get('text', '')
+
+        if pending:
+            texts = list(pending.values())
+            sentiments = self.analyze_sentiments(texts)
+            keywords = self.keyword_engine.top_keywords(texts, top_n=10)
+            computed = {
+                key: {'sentiment': sentiment, 'keywords': [kw[0] for kw in item_keywords]}
+                for key, sentiment, item_keywords in zip(pending, sentiments.scores, keywords)
+            }
+            self.cache.put_many(computed)
+            results.update(computed)
+
+        for item, key in zip(data, keys):
+            item['sentiment'] = results[key]['sentiment']
+            item['keywords'] = list(results[key]['keywords'])
 
-        return data
\ No newline at end of file
+        return data
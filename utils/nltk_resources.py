@@ -0,0 +1,152 @@
+"""
+Lazy, offline-safe loading of the NLTK resources used by NLPProcessor.
+
+Resources are looked up locally first (NLP_RESOURCE_DIR, then NLTK's own search
+path) and only downloaded when NLTK_AUTO_DOWNLOAD is enabled. A prebuilt pickle
+of the VADER lexicon and stopwords skips NLTK's text parsing on cold start:
+
+    python -m utils.nltk_resources --download
+"""
+import argparse
+import os
+import pickle
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCE_DIR = os.getenv("NLP_RESOURCE_DIR", os.path.join(PROJECT_ROOT, "nltk_data"))
+AUTO_DOWNLOAD = os.getenv("NLTK_AUTO_DOWNLOAD", "1") == "1"
+CACHE_FILE = "nlp_resources.pickle"
+
+RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords': 'corpora/stopwords',
+}
+
+_lock = threading.Lock()
+_configured = False
+_unavailable = set()
+_cache = None
+
+
+def _nltk():
+    """Import nltk on demand and register the bundled resource directory"""
+    global _configured
+    import nltk
+
+    if not _configured:
+        if RESOURCE_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, RESOURCE_DIR)
+        _configured = True
+    return nltk
+
+
+def ensure_resource(name: str, download: bool = AUTO_DOWNLOAD) -> bool:
+    """Make sure an NLTK resource is available locally, downloading it at most once"""
+    nltk = _nltk()
+    with _lock:
+        if name in _unavailable:
+            return False
+        try:
+            nltk.data.find(RESOURCES[name])
+            return True
+        except LookupError:
+            pass
+
+        if download:
+            try:
+                os.makedirs(RESOURCE_DIR, exist_ok=True)
+                nltk.download(name, download_dir=RESOURCE_DIR, quiet=True, raise_on_error=True)
+                nltk.data.find(RESOURCES[name])
+                return True
+            except Exception as e:
+                print(f"Warning: could not download NLTK resource '{name}': {e}")
+
+        _unavailable.add(name)
+        return False
+
+
+def _load_cache(resource_dir: str = None):
+    """Load the prebuilt resource pickle if one exists"""
+    global _cache
+    if _cache is None:
+        path = os.path.join(resource_dir or RESOURCE_DIR, CACHE_FILE)
+        _cache = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    _cache = pickle.load(f)
+            except Exception as e:
+                print(f"Warning: ignoring unreadable NLP resource cache {path}: {e}")
+    return _cache
+
+
+def load_vader_analyzer():
+    """Return a SentimentIntensityAnalyzer, or None if the lexicon is unavailable"""
+    nltk = _nltk()
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+    cache = _load_cache()
+    if cache.get('nltk_version') == nltk.__version__ and 'vader_lexicon' in cache:
+        analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        analyzer.lexicon_file = None
+        analyzer.lexicon = cache['vader_lexicon']
+        analyzer.constants = VaderConstants()
+        return analyzer
+
+    if not ensure_resource('vader_lexicon'):
+        return None
+    return SentimentIntensityAnalyzer()
+
+
+def load_stopwords(language: str = 'english') -> set:
+    """Return the stopword set for a language, or an empty set if unavailable"""
+    cache = _load_cache()
+    if language == 'english' and 'stopwords' in cache:
+        return set(cache['stopwords'])
+
+    if not ensure_resource('stopwords'):
+        return set()
+    from nltk.corpus import stopwords
+    return set(stopwords.words(language))
+
+
+def build_resource_cache(resource_dir: str = None) -> str:
+    """Serialize the VADER lexicon and English stopwords into a fast-loading pickle"""
+    global _cache
+    resource_dir = resource_dir or RESOURCE_DIR
+    nltk = _nltk()
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    from nltk.corpus import stopwords
+
+    data = {
+        'nltk_version': nltk.__version__,
+        'vader_lexicon': SentimentIntensityAnalyzer().lexicon,
+        'stopwords': stopwords.words('english'),
+    }
+    os.makedirs(resource_dir, exist_ok=True)
+    path = os.path.join(resource_dir, CACHE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    _cache = None
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare NLTK resources for offline use")
+    parser.add_argument('--download', action='store_true', help="Download missing resources first")
+    args = parser.parse_args()
+
+    for name in RESOURCES:
+        if not ensure_resource(name, download=args.download):
+            raise SystemExit(f"Missing NLTK resource '{name}'. Re-run with --download or set NLTK_DATA.")
+
+    start = time.perf_counter()
+    path = build_resource_cache()
+    print(f"Wrote {path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
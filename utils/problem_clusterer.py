@@ -0,0 +1,116 @@
+import heapq
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.keyword_engine import tokenize
+
+# Words that change the wording of a complaint but not what it is about
+FILLER_WORDS = frozenset(
+    "a an the i im i'm we you they it is are was were be been so really very just "
+    "this that to of for and or but my our your me us its it's".split()
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def normalize_problem(sentence: str) -> List[str]:
+    """Content tokens of a problem sentence, in order"""
+    return [token for token in tokenize(sentence) if token not in FILLER_WORDS]
+
+class ProblemCluster:
+    """Near-duplicate problem sentences with their summed score"""
+
+    __slots__ = ('score', 'size', 'members')
+
+    def __init__(self):
+        self.score = 0
+        self.size = 0
+        # sentence -> score it contributed; the best-scoring one represents the cluster
+        self.members: Dict[str, int] = {}
+
+    @property
+    def representative(self) -> str:
+        return max(self.members.items(), key=lambda kv: kv[1])[0]
+
+class ProblemClusterer:
+    """Streaming MinHash/LSH grouping of paraphrased problem sentences"""
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 16,
+                 max_members: int = 50, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_members = max_members
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.clusters: List[ProblemCluster] = []
+        # One signature row per cluster (that of its first sentence), grown by doubling
+        self._signatures = np.zeros((256, num_perm), dtype=np.uint64)
+        # normalized text -> cluster id, so exact repeats skip hashing entirely
+        self._exact: Dict[str, int] = {}
+        self._buckets: List[Dict[bytes, int]] = [{} for _ in range(bands)]
+
+    def signature(self, tokens: List[str]) -> np.ndarray:
+        """MinHash signature over word unigrams and bigrams"""
+        shingles = set(tokens)
+        shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # uint64 arithmetic wraps, which is fine for a hash family
+        return ((self._a * hashes + self._b) % np.uint64(_MERSENNE_PRIME)).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _match(self, signature: np.ndarray, band_keys: List[bytes]) -> Optional[int]:
+        candidates = {self._buckets[band].get(key) for band, key in enumerate(band_keys)}
+        candidates.discard(None)
+        if not candidates:
+            return None
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        return int(candidates[best]) if similarity[best] >= self.threshold else None
+
+    def _new_cluster(self, signature: np.ndarray, band_keys: List[bytes]) -> int:
+        cluster_id = len(self.clusters)
+        if cluster_id == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+        self._signatures[cluster_id] = signature
+        self.clusters.append(ProblemCluster())
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, cluster_id)
+        return cluster_id
+
+    def add(self, sentence: str, score: int = 1) -> int:
+        """Fold a problem sentence into its cluster, creating one if nothing is similar enough"""
+        tokens = normalize_problem(sentence)
+        normalized = ' '.join(tokens) or sentence
+        cluster_id = self._exact.get(normalized)
+
+        if cluster_id is None:
+            if tokens:
+                signature = self.signature(tokens)
+                band_keys = self._band_keys(signature)
+                cluster_id = self._match(signature, band_keys)
+            else:
+                signature, band_keys = np.zeros(self.num_perm, dtype=np.uint64), []
+            if cluster_id is None:
+                cluster_id = self._new_cluster(signature, band_keys)
+            self._exact[normalized] = cluster_id
+
+        cluster = self.clusters[cluster_id]
+        cluster.score += score
+        cluster.size += 1
+        if sentence in cluster.members or len(cluster.members) < self.max_members:
+            cluster.members[sentence] = cluster.members.get(sentence, 0) + score
+        return cluster_id
+
+    def top(self, k: int = 5) -> List[Tuple[str, int, int]]:
+        """(representative sentence, summed score, mentions) for the k highest-scoring clusters"""
+        best = heapq.nlargest(k, self.clusters, key=lambda cluster: cluster.score)
+        return [(cluster.representative, cluster.score, cluster.size) for cluster in best]
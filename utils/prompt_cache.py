@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Words that don't change what a prompt is about
+GENERIC_WORDS = frozenset(
+    "a an the for in of on and to with about startup startups idea ideas business businesses "
+    "company companies niche niches product products".split()
+)
+
+def normalize_prompt(prompt: str) -> str:
+    """Cache key for a prompt: case, punctuation, word order, plurals and generic words are ignored"""
+    words = re.findall(r"[a-z0-9]+", (prompt or '').lower())
+    kept = []
+    for word in words:
+        if word in GENERIC_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        kept.append(word)
+    # A prompt made only of generic words still needs a distinct key
+    return ' '.join(sorted(set(kept or words)))
+
+class PromptResultCache:
+    """Pipeline results by normalized prompt with a TTL, stale-while-revalidate and LRU eviction
+
+    Within ttl seconds a result is served as 'fresh'. For the following stale_seconds it is served
+    immediately as 'stale' while a background refresh recomputes it. Older entries are recomputed
+    synchronously ('miss'). Concurrent misses for the same prompt share one computation.
+
+    Background refreshes call refresh (default: compute), which lets the caller route them through
+    the same admission control as user requests.
+    """
+
+    def __init__(self, compute: Callable[[str], Any], ttl: Optional[float] = None,
+                 stale_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 cacheable: Callable[[Any], bool] = None, refresh: Optional[Callable[[str], Any]] = None):
+        self.compute = compute
+        self.refresh = refresh or compute
+        self.ttl = ttl if ttl is not None else float(os.getenv("PROMPT_CACHE_TTL", "3600"))
+        self.stale_seconds = stale_seconds if stale_seconds is not None else float(os.getenv("PROMPT_CACHE_STALE", "86400"))
+        self.max_entries = max_entries or int(os.getenv("PROMPT_CACHE_SIZE", "256"))
+        # Failed runs are not worth keeping
+        self.cacheable = cacheable or (lambda value: bool(value) and value.get('success', True))
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [lock, holders and waiters]; an entry exists only while someone uses it
+        self._key_locks: Dict[str, list] = {}
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prompt-cache-refresh")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """Hold the per-prompt lock; it is dropped from the map once nobody holds or waits for it"""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def put(self, prompt: str, value: Any, key: Optional[str] = None):
+        """Store a result computed elsewhere (e.g. by a streaming request)"""
+        if not self.cacheable(value):
+            return
+        key = key or normalize_prompt(prompt)
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _usable(self, key: str) -> Optional[Tuple[Any, str, float]]:
+        """Entry for key unless expired; caller holds self._lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age >= self.ttl + self.stale_seconds:
+            return None
+        self._entries.move_to_end(key)
+        return value, 'fresh' if age < self.ttl else 'stale', age
+
+    def peek(self, prompt: str) -> Optional[Tuple[Any, str, float]]:
+        """Like lookup, but never starts a refresh or counts a hit (e.g. for later pages of a result)"""
+        with self._lock:
+            return self._usable(normalize_prompt(prompt))
+
+    def lookup(self, prompt: str) -> Optional[Tuple[Any, str, float]]:
+        """(value, 'fresh' | 'stale', age seconds) if a usable entry exists; stale entries get refreshed"""
+        key = normalize_prompt(prompt)
+        with self._lock:
+            cached = self._usable(key)
+            if cached is None:
+                return None
+            value, status, age = cached
+            if status == 'fresh':
+                self.hits += 1
+                return cached
+            self.stale_hits += 1
+            start_refresh = key not in self._refreshing
+            if start_refresh:
+                self._refreshing.add(key)
+        if start_refresh:
+            self._refresher.submit(self._refresh, prompt, key)
+        return value, 'stale', age
+
+    def _refresh(self, prompt: str, key: str):
+        try:
+            with self._key_lock(key):
+                self.put(prompt, self.refresh(prompt), key)
+        except Exception as e:
+            print(f"Background refresh failed for '{prompt}': {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, prompt: str) -> Tuple[Any, str, float]:
+        """(value, status, age): a cached result when usable, otherwise computed now ('miss')"""
+        cached = self.lookup(prompt)
+        if cached is not None:
+            return cached
+
+        key = normalize_prompt(prompt)
+        with self._key_lock(key):
+            # Another request may have filled the entry while we waited
+            cached = self.lookup(prompt)
+            if cached is not None:
+                return cached
+            with self._lock:
+                self.misses += 1
+            value = self.compute(prompt)
+            self.put(prompt, value, key)
+        return value, 'miss', 0.0
+
+    @contextmanager
+    def single_flight(self, prompt: str):
+        """For results computed outside get() (e.g. streamed): yields a usable entry if another request
+        filled it while we waited for the prompt's lock, else None (a miss); put() the result inside"""
+        key = normalize_prompt(prompt)
+        with self._key_lock(key):
+            cached = self.lookup(prompt)
+            if cached is None:
+                with self._lock:
+                    self.misses += 1
+            yield cached
+
+    def invalidate(self, prompt: Optional[str] = None):
+        """Forget one prompt, or everything"""
+        with self._lock:
+            if prompt is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(normalize_prompt(prompt), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
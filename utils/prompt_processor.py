@@ -9,10 +9,10 @@ load_dotenv()
 class PromptProcessor:
     """Converts user prompts into subreddit and Quora search queries"""
     
-    def __init__(self):
+    def __init__(self, base_url=None):
         self.client = openai.OpenAI(
             api_key=os.getenv("DEEPSEEK_API_KEY"),
-            base_url="https://api.sambanova.ai/v1"
+            base_url=base_url or os.getenv("DEEPSEEK_BASE_URL", "https://api.sambanova.ai/v1")
         )
     
     def generate_search_queries(self, user_prompt: str) -> Dict[str, List[str]]:
@@ -5,6 +5,8 @@ import random
 from typing import List, Dict
 import os
 
+from utils.tracing import span
+
 class QuoraClient:
     """Client for scraping startup ideas from Quora"""
     
@@ -15,6 +17,8 @@ class QuoraClient:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Politeness pause between search requests, in seconds; offline fakes set it to (0, 0)
+        self.request_delay = (0.5, 1.5)
 
         # Add proxy for PythonAnywhere
         if "https_proxy" in os.environ:
@@ -50,30 +54,8 @@ class QuoraClient:
         
         try:
             for query in all_queries:
-                search_url = f"{self.base_url}/search?q={query.replace(' ', '+')}"
-                
-                response = self.session.get(search_url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Extract questions and answers
-                    questions = soup.find_all('div', class_='q-text')
-                    
-                    for question in questions[:limit_per_query]:
-                        try:
-                            title = question.get_text().strip()
-                            all_posts.append({
-                                'title': title,
-                                'text': title,  # For Quora, title is the main content
-                                'source': 'quora',
-                                'score': random.randint(1, 100),  # Simulated engagement
-                                'num_comments': random.randint(0, 50),
-                                'query': query
-                            })
-                        except Exception:
-                            continue
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                all_posts.extend(self._search_questions(query, limit_per_query))
+                time.sleep(random.uniform(*self.request_delay))
                 
         except Exception as e:
             print(f"Error fetching from Quora: {e}")
@@ -84,6 +66,62 @@ class QuoraClient:
         
         return all_posts
     
+    def _search_questions(self, query: str, limit: int, timeout: float = 10) -> List[Dict]:
+        """Question titles from one Quora search results page"""
+        search_url = f"{self.base_url}/search?q={query.replace(' ', '+')}"
+
+        with span('quora.search', query=query) as current:
+            response = self.session.get(search_url, timeout=timeout)
+            if current is not None:
+                current.set(status_code=response.status_code, bytes=len(response.content))
+        if response.status_code != 200:
+            return []
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        posts = []
+        # Extract questions and answers
+        for question in soup.find_all('div', class_='q-text')[:limit]:
+            title = question.get_text().strip()
+            if not title:
+                continue
+            posts.append({
+                'title': title,
+                'text': title,  # For Quora, title is the main content
+                'source': 'quora',
+                'score': random.randint(1, 100),  # Simulated engagement
+                'num_comments': random.randint(0, 50),
+                'query': query
+            })
+        return posts
+
+    def search_startup_ideas(self, limit: int = 8, queries: List[str] = None, timeout: float = 10) -> List[Dict]:
+        """Startup-related Quora questions as {'title', 'category', 'source'}, falling back to curated samples"""
+        queries = queries or ["startup ideas", "business ideas", "SaaS startup ideas"]
+        ideas = []
+        seen = set()
+        for query in queries:
+            try:
+                posts = self._search_questions(query, limit * 3, timeout=timeout)
+            except Exception as e:
+                print(f"Error searching Quora for '{query}': {e}")
+                break
+            for post in posts:
+                if post['title'] in seen or not self._is_startup_related(post['title']):
+                    continue
+                seen.add(post['title'])
+                ideas.append({'title': post['title'], 'category': self._categorize_idea(post['title']), 'source': 'quora'})
+            if len(ideas) >= limit:
+                break
+
+        return ideas[:limit] or self.sample_startup_ideas(limit)
+
+    def sample_startup_ideas(self, limit: int = 8) -> List[Dict]:
+        """Curated ideas in the search_startup_ideas format, without touching the network"""
+        return [
+            {'title': post['title'], 'category': self._categorize_idea(post['title']), 'source': 'sample'}
+            for post in self._get_sample_posts([])
+        ][:limit]
+
     def _is_startup_related(self, text: str) -> bool:
         """Check if text is related to startups or business ideas"""
         startup_keywords = [
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+class QuoraSnapshot:
+    """Latest Quora startup ideas, refreshed in a background thread and kept on disk
+
+    Readers never scrape: get() returns the current snapshot immediately (starting a refresh when
+    it is older than ttl), and only with no snapshot at all waits up to timeout for the first one.
+    """
+
+    def __init__(self, fetch: Callable[[], List[Dict]], fallback: Callable[[], List[Dict]] = list,
+                 ttl: Optional[float] = None, path: Optional[str] = None, retry_seconds: float = 60):
+        self.fetch = fetch
+        self.fallback = fallback
+        self.ttl = ttl or float(os.getenv("QUORA_SNAPSHOT_TTL", "1800"))
+        self.path = path if path is not None else os.getenv("QUORA_SNAPSHOT_PATH", "quora_snapshot.json")
+        self._lock = threading.Lock()
+        self._ideas: Optional[List[Dict]] = None
+        self._fetched_at = 0.0
+        # After a failed or empty fetch, wait this long before scraping again
+        self.retry_seconds = retry_seconds
+        self._last_attempt = float('-inf')
+        self._refreshing = None
+        self._load()
+
+    def _load(self):
+        """Start from the last snapshot written by any process, however old"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self._ideas = saved['ideas']
+            self._fetched_at = saved['fetched_at']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable Quora snapshot {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'ideas': self._ideas, 'fetched_at': self._fetched_at}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save Quora snapshot: {e}")
+
+    def _refresh(self):
+        try:
+            ideas = self.fetch()
+            if ideas:
+                with self._lock:
+                    self._ideas = ideas
+                    self._fetched_at = time.time()
+                    self._save()
+        except Exception as e:
+            print(f"Quora snapshot refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def refresh(self, force: bool = False) -> Optional[threading.Thread]:
+        """Start a background refresh unless one is running or the last attempt was too recent"""
+        with self._lock:
+            if self._refreshing is None:
+                if not force and time.time() - self._last_attempt < self.retry_seconds:
+                    return None
+                self._last_attempt = time.time()
+                self._refreshing = threading.Thread(target=self._refresh, name="quora-snapshot", daemon=True)
+                self._refreshing.start()
+            return self._refreshing
+
+    def get(self, timeout: float = 0.5) -> Tuple[List[Dict], str, float]:
+        """(ideas, 'fresh' | 'stale' | 'fallback', age seconds); blocks at most timeout seconds"""
+        with self._lock:
+            ideas, fetched_at = self._ideas, self._fetched_at
+        age = time.time() - fetched_at
+        if ideas is not None:
+            if age >= self.ttl:
+                self.refresh()
+                return ideas, 'stale', age
+            return ideas, 'fresh', age
+
+        refreshing = self.refresh()
+        if refreshing is not None:
+            refreshing.join(timeout)
+        with self._lock:
+            if self._ideas is not None:
+                return self._ideas, 'fresh', time.time() - self._fetched_at
+        return self.fallback(), 'fallback', 0.0
@@ -1,6 +1,7 @@
 import praw
 import pandas as pd
 from datetime import datetime
+from utils.exporters import iter_csv, spooled_export, write_export
 
 class RedditAnalyzer:
     def __init__(self):
@@ -33,3 +34,15 @@ class RedditAnalyzer:
     def export_to_dataframe(self, posts):
         """Convert posts to pandas DataFrame for export."""
         return pd.DataFrame(posts)
+
+    def iter_csv_chunks(self, posts, chunk_rows=1000):
+        """Yield the posts as CSV text in chunks instead of one large string."""
+        return iter_csv(posts, chunk_rows=chunk_rows)
+
+    def export_to_file(self, posts, path, fmt='csv'):
+        """Stream posts to a CSV, NDJSON or Parquet file in constant memory."""
+        return write_export(posts, path, fmt)
+
+    def export_for_download(self, posts, fmt='csv'):
+        """File-like export for download buttons; spills to disk for large exports."""
+        return spooled_export(posts, fmt)
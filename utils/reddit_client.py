@@ -1,6 +1,7 @@
 import praw
 from datetime import datetime, timedelta
 import os
+from utils.tracing import span
 # from dotenv import load_dotenv
 
 # load_dotenv()
@@ -39,12 +40,15 @@ class RedditClient:
         all_posts = []
         for subreddit_name in all_subreddits:
             try:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                # Test if subreddit exists
-                subreddit.display_name
-                
-                # Get only hot posts for speed
-                posts_to_fetch = list(subreddit.hot(limit=10))
+                with span('reddit.subreddit', subreddit=subreddit_name) as current:
+                    subreddit = self.reddit.subreddit(subreddit_name)
+                    # Test if subreddit exists
+                    subreddit.display_name
+
+                    # Get only hot posts for speed
+                    posts_to_fetch = list(subreddit.hot(limit=10))
+                    if current is not None:
+                        current.set(posts=len(posts_to_fetch))
                 
                 for post in posts_to_fetch:
                     all_posts.append({
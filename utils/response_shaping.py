@@ -0,0 +1,156 @@
+import base64
+import gzip
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Named field sets for ?fields=; anything else is a comma-separated list of (dotted) field names
+FIELD_PRESETS = {
+    'summary': ('idea', 'novelty', 'uniqueness', 'business_value'),
+    # Everything the web UI's idea card renders
+    'card': ('idea', 'novelty', 'uniqueness', 'business_value', 'differentiator',
+             'validation', 'market_analysis', 'justification'),
+}
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Smaller bodies aren't worth the CPU or the header overhead
+MIN_COMPRESS_BYTES = 1024
+
+class StaleCursor(ValueError):
+    """The cursor was issued for a result that has since changed or is malformed"""
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Field projection from a request parameter; None keeps every field"""
+    if not value:
+        return None
+    if value in FIELD_PRESETS:
+        return FIELD_PRESETS[value]
+    return tuple(field.strip() for field in value.split(',') if field.strip())
+
+def project(idea: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Copy of the idea with only the requested fields; 'validation.risks' picks one nested field"""
+    if fields is None:
+        return idea
+    projected = {}
+    for field in fields:
+        name, _, sub = field.partition('.')
+        if name not in idea:
+            continue
+        if sub:
+            if isinstance(idea[name], dict) and sub in idea[name]:
+                projected.setdefault(name, {})[sub] = idea[name][sub]
+        else:
+            projected[name] = idea[name]
+    return projected
+
+def result_version(body: Dict) -> str:
+    """Short content hash of a result, so cursors can tell when it changed underneath them"""
+    encoded = json.dumps(body.get('clusters', {}), sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+def encode_cursor(offset: int, version: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{version}".encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, version: str) -> int:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset, cursor_version = base64.urlsafe_b64decode(padded).decode('ascii').split(':', 1)
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise StaleCursor("Malformed cursor")
+    if cursor_version != version or offset < 0:
+        raise StaleCursor("Results changed since this cursor was issued")
+    return offset
+
+def paginate(body: Dict, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+             fields: Optional[Iterable[str]] = None) -> Dict:
+    """One page of ideas across clusters, in cluster order, with a cursor for the next page"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    version = result_version(body)
+    offset = decode_cursor(cursor, version) if cursor else 0
+
+    items: List[Dict] = []
+    position = 0
+    for cluster, ideas in body.get('clusters', {}).items():
+        if position + len(ideas) <= offset:
+            position += len(ideas)
+            continue
+        for index, idea in enumerate(ideas):
+            if position >= offset and len(items) < limit:
+                items.append({'cluster': cluster, 'index': index, 'idea': project(idea, fields)})
+            position += 1
+    total = position
+
+    page = {key: value for key, value in body.items() if key != 'clusters'}
+    page.update({
+        'items': items,
+        'total': total,
+        'next_cursor': encode_cursor(offset + len(items), version) if offset + len(items) < total else None,
+    })
+    return page
+
+def project_clusters(body: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Full (unpaginated) body with the field projection applied to every idea"""
+    if fields is None or 'clusters' not in body:
+        return body
+    clusters = {cluster: [project(idea, fields) for idea in ideas] for cluster, ideas in body['clusters'].items()}
+    return {**body, 'clusters': clusters}
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+def json_response(body: Dict, request, status: int = 200, etag: bool = True) -> Response:
+    """Compact JSON with an ETag (304 on a match) and gzip/brotli when the client accepts it
+
+    The 'cache' status/age block is left out of the ETag (age ticks every second and is also sent
+    as the Age header), so the tag is weak: it identifies the result, not the exact bytes. Pass
+    etag=False for responses to POST, which are never revalidated.
+    """
+    volatile = body.get('cache') if isinstance(body, dict) else None
+    stable = {key: value for key, value in body.items() if key != 'cache'} if volatile is not None else body
+    payload = json.dumps(stable, separators=(',', ':'), default=str).encode('utf-8')
+    digest = hashlib.sha1(payload).hexdigest()[:20]
+    if volatile is not None:
+        # Splice the cache block back in rather than serializing the body twice
+        cache_json = json.dumps(volatile, separators=(',', ':'), default=str).encode('utf-8')
+        payload = payload[:-1] + (b',' if len(payload) > 2 else b'') + b'"cache":' + cache_json + b'}'
+    encoding = _choose_encoding(request.headers.get('Accept-Encoding')) if len(payload) >= MIN_COMPRESS_BYTES else None
+    # One ETag per representation, so caches never mix up compressed and plain bodies
+    tag = digest + (f"-{encoding}" if encoding else '')
+
+    headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'private, no-cache'}
+    if etag:
+        headers['ETag'] = f'W/"{tag}"'
+        if status == 200 and request.if_none_match.contains_weak(tag):
+            return Response(status=304, headers=headers)
+
+    if encoding == 'br':
+        payload = brotli.compress(payload, quality=5)
+    elif encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical bodies
+        payload = gzip.compress(payload, compresslevel=6, mtime=0)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(payload, status=status, mimetype='application/json', headers=headers)
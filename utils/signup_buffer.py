@@ -0,0 +1,329 @@
+import argparse
+import atexit
+import csv
+import glob
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import psycopg2
+
+from utils.users import get_user_store
+
+# (email, created_at ISO string or None for "now")
+SignupRow = Tuple[str, Optional[str]]
+
+# The database is unreachable (or went away mid-write): rows are spilled and retried. Anything else the
+# store raises is about the rows themselves, and retrying them unchanged would fail forever.
+OUTAGE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError,
+                 sqlite3.OperationalError, sqlite3.InterfaceError, ConnectionError)
+
+def clean_email(email: str) -> Optional[str]:
+    """Trimmed email, or None if it can't be an address"""
+    email = (email or '').strip()
+    if '@' not in email or len(email) > 255:
+        return None
+    return email
+
+class SignupBuffer:
+    """Write-behind signup ingestion: add() returns at once, rows reach the users table in batches
+
+    A batch is written when max_batch rows are waiting or every flush_interval seconds, as one
+    bulk INSERT ... ON CONFLICT DO NOTHING. If the write fails (database down) the rows are appended
+    to an NDJSON spill file and replayed ahead of the next batch, so acknowledged signups survive
+    outages and restarts. If the database rejects the data instead (a bad created_at, a constraint),
+    the batch is split until the offending rows are found; those go to a quarantine file and the
+    rest are written.
+
+    Each process spills to its own file (spill_path with host and pid inserted), so gunicorn workers
+    never replay or delete rows another live worker is still appending. Files left by dead processes
+    on this host are taken over with an atomic rename before they are read.
+    """
+
+    def __init__(self, get_store: Callable = get_user_store, max_batch: Optional[int] = None,
+                 flush_interval: Optional[float] = None, spill_path: Optional[str] = None,
+                 background: bool = True, quarantine_path: Optional[str] = None):
+        self.get_store = get_store
+        self.max_batch = max_batch or int(os.getenv("SIGNUP_BATCH_SIZE", "500"))
+        self.flush_interval = flush_interval or float(os.getenv("SIGNUP_FLUSH_SECONDS", "2"))
+        self.spill_path = spill_path or os.getenv("SIGNUP_SPILL_PATH", "signups_spill.ndjson")
+        self.quarantine_path = quarantine_path or os.getenv("SIGNUP_QUARANTINE_PATH", "signups_quarantine.ndjson")
+        self._rows: List[SignupRow] = []
+        self._lock = threading.Lock()
+        # Serializes writers so spill replay and batches never interleave
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.written = 0
+        self.inserted = 0
+        self.spilled = 0
+        self.quarantined = 0
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="signup-flusher", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, email: str, created_at: Optional[str] = None) -> bool:
+        """Queue a signup; False if the email is not valid"""
+        email = clean_email(email)
+        if email is None:
+            return False
+        # Record when the user signed up, not when the batch happened to be written
+        created_at = created_at or datetime.now().isoformat(sep=' ')
+        with self._lock:
+            self._rows.append((email, created_at))
+            full = len(self._rows) >= self.max_batch
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Signup flush failed: {e}")
+
+    @staticmethod
+    def _host() -> str:
+        return re.sub(r'[^A-Za-z0-9-]', '-', socket.gethostname())
+
+    def _spill_name(self, pid: int, tag: str = '') -> str:
+        root, ext = os.path.splitext(self.spill_path)
+        return f"{root}.{self._host()}.{pid}{'.' + tag if tag else ''}{ext}"
+
+    def own_spill_path(self) -> str:
+        """The spill file this process appends to"""
+        return self._spill_name(os.getpid())
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _claim_spills(self) -> List[Tuple[str, List[SignupRow]]]:
+        """(path, rows) of this process's spill file plus any orphaned ones, renamed so no one else replays them"""
+        root, ext = os.path.splitext(self.spill_path)
+        pattern = re.compile(rf"^{re.escape(os.path.basename(root))}\.([A-Za-z0-9-]+)\.(\d+)(\.[0-9a-z-]+)?{re.escape(ext)}$")
+        own = self.own_spill_path()
+        claimed = []
+        for path in sorted(glob.glob(f"{glob.escape(root)}.*{ext}") + glob.glob(glob.escape(self.spill_path))):
+            if path != own:
+                match = pattern.match(os.path.basename(path))
+                if path != self.spill_path:
+                    # Another host's files, or those of a worker that is still running, are left alone
+                    if match is None or match.group(1) != self._host():
+                        continue
+                    pid = int(match.group(2))
+                    if pid != os.getpid() and self._pid_alive(pid):
+                        continue
+                target = self._spill_name(os.getpid(), f"replay-{uuid.uuid4().hex[:8]}")
+                try:
+                    os.replace(path, target)
+                except FileNotFoundError:
+                    # Another process claimed it first
+                    continue
+                path = target
+            rows = self._read_spill(path)
+            if rows or path != own:
+                claimed.append((path, rows))
+        return claimed
+
+    @staticmethod
+    def _read_spill(path: str) -> List[SignupRow]:
+        if not os.path.exists(path):
+            return []
+        rows = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    rows.append((record['email'], record.get('created_at')))
+                except (ValueError, KeyError):
+                    # A line cut short by a crash mid-append
+                    continue
+        return rows
+
+    @staticmethod
+    def _append(path: str, rows: List[SignupRow]):
+        with open(path, 'a', encoding='utf-8') as f:
+            for email, created_at in rows:
+                f.write(json.dumps({'email': email, 'created_at': created_at}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _spill(self, rows: List[SignupRow]):
+        self._append(self.own_spill_path(), rows)
+        self.spilled += len(rows)
+
+    def _write_isolating(self, store, rows: List[SignupRow]) -> Tuple[int, List[SignupRow]]:
+        """(inserted, rejected rows): halves a batch the database rejected until the bad rows are alone"""
+        if len(rows) == 1:
+            try:
+                return store.add_users(rows), []
+            except OUTAGE_ERRORS:
+                raise
+            except Exception:
+                return 0, rows
+        inserted = 0
+        rejected = []
+        middle = len(rows) // 2
+        for half in (rows[:middle], rows[middle:]):
+            try:
+                inserted += store.add_users(half)
+            except OUTAGE_ERRORS:
+                raise
+            except Exception:
+                half_inserted, half_rejected = self._write_isolating(store, half)
+                inserted += half_inserted
+                rejected += half_rejected
+        return inserted, rejected
+
+    def write_rows(self, rows: List[SignupRow]) -> int:
+        """Write rows (after any spilled ones) in one bulk insert; spill them if the database is down and
+        quarantine the rows it rejects"""
+        with self._flush_lock:
+            own = self.own_spill_path()
+            claimed = self._claim_spills()
+            spilled = [row for _, spill_rows in claimed for row in spill_rows]
+            batch = spilled + rows
+            if not batch:
+                return 0
+            try:
+                try:
+                    store = self.get_store()
+                except Exception as e:
+                    # No store at all (pool could not connect, bad configuration) is an outage too
+                    raise ConnectionError(str(e)) from e
+                try:
+                    inserted = store.add_users(batch)
+                except OUTAGE_ERRORS:
+                    raise
+                except Exception as e:
+                    # Inserts are idempotent (ON CONFLICT DO NOTHING), so rewriting the good rows in smaller
+                    # batches is safe; an outage halfway through still spills the whole batch below
+                    inserted, rejected = self._write_isolating(store, batch)
+                    print(f"Signup batch of {len(batch)} rejected ({e}); "
+                          f"quarantined {len(rejected)} rows to {self.quarantine_path}")
+                    self._append(self.quarantine_path, rejected)
+                    self.quarantined += len(rejected)
+            except OUTAGE_ERRORS as e:
+                # Rows already in our own file stay there; new rows and taken-over files are appended to it
+                adopted = [row for path, spill_rows in claimed if path != own for row in spill_rows]
+                print(f"Signup batch of {len(batch)} failed, spilling {len(rows) + len(adopted)} to {own}: {e}")
+                self._spill(rows + adopted)
+                self._remove_spills(path for path, _ in claimed if path != own)
+                return 0
+            self._remove_spills(path for path, _ in claimed)
+            if spilled:
+                print(f"Replayed {len(spilled)} spilled signups")
+            self.written += len(batch)
+            self.inserted += inserted
+            return inserted
+
+    @staticmethod
+    def _remove_spills(paths: Iterable[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns how many new users were inserted"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        inserted = 0
+        for start in range(0, max(len(rows), 1), self.max_batch):
+            inserted += self.write_rows(rows[start:start + self.max_batch])
+        return inserted
+
+    def import_rows(self, rows: Iterable[SignupRow]) -> Tuple[int, int]:
+        """Bulk load through the same batched writer; returns (rows read, new users)"""
+        read = inserted = 0
+        batch: List[SignupRow] = []
+        for email, created_at in rows:
+            email = clean_email(email)
+            if email is None:
+                continue
+            read += 1
+            batch.append((email, created_at or None))
+            if len(batch) >= self.max_batch:
+                inserted += self.write_rows(batch)
+                batch = []
+        if batch:
+            inserted += self.write_rows(batch)
+        return read, inserted
+
+    def import_csv(self, path: str) -> Tuple[int, int]:
+        """Import a waitlist CSV of email[,created_at] lines"""
+        def rows():
+            with open(path, newline='', encoding='utf-8') as f:
+                for record in csv.reader(f):
+                    if not record or record[0].strip().lower() == 'email':
+                        continue
+                    yield record[0], (record[1].strip() if len(record) > 1 else None)
+        return self.import_rows(rows())
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending(),
+            'written': self.written,
+            'inserted': self.inserted,
+            'spilled': self.spilled,
+            'quarantined': self.quarantined,
+            'spill_file': os.path.exists(self.own_spill_path()),
+        }
+
+    def close(self):
+        """Stop the flusher and write what is left (spilling it if the database is unreachable)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Final signup flush failed: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a waitlist CSV (email[,created_at]) into the users table")
+    parser.add_argument('csv_path')
+    parser.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args()
+
+    buffer = SignupBuffer(max_batch=args.batch_size, background=False)
+    get_user_store().init()
+    start = time.perf_counter()
+    read, inserted = buffer.import_csv(args.csv_path)
+    buffer.close()
+    print(f"Read {read} rows, inserted {inserted} new users in {time.perf_counter() - start:.2f} s")
+    if buffer.spilled:
+        print(f"{buffer.spilled} rows could not be written and were spilled to {buffer.own_spill_path()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import os
+from typing import Dict, List, Tuple
+
+import streamlit as st
+
+from utils.idea_generator import IdeaGenerator
+from utils.nlp_processor import NLPProcessor
+from utils.quora_client import QuoraClient
+from utils.quora_snapshot import QuoraSnapshot
+from utils.reddit_analyzer import RedditAnalyzer
+
+POSTS_TTL = int(os.getenv("STREAMLIT_POSTS_TTL", "900"))
+SENTIMENT_TTL = int(os.getenv("STREAMLIT_SENTIMENT_TTL", "86400"))
+
+# Streamlit can't hash `self` of client methods (UnhashableParamError), so clients are cache_resource
+# singletons and the cached functions below take only plain, hashable arguments
+@st.cache_resource
+def get_reddit_analyzer() -> RedditAnalyzer:
+    return RedditAnalyzer()
+
+@st.cache_resource
+def get_nlp_processor() -> NLPProcessor:
+    return NLPProcessor()
+
+@st.cache_resource
+def get_idea_generator() -> IdeaGenerator:
+    return IdeaGenerator()
+
+@st.cache_resource
+def get_quora_client() -> QuoraClient:
+    return QuoraClient()
+
+QUORA_PANEL_SIZE = 8
+
+@st.cache_resource
+def get_quora_snapshot() -> QuoraSnapshot:
+    """One background-refreshed snapshot shared by every session"""
+    # Bind the client here: the refresh thread runs outside any script run and shouldn't touch st caches
+    client = get_quora_client()
+
+    def scraped_ideas() -> List[Dict]:
+        # Curated samples are a display fallback, not something to keep as the snapshot
+        return [idea for idea in client.search_startup_ideas(limit=QUORA_PANEL_SIZE) if idea['source'] == 'quora']
+
+    return QuoraSnapshot(scraped_ideas, fallback=lambda: client.sample_startup_ideas(limit=QUORA_PANEL_SIZE))
+
+def _posts_key(subreddit: str, time_filter: str, limit: int) -> Tuple[str, str, int]:
+    # Subreddit names are case-insensitive, so "Startups " and "startups" share an entry
+    return subreddit.strip().lower(), time_filter, int(limit)
+
+@st.cache_data(ttl=POSTS_TTL, show_spinner=False)
+def _fetch_posts(subreddit: str, time_filter: str, limit: int) -> List[Dict]:
+    return get_reddit_analyzer().fetch_posts(subreddit, time_filter, limit)
+
+def fetch_posts(subreddit: str, time_filter: str, limit: int) -> List[Dict]:
+    """Top posts of a subreddit, refetched at most every STREAMLIT_POSTS_TTL seconds"""
+    return _fetch_posts(*_posts_key(subreddit, time_filter, limit))
+
+@st.cache_data(ttl=SENTIMENT_TTL, show_spinner=False, max_entries=256)
+def sentiment_counts(texts: Tuple[str, ...]) -> Dict[str, int]:
+    """Positive/neutral/negative counts for a batch of texts, keyed by the texts themselves"""
+    batch = get_nlp_processor().analyze_sentiments(list(texts))
+    return {label: batch.count(label) for label in ('positive', 'neutral', 'negative')}
+
+def post_texts(posts: List[Dict]) -> Tuple[str, ...]:
+    return tuple(post['title'] + " " + post['selftext'] for post in posts)
+
+def export_posts(subreddit: str, time_filter: str, limit: int, fmt: str = 'csv') -> bytes:
+    """Download bytes for the same (cached) posts fetch_posts returns, built when asked for
+
+    st.download_button only takes in-memory str/bytes (a spooled or temporary file is rejected) and
+    keeps them in Streamlit's media storage, so one full copy per download can't be avoided; the spool
+    keeps the writer from holding its chunks alongside it. The bytes themselves are not cached, which
+    would keep a second copy of every export for as long as the posts.
+    """
+    posts = _fetch_posts(*_posts_key(subreddit, time_filter, limit))
+    with get_reddit_analyzer().export_for_download(posts, fmt) as export:
+        return export.read()
+
+def invalidate(subreddit: str = None, time_filter: str = None, limit: int = None):
+    """Drop cached posts for one query, or for every query when called without arguments"""
+    if subreddit is None:
+        _fetch_posts.clear()
+        return
+    _fetch_posts.clear(*_posts_key(subreddit, time_filter, limit))
@@ -0,0 +1,206 @@
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Share of traces written to the sink; unsampled traces still time their top-level stages for Server-Timing
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+# 'jsonl' writes one span per line; 'otlp' writes one OTLP/JSON ExportTraceServiceRequest per trace
+EXPORT_FORMAT = os.getenv("TRACE_EXPORT_FORMAT", "jsonl")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "idea-generator")
+# A runaway loop must not grow one trace without bound
+MAX_SPANS_PER_TRACE = 2000
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('current_trace', default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+def _new_id(nbytes: int) -> str:
+    return '%0*x' % (nbytes * 2, random.getrandbits(nbytes * 8))
+
+class Span:
+    """One timed operation; children point at it through parent_id"""
+
+    __slots__ = ('name', 'span_id', 'parent_id', 'start', '_start_perf', 'duration', 'attributes', 'error', 'depth')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict):
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.depth = parent.depth + 1 if parent else 0
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start_perf
+
+class Trace:
+    """The spans of one request or job"""
+
+    def __init__(self, name: str, sampled: bool):
+        self.trace_id = _new_id(16)
+        self.name = name
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> bool:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            return True
+
+    def stage_durations(self) -> Dict[str, float]:
+        """Seconds per direct child of the root span, summed by name, plus the total"""
+        stages: Dict[str, float] = {}
+        root_id = self.root.span_id if self.root else None
+        for span in self.spans:
+            if span.parent_id == root_id and span.duration is not None:
+                stages[span.name] = stages.get(span.name, 0.0) + span.duration
+        if self.root and self.root.duration is not None:
+            stages['total'] = self.root.duration
+        return stages
+
+def server_timing(trace: Optional[Trace]) -> str:
+    """Server-Timing header value with one metric per pipeline stage, durations in ms"""
+    if trace is None:
+        return ''
+    metrics = []
+    for name, seconds in trace.stage_durations().items():
+        token = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+        metrics.append(f'{token};dur={seconds * 1000:.1f}')
+    return ', '.join(metrics)
+
+class SpanExporter:
+    """Appends finished traces to a local file, as JSON lines or OTLP/JSON"""
+
+    def __init__(self, path: str = EXPORT_PATH, fmt: str = EXPORT_FORMAT):
+        self.path = path
+        self.format = fmt
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _attributes(attributes: Dict) -> List[Dict]:
+        converted = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                converted.append({'key': key, 'value': {'boolValue': value}})
+            elif isinstance(value, int):
+                converted.append({'key': key, 'value': {'intValue': str(value)}})
+            elif isinstance(value, float):
+                converted.append({'key': key, 'value': {'doubleValue': value}})
+            else:
+                converted.append({'key': key, 'value': {'stringValue': str(value)}})
+        return converted
+
+    def _otlp_span(self, trace: Trace, span: Span) -> Dict:
+        start_ns = int(span.start * 1e9)
+        otlp = {
+            'traceId': trace.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 2 if span.parent_id is None else 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int((span.duration or 0) * 1e9)),
+            'attributes': self._attributes(span.attributes),
+            'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+        }
+        if span.parent_id:
+            otlp['parentSpanId'] = span.parent_id
+        return otlp
+
+    def export(self, trace: Trace):
+        if self.format == 'otlp':
+            lines = [json.dumps({'resourceSpans': [{
+                'resource': {'attributes': self._attributes({'service.name': SERVICE_NAME})},
+                'scopeSpans': [{'scope': {'name': 'utils.tracing'},
+                                'spans': [self._otlp_span(trace, span) for span in trace.spans]}],
+            }]})]
+        else:
+            lines = [json.dumps({
+                'trace_id': trace.trace_id,
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                'name': span.name,
+                'start': span.start,
+                'duration_ms': round((span.duration or 0) * 1000, 3),
+                'attributes': span.attributes,
+                'error': span.error,
+            }, default=str) for span in trace.spans]
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            print(f"Failed to export trace {trace.trace_id}: {e}")
+
+exporter = SpanExporter()
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(name: str, sample_rate: Optional[float] = None, **attributes):
+    """Root span for a request or job; sampled traces are exported when it ends"""
+    rate = SAMPLE_RATE if sample_rate is None else sample_rate
+    trace = Trace(name, sampled=random.random() < rate)
+    root = Span(name, None, attributes)
+    trace.root = root
+    trace.add(root)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(root)
+    try:
+        yield trace
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if trace.sampled:
+            exporter.export(trace)
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace
+
+    Unsampled traces only keep the stages directly under the root (for Server-Timing) and skip
+    nested spans such as individual API calls.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or parent is None or (not trace.sampled and parent.depth >= 1):
+        yield None
+        return
+    current = Span(name, parent, attributes)
+    if not trace.add(current):
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Exited in a different context than it was entered (e.g. a generator finished elsewhere)
+            _current_span.set(parent)
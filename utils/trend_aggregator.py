@@ -0,0 +1,161 @@
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+def post_timestamp(post: dict) -> Optional[float]:
+    """created_utc as epoch seconds, or None when the post has no usable creation time
+
+    Callers skip undated posts rather than stamping them with the current time, which would put every
+    one of them in the newest window.
+    """
+    created = post.get('created_utc')
+    if isinstance(created, datetime):
+        return created.timestamp()
+    if isinstance(created, (int, float)) and not isinstance(created, bool):
+        return float(created)
+    if isinstance(created, str):
+        try:
+            return float(created)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(created).timestamp()
+        except ValueError:
+            return None
+    return None
+
+class TrendAggregator:
+    """Running keyword counts and sentiment sums over sliding time windows of a post stream"""
+
+    def __init__(self, window_seconds: int = 86400, num_windows: int = 7,
+                 max_keywords_per_window: int = 50000, keep_history: bool = False,
+                 max_history_keywords: Optional[int] = None):
+        self.window_seconds = window_seconds
+        self.num_windows = num_windows
+        self.max_keywords_per_window = max_keywords_per_window
+        self.keep_history = keep_history
+        # Historical totals get the same bound the retained windows have without history
+        self.max_history_keywords = max_history_keywords or max_keywords_per_window * num_windows
+        self.latest_window: Optional[int] = None
+        # window index -> keyword -> [count, sentiment_sum]
+        self._windows: Dict[int, Dict[str, list]] = {}
+        # keyword -> [count, sentiment_sum] across retained windows (and history, if kept)
+        self._totals: Dict[str, list] = {}
+        self.posts_seen = 0
+        # Posts with keywords but no created_utc; they belong to no window and are not counted
+        self.undated = 0
+
+    def add(self, post: dict):
+        """Fold one post's keywords and sentiment into its time window"""
+        keywords = post.get('keywords') or []
+        if not keywords:
+            return
+
+        created = post_timestamp(post)
+        if created is None:
+            self.undated += 1
+            return
+        window = int(created // self.window_seconds)
+        if self.latest_window is None or window > self.latest_window:
+            self._advance(window)
+        in_range = window > self.latest_window - self.num_windows
+        if not in_range and not self.keep_history:
+            return
+
+        self.posts_seen += 1
+        sentiment = post.get('sentiment') or 0
+        # Posts older than the retained windows only contribute to the historical totals
+        bucket = self._windows.setdefault(window, {}) if in_range else None
+        for keyword in keywords:
+            if bucket is not None:
+                entry = bucket.get(keyword)
+                if entry is None:
+                    bucket[keyword] = [1, sentiment]
+                else:
+                    entry[0] += 1
+                    entry[1] += sentiment
+            total = self._totals.get(keyword)
+            if total is None:
+                self._totals[keyword] = [1, sentiment]
+            else:
+                total[0] += 1
+                total[1] += sentiment
+
+        if bucket is not None and len(bucket) > self.max_keywords_per_window:
+            self._prune(bucket)
+        if self.keep_history and len(self._totals) > self.max_history_keywords:
+            self._prune_history()
+
+    def add_many(self, posts: Iterable[dict]):
+        """Consume a stream of posts"""
+        for post in posts:
+            self.add(post)
+        return self
+
+    def _advance(self, window: int):
+        """Move the newest window forward, retiring windows that slide out of range"""
+        self.latest_window = window
+        oldest = window - self.num_windows + 1
+        for index in [i for i in self._windows if i < oldest]:
+            expired = self._windows.pop(index)
+            if self.keep_history:
+                continue
+            for keyword, (count, sentiment_sum) in expired.items():
+                total = self._totals[keyword]
+                total[0] -= count
+                total[1] -= sentiment_sum
+                if total[0] <= 0:
+                    del self._totals[keyword]
+
+    def _prune(self, bucket: Dict[str, list]):
+        """Drop the rarer half of a window's keywords to keep memory bounded"""
+        for keyword, (count, sentiment_sum) in heapq.nsmallest(len(bucket) // 2, bucket.items(), key=lambda kv: kv[1][0]):
+            del bucket[keyword]
+            if self.keep_history:
+                # The mentions still happened; historical totals keep them
+                continue
+            total = self._totals[keyword]
+            total[0] -= count
+            total[1] -= sentiment_sum
+            if total[0] <= 0:
+                del self._totals[keyword]
+
+    def _prune_history(self):
+        """Drop the rarer half of the historical totals; frequent keywords keep their exact counts"""
+        for keyword, _ in heapq.nsmallest(len(self._totals) // 2, self._totals.items(), key=lambda kv: kv[1][0]):
+            del self._totals[keyword]
+
+    def window_counts(self, keyword: str) -> List[int]:
+        """Occurrences of a keyword per retained window, oldest first"""
+        if self.latest_window is None:
+            return []
+        return [
+            self._windows.get(index, {}).get(keyword, (0, 0))[0]
+            for index in range(self.latest_window - self.num_windows + 1, self.latest_window + 1)
+        ]
+
+    def top_k(self, k: Optional[int] = None) -> List[dict]:
+        """Most frequent keywords with sentiment, velocity and acceleration between the latest windows"""
+        if k is None:
+            k = len(self._totals)
+        best = heapq.nlargest(k, self._totals.items(), key=lambda kv: kv[1][0])
+
+        latest = self.latest_window
+        current = self._windows.get(latest, {})
+        previous = self._windows.get(latest - 1, {}) if latest is not None else {}
+        before = self._windows.get(latest - 2, {}) if latest is not None else {}
+
+        trends = []
+        for keyword, (count, sentiment_sum) in best:
+            now = current.get(keyword, (0, 0))[0]
+            prev = previous.get(keyword, (0, 0))[0]
+            prev2 = before.get(keyword, (0, 0))[0]
+            velocity = now - prev
+            trends.append({
+                'keyword': keyword,
+                'frequency': count,
+                'avg_sentiment': sentiment_sum / count if count else 0,
+                'velocity': velocity,
+                'acceleration': velocity - (prev - prev2),
+            })
+        return trends
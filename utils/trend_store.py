@@ -0,0 +1,246 @@
+"""
+Compact local time series of keyword mentions, with z-score burst detection.
+
+Each post is counted once, in the window of its created_utc, however many fetches return it, so a
+period's count reflects new mentions rather than how often the source was scraped.
+
+    python -m utils.trend_store snapshot startups          # fetch, analyze and record r/startups
+    python -m utils.trend_store rising r/startups --days 7  # top rising keywords this week
+"""
+import argparse
+import hashlib
+import heapq
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.trend_aggregator import post_timestamp
+
+class TrendStore:
+    """SQLite-backed keyword mention counts per scope (e.g. 'r/startups') and time window"""
+
+    def __init__(self, path: Optional[str] = None, bucket_seconds: int = 3600,
+                 seen_retention_seconds: Optional[float] = None):
+        self.path = path or os.getenv("TREND_STORE_PATH", "trends.db")
+        self.bucket_seconds = bucket_seconds
+        # Post ids are remembered this long; anything older falls outside every rising() window anyway
+        self.seen_retention_seconds = seen_retention_seconds or float(os.getenv("TREND_SEEN_RETENTION", str(90 * 86400)))
+        self._lock = threading.Lock()
+        self._keyword_ids: Dict[str, int] = {}
+        # Posts skipped by record_posts for lacking created_utc
+        self.undated = 0
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS keywords (
+                id INTEGER PRIMARY KEY,
+                keyword TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS trend_posts (
+                scope TEXT NOT NULL,
+                post_key TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                PRIMARY KEY (scope, post_key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS trend_buckets (
+                scope TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                keyword_id INTEGER NOT NULL,
+                frequency INTEGER NOT NULL,
+                sentiment_sum REAL NOT NULL,
+                PRIMARY KEY (scope, bucket, keyword_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS trend_days (
+                scope TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                keyword_id INTEGER NOT NULL,
+                frequency INTEGER NOT NULL,
+                sentiment_sum REAL NOT NULL,
+                PRIMARY KEY (scope, day, keyword_id)
+            ) WITHOUT ROWID;
+        """)
+        self._drop_snapshot_tables()
+        self._db.commit()
+
+    def _drop_snapshot_tables(self):
+        """Remove the tables of the earlier per-snapshot schema
+
+        trend_snapshots/trend_daily held identify_trends frequencies per scrape, so the same post was
+        counted once per snapshot. Those counts can't be turned into per-post mentions, and mixing them
+        into trend_buckets would show a false burst, so they are dropped rather than migrated.
+        """
+        old = [name for (name,) in self._db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('trend_snapshots', 'trend_daily')"
+        )]
+        for name in old:
+            rows = self._db.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            print(f"TrendStore: dropping legacy table {name} ({rows} rows); trends are recounted from new posts")
+            self._db.execute(f"DROP TABLE {name}")
+
+    def _keyword_id(self, keyword: str) -> int:
+        keyword_id = self._keyword_ids.get(keyword)
+        if keyword_id is None:
+            self._db.execute("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)", (keyword,))
+            keyword_id = self._db.execute("SELECT id FROM keywords WHERE keyword = ?", (keyword,)).fetchone()[0]
+            self._keyword_ids[keyword] = keyword_id
+        return keyword_id
+
+    @staticmethod
+    def _post_key(post: dict) -> str:
+        if post.get('id') or post.get('url'):
+            return str(post.get('id') or post.get('url'))
+        return hashlib.sha1(f"{post.get('title', '')}\0{post.get('text', '')}".encode('utf-8')).hexdigest()
+
+    def record_posts(self, scope: str, posts: Iterable[dict]) -> int:
+        """Add the keywords of posts not seen before (processed by NLPProcessor); returns how many were new"""
+        counts: Dict[tuple, list] = {}
+        new_posts = 0
+        with self._lock:
+            newest = None
+            for post in posts:
+                keywords = post.get('keywords')
+                if not keywords:
+                    continue
+                created = post_timestamp(post)
+                if created is None:
+                    self.undated += 1
+                    continue
+                bucket = int(created // self.bucket_seconds)
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO trend_posts (scope, post_key, bucket) VALUES (?, ?, ?)",
+                    (scope, self._post_key(post), bucket)
+                ).rowcount
+                if not inserted:
+                    continue
+                new_posts += 1
+                newest = bucket if newest is None else max(newest, bucket)
+                sentiment = post.get('sentiment') or 0
+                for keyword in dict.fromkeys(keywords):
+                    entry = counts.setdefault((bucket, self._keyword_id(keyword)), [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += sentiment
+
+            day_counts: Dict[tuple, list] = {}
+            for (bucket, keyword_id), (frequency, sentiment_sum) in counts.items():
+                entry = day_counts.setdefault((bucket * self.bucket_seconds // 86400, keyword_id), [0, 0.0])
+                entry[0] += frequency
+                entry[1] += sentiment_sum
+            for table, column, rows in (('trend_buckets', 'bucket', counts), ('trend_days', 'day', day_counts)):
+                self._db.executemany(f"""
+                    INSERT INTO {table} (scope, {column}, keyword_id, frequency, sentiment_sum) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (scope, {column}, keyword_id) DO UPDATE SET
+                        frequency = frequency + excluded.frequency,
+                        sentiment_sum = sentiment_sum + excluded.sentiment_sum
+                """, [(scope, window, keyword_id, frequency, sentiment_sum)
+                      for (window, keyword_id), (frequency, sentiment_sum) in rows.items()])
+            if newest is not None:
+                self._db.execute(
+                    "DELETE FROM trend_posts WHERE scope = ? AND bucket < ?",
+                    (scope, newest - int(self.seen_retention_seconds // self.bucket_seconds))
+                )
+            self._db.commit()
+        return new_posts
+
+    def rising(self, scope: str, period_seconds: int = 7 * 86400, baseline_periods: int = 4,
+               top_k: int = 20, min_frequency: int = 3, now: float = None) -> List[dict]:
+        """Keywords whose latest-period mention count is furthest above their rolling baseline (z-score)"""
+        # Whole-day periods are answered from the daily rollup, anything finer from the hourly buckets
+        if period_seconds % 86400 == 0:
+            table, column, unit = 'trend_days', 'day', 86400
+        else:
+            table, column, unit = 'trend_buckets', 'bucket', self.bucket_seconds
+        period_units = max(1, period_seconds // unit)
+        end = int((now or time.time()) // unit) + 1
+        start = end - period_units * (baseline_periods + 1)
+
+        with self._lock:
+            rows = self._db.execute(f"""
+                SELECT keyword_id, ({column} - ?) / ? AS period, SUM(frequency), SUM(sentiment_sum)
+                FROM {table}
+                WHERE scope = ? AND {column} >= ? AND {column} < ?
+                GROUP BY keyword_id, period
+            """, (start, period_units, scope, start, end)).fetchall()
+
+        series: Dict[int, list] = {}
+        sentiment: Dict[int, float] = {}
+        for keyword_id, period, frequency, sentiment_sum in rows:
+            counts = series.setdefault(keyword_id, [0] * (baseline_periods + 1))
+            counts[period] = frequency
+            if period == baseline_periods:
+                sentiment[keyword_id] = sentiment_sum / frequency if frequency else 0
+
+        scored = []
+        for keyword_id, counts in series.items():
+            current = counts[-1]
+            if current < min_frequency:
+                continue
+            baseline = counts[:-1]
+            mean = sum(baseline) / len(baseline) if baseline else 0
+            std = math.sqrt(sum((c - mean) ** 2 for c in baseline) / len(baseline)) if baseline else 0
+            # Floor the deviation so brand-new keywords don't get infinite scores
+            z_score = (current - mean) / max(std, 1.0)
+            scored.append((z_score, keyword_id, current, mean))
+
+        top = heapq.nlargest(top_k, scored)
+        with self._lock:
+            names = dict(self._db.execute(
+                f"SELECT id, keyword FROM keywords WHERE id IN ({','.join('?' * len(top))})",
+                [keyword_id for _, keyword_id, _, _ in top]
+            ).fetchall()) if top else {}
+
+        return [
+            {
+                'keyword': names.get(keyword_id, ''),
+                'frequency': current,
+                'baseline_mean': round(mean, 2),
+                'z_score': round(z_score, 3),
+                'avg_sentiment': sentiment.get(keyword_id, 0),
+            }
+            for z_score, keyword_id, current, mean in top
+        ]
+
+    def close(self):
+        self._db.close()
+
+def _snapshot_subreddit(store: TrendStore, subreddit: str, limit: int):
+    from utils.reddit_client import RedditClient
+    from utils.nlp_processor import NLPProcessor
+
+    reddit = RedditClient().reddit
+    posts = [
+        {'id': post.id, 'title': post.title, 'text': post.selftext or post.title, 'created_utc': post.created_utc}
+        for post in reddit.subreddit(subreddit).new(limit=limit)
+    ]
+    return store.record_posts(f"r/{subreddit}", NLPProcessor().process_data(posts))
+
+def main():
+    parser = argparse.ArgumentParser(description="Record trend snapshots and query rising keywords")
+    parser.add_argument('--db', default=None, help="SQLite file (default: TREND_STORE_PATH or trends.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    snapshot = commands.add_parser('snapshot', help="Fetch new posts from a subreddit and record their trends")
+    snapshot.add_argument('subreddit')
+    snapshot.add_argument('--limit', type=int, default=200)
+
+    rising = commands.add_parser('rising', help="Show keywords bursting above their baseline")
+    rising.add_argument('scope')
+    rising.add_argument('--days', type=float, default=7)
+    rising.add_argument('--baseline-periods', type=int, default=4)
+    rising.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    store = TrendStore(args.db)
+    if args.command == 'snapshot':
+        print(f"Recorded {_snapshot_subreddit(store, args.subreddit, args.limit)} new posts")
+    else:
+        start = time.perf_counter()
+        results = store.rising(args.scope, int(args.days * 86400), args.baseline_periods, args.top)
+        for trend in results:
+            print(f"{trend['keyword']:<30} {trend['frequency']:>6}  baseline {trend['baseline_mean']:>8}  z={trend['z_score']}")
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,15 @@
 import os
-import psycopg2
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import execute_values
+
 def get_db_connection():
     """Get database connection."""
     db_url = os.getenv("DATABASE_URL")
@@ -9,36 +17,224 @@ def get_db_connection():
         raise ValueError("DATABASE_URL environment variable is not set.")
     return psycopg2.connect(db_url)
 
+class PostgresUserStore:
+    """Users table behind a thread-safe connection pool with per-connection prepared statements"""
+
+    # Server-side statements prepared once on each pooled connection
+    STATEMENTS = {
+        'add_user': "PREPARE add_user (text) AS INSERT INTO users (email) VALUES ($1) ON CONFLICT (email) DO NOTHING",
+        'user_exists': "PREPARE user_exists (text) AS SELECT 1 FROM users WHERE email = $1",
+    }
+
+    def __init__(self, dsn: str = None, pool_size: int = None, health_check_interval: float = 30.0):
+        self.dsn = dsn or os.getenv("DATABASE_URL")
+        if not self.dsn:
+            raise ValueError("DATABASE_URL environment variable is not set.")
+        # Per process: with N gunicorn workers the database sees up to N * DB_POOL_SIZE connections
+        self.pool_size = pool_size or int(os.getenv("DB_POOL_SIZE", "5"))
+        self.health_check_interval = health_check_interval
+        # minconn is how many idle connections putconn keeps open; any more are closed on return, so it must
+        # equal the pool size or concurrent requests keep paying for new connections
+        self._pool = pg_pool.ThreadedConnectionPool(self.pool_size, self.pool_size, self.dsn)
+        # psycopg2's pool raises when exhausted; the semaphore makes callers wait for a free slot instead
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        # Keyed by the connection object, not id(): connections the pool closes drop out on their own, and a
+        # new connection that reuses a freed id is not mistaken for an already prepared one
+        self._last_used = weakref.WeakKeyDictionary()
+        self._prepared = weakref.WeakSet()
+
+    def _checkout(self):
+        conn = self._pool.getconn()
+        last_used = self._last_used.get(conn, 0)
+        if conn.closed or time.time() - last_used > self.health_check_interval:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._discard(conn)
+                conn = self._pool.getconn()
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._prepared.discard(conn)
+            self._last_used.pop(conn, None)
+        self._pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a healthy pooled connection; broken connections are closed instead of returned"""
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._discard(conn)
+                raise
+            except BaseException:
+                self._release(conn)
+                raise
+            else:
+                self._release(conn)
+
+    def _release(self, conn):
+        with self._lock:
+            self._last_used[conn] = time.time()
+        self._pool.putconn(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Cursor inside a transaction that commits on success and rolls back on error"""
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    yield cur
+                conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+    def _ensure_prepared(self, cur):
+        conn = cur.connection
+        if conn in self._prepared:
+            return
+        # Start clean in case an earlier attempt on this connection prepared only some statements
+        cur.execute("DEALLOCATE ALL")
+        for statement in self.STATEMENTS.values():
+            cur.execute(statement)
+        with self._lock:
+            self._prepared.add(conn)
+
+    def init(self):
+        with self.transaction() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id SERIAL PRIMARY KEY,
+                    email VARCHAR(255) UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def add_user(self, email: str) -> bool:
+        """Insert an email; False if it was already there"""
+        with self.transaction() as cur:
+            self._ensure_prepared(cur)
+            cur.execute("EXECUTE add_user (%s)", (email,))
+            return cur.rowcount > 0
+
+    def add_users(self, rows) -> int:
+        """Bulk insert (email, created_at or None) rows in one statement; returns how many were new"""
+        if not rows:
+            return 0
+        with self.transaction() as cur:
+            inserted = execute_values(
+                cur,
+                "INSERT INTO users (email, created_at) VALUES %s ON CONFLICT (email) DO NOTHING RETURNING 1",
+                rows,
+                template="(%s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))",
+                page_size=1000,
+                fetch=True,
+            )
+            return len(inserted)
+
+    def user_exists(self, email: str) -> bool:
+        with self.transaction() as cur:
+            self._ensure_prepared(cur)
+            cur.execute("EXECUTE user_exists (%s)", (email,))
+            return cur.fetchone() is not None
+
+    def close(self):
+        self._pool.closeall()
+
+class SqliteUserStore:
+    """Same interface on a local SQLite file, for development, tests and benchmarks"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("USER_DB_PATH", "users.db")
+        self._lock = threading.Lock()
+        # sqlite3 keeps its own cache of compiled statements per connection
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def init(self):
+        with self.transaction() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY,
+                    email TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def add_user(self, email: str) -> bool:
+        with self.transaction() as cur:
+            cur.execute("INSERT OR IGNORE INTO users (email) VALUES (?)", (email,))
+            return cur.rowcount > 0
+
+    def add_users(self, rows) -> int:
+        if not rows:
+            return 0
+        with self.transaction() as cur:
+            cur.executemany(
+                "INSERT OR IGNORE INTO users (email, created_at) VALUES (?, COALESCE(?, CURRENT_TIMESTAMP))", rows
+            )
+            return cur.rowcount
+
+    def user_exists(self, email: str) -> bool:
+        with self.transaction() as cur:
+            cur.execute("SELECT 1 FROM users WHERE email = ?", (email,))
+            return cur.fetchone() is not None
+
+    def close(self):
+        self._conn.close()
+
+_user_store = None
+_user_store_lock = threading.Lock()
+
+def get_user_store():
+    """Process-wide store: SQLite for DATABASE_URL=sqlite:///path, otherwise pooled Postgres"""
+    global _user_store
+    with _user_store_lock:
+        if _user_store is None:
+            db_url = os.getenv("DATABASE_URL", "")
+            if db_url.startswith("sqlite:///"):
+                _user_store = SqliteUserStore(db_url[len("sqlite:///"):])
+            else:
+                _user_store = PostgresUserStore(db_url or None)
+        return _user_store
+
 def init_db():
     """Initialize database table."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        cur.close()
-        conn.close()
+        get_user_store().init()
     except Exception as e:
         print(f"Database initialization failed: {e}")
 
 def add_user(email: str):
     """Add email to users database."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO users (email) VALUES (%s) ON CONFLICT (email) DO NOTHING",
-            (email,)
-        )
-        conn.commit()
-        cur.close()
-        conn.close()
+        get_user_store().add_user(email)
     except Exception as e:
         print(f"Failed to add email: {e}")
         import traceback
@@ -47,13 +243,7 @@ def add_user(email: str):
 def user_exists(email: str) -> bool:
     """Check if email exists in users."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT 1 FROM users WHERE email = %s", (email,))
-        result = cur.fetchone() is not None
-        cur.close()
-        conn.close()
-        return result
+        return get_user_store().user_exists(email)
     except Exception as e:
         print(f"Database check failed: {e}")
-        return False
\ No newline at end of file
+        return False